@@ -21,6 +21,9 @@ from google.adk.a2a.utils.agent_to_a2a import to_a2a
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
+from .metrics import instrument_agent
+from .metrics import metrics_endpoint
+
 # Load environment variables
 load_dotenv()
 
@@ -113,4 +116,8 @@ root_agent = Agent(
     ),
 )
 
-a2a_app = to_a2a(root_agent, port=8001)
\ No newline at end of file
+# Latency histograms per tool and per agent, scraped from /metrics.
+instrument_agent(root_agent)
+
+a2a_app = to_a2a(root_agent, port=8001)
+a2a_app.add_route('/metrics', metrics_endpoint)
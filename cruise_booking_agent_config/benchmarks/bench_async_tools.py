@@ -0,0 +1,131 @@
+"""
+Parity and concurrency check for the async cruise tools against the stand-in backend.
+
+Every async tool is called once and its result compared with the
+synchronous tool it mirrors; then a burst of concurrent package, calendar
+and entitlement lookups measures throughput through the pooled client. By
+default the backend runs in-process through httpx.ASGITransport; pass
+--base-url to drive a backend started with `python -m cruise_backend`.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.bench_async_tools [--requests 2000] [--concurrency 100] [--base-url http://127.0.0.1:8765]
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from cruise_backend.app import create_app
+from cruise_booking_tools import async_cruise_tools as remote
+from cruise_booking_tools.calendar_api import calendar_api
+from cruise_booking_tools.cruise_api_client import (
+    close_cruise_api_client,
+    configure_cruise_api,
+    get_cruise_api_client
+)
+from cruise_booking_tools.cruise_booking_api import get_booking_status
+from cruise_booking_tools.cruise_entitlements_api import book_entitlements_cart, cruise_entitlements_api
+from cruise_booking_tools.cruise_package_api import cruise_package_api
+from cruise_booking_tools.cruise_semantic_search_api import cruise_semantic_search_api
+
+
+# Fields that legitimately differ between two calls
+VOLATILE_FIELDS = {"search_timestamp"}
+
+BOOKING = {
+    "itinerary_id": "CAR001",
+    "cabin_code": "BAL",
+    "passenger_details": [{"name": "Ada Park", "age": 34}, {"name": "Lee Park", "age": 36}],
+    "contact_info": {"email": "ada@example.com", "phone": "555-0100"},
+    "idempotency_key": "bench-async-tools"
+}
+BOOKING_STATUS_FIELDS = ("confirmation_number", "booking_status", "itinerary_id", "cabin_code")
+
+
+def _stable(result):
+    return {field: value for field, value in result.items() if field not in VOLATILE_FIELDS}
+
+
+async def _parity() -> list:
+    # Bookings live in the backend's ledger, so they are checked against the backend itself
+    booking = await remote.cruise_booking_api_async(**BOOKING)
+    status = await remote.get_booking_status_async(booking.get("confirmation_number", ""))
+    cases = [
+        ("search", cruise_semantic_search_api(activities=["spa"], fields=["card"], limit=2),
+         await remote.cruise_semantic_search_api_async(activities=["spa"], fields=["card"], limit=2)),
+        ("package", cruise_package_api("CAR001", ["Balcony", "Suite"], 3),
+         await remote.cruise_package_api_async("CAR001", ["Balcony", "Suite"], 3)),
+        ("package not found", cruise_package_api("NOPE"), await remote.cruise_package_api_async("NOPE")),
+        ("calendar", calendar_api("CAR001", "2024-01-01", "2024-12-31"),
+         await remote.calendar_api_async("CAR001", "2024-01-01", "2024-12-31")),
+        ("entitlements", cruise_entitlements_api("CAR001", "Balcony", 2, ["dining", "spa"]),
+         await remote.cruise_entitlements_api_async("CAR001", "Balcony", 2, ["dining", "spa"])),
+        ("empty cart", book_entitlements_cart("CAR001", [], 2),
+         await remote.book_entitlements_cart_async("CAR001", [], 2)),
+        ("booking replay", dict(booking, idempotent_replay=True), await remote.cruise_booking_api_async(**BOOKING)),
+        ("booking status", {field: booking.get(field) for field in BOOKING_STATUS_FIELDS},
+         {field: status.get(field) for field in BOOKING_STATUS_FIELDS}),
+        ("booking not found", get_booking_status("CB-MISSING"), await remote.get_booking_status_async("CB-MISSING"))
+    ]
+    return [name for name, local, fetched in cases if _stable(local) != _stable(fetched)]
+
+
+async def _burst(requests: int, concurrency: int) -> tuple:
+    lookups = [
+        lambda: remote.cruise_package_api_async("CAR001", party_size=2),
+        lambda: remote.calendar_api_async("MED002", "2024-01-01", "2024-12-31"),
+        lambda: remote.cruise_entitlements_api_async("CAR001", "Suite", 2)
+    ]
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(position: int) -> None:
+        nonlocal errors
+        async with slots:
+            started = time.perf_counter()
+            result = await lookups[position % len(lookups)]()
+            latencies.append(time.perf_counter() - started)
+            errors += "error" in result
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(position) for position in range(requests)))
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+async def _run(args) -> int:
+    failures = [f"{name} differs from the synchronous tool" for name in await _parity()]
+    elapsed, latencies, errors = await _burst(args.requests, args.concurrency)
+    if errors:
+        failures.append(f"{errors} lookups returned errors")
+
+    print(f"backend: {get_cruise_api_client().base_url}")
+    print(f"{args.requests} lookups, concurrency {args.concurrency}: {args.requests / elapsed:.0f} req/s, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"client: {get_cruise_api_client().stats()}")
+    await close_cruise_api_client()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="lookups in the concurrent burst")
+    parser.add_argument("--concurrency", type=int, default=100, help="lookups in flight at once")
+    parser.add_argument("--base-url", help="use a running backend instead of the in-process one")
+    args = parser.parse_args()
+
+    if args.base_url:
+        configure_cruise_api(base_url=args.base_url)
+    else:
+        configure_cruise_api(base_url="http://cruise-backend", transport=httpx.ASGITransport(app=create_app()))
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
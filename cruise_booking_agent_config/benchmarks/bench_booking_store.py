@@ -0,0 +1,219 @@
+"""
+Sustained-rate benchmark for the SQLite booking store.
+
+Several worker processes (each with its own group-committing writer, as when
+the booking agent runs in multiple workers) book through cruise_booking_api
+against one database at a target rate while reader threads poll
+confirmations. Each worker runs its bookings concurrently on one event loop,
+as ADK runs tool calls, and times how late a 1ms ticker on that loop wakes
+up, so a tool that blocks the loop while waiting for its commit shows up as
+stalls. Every request is submitted by two workers to exercise cross-worker
+idempotency. Reports booking throughput, booking latency percentiles, batch
+sizes, event loop stalls and reader latency, then checks that every
+confirmation handed out is in the database exactly once.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.bench_booking_store [--processes 4] [--rate 2000] [--seconds 5]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List
+
+from cruise_booking_tools.booking_ledger import ledger
+from cruise_booking_tools.booking_store import SQLiteBookingStore, get_booking_store
+from cruise_booking_tools.cruise_booking_api import cruise_booking_api
+
+
+SAILING = ("CAR001", "2024-06-15", "BAL")
+
+# Interval of the ticker that measures event loop stalls
+TICK = 0.001
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _book_all(worker: int, args: argparse.Namespace, report: Dict[str, Any]) -> None:
+    """Submit this worker's requests at its share of the target rate."""
+    stop = asyncio.Event()
+
+    async def tick() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            report["stalls"].append(time.perf_counter() - started - TICK)
+
+    # Bound in-flight requests so an unthrottled run doesn't queue past the deadline
+    in_flight = asyncio.Semaphore(args.in_flight)
+
+    async def book(request: int) -> None:
+        try:
+            started = time.perf_counter()
+            booking = await cruise_booking_api(
+                itinerary_id=SAILING[0],
+                cabin_code=SAILING[2],
+                departure_date=SAILING[1],
+                passenger_details=[{"name": f"Guest {request}"}, {"name": f"Guest {request} companion"}],
+                contact_info={"email": f"guest{request}@example.com"},
+                idempotency_key=f"request-{request}"
+            )
+            report["latencies"].append(time.perf_counter() - started)
+            if "error" in booking:
+                report["errors"].append(f"request {request}: {booking['error']}")
+                return
+            report["confirmations"][request] = booking["confirmation_number"]
+            report["committed"].append(booking["confirmation_number"])
+        finally:
+            in_flight.release()
+
+    ticker = asyncio.create_task(tick())
+    tasks = set()
+    # Workers pair up on request ids so each request is submitted twice
+    interval = args.processes / args.rate if args.rate else 0.0
+    requests = range(worker // 2, args.rate * args.seconds, (args.processes + 1) // 2) if args.rate \
+        else range(worker // 2, 10 ** 9, (args.processes + 1) // 2)
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    for sent, request in enumerate(requests):
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        if interval:
+            delay = started + sent * interval - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await in_flight.acquire()
+        task = asyncio.create_task(book(request))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    report["elapsed"] = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+
+def _worker(worker: int, args: argparse.Namespace, results: "multiprocessing.Queue") -> None:
+    os.environ["CRUISE_BOOKING_DB_PATH"] = args.db
+    os.environ["CRUISE_BOOKING_DB_MAX_BATCH"] = str(args.max_batch)
+    os.environ["CRUISE_BOOKING_DB_MAX_DELAY_MS"] = str(args.max_delay_ms)
+    store = get_booking_store()
+    # Measure the store, not sell-outs
+    ledger.set_inventory(SAILING, 10 ** 9)
+    report: Dict[str, Any] = {
+        "worker": worker,
+        "latencies": [],
+        "stalls": [],
+        "read_latencies": [],
+        "confirmations": {},
+        "committed": [],
+        "errors": []
+    }
+    stop = threading.Event()
+
+    def read_loop() -> None:
+        while not stop.is_set():
+            numbers = report["committed"][-50:]
+            for number in numbers:
+                started = time.perf_counter()
+                store.get(number)
+                report["read_latencies"].append(time.perf_counter() - started)
+            time.sleep(0.001)
+
+    readers = [threading.Thread(target=read_loop, daemon=True) for _ in range(args.readers)]
+    for reader in readers:
+        reader.start()
+    asyncio.run(_book_all(worker, args, report))
+    stop.set()
+    for reader in readers:
+        reader.join()
+    # Worker processes exit without running atexit handlers
+    store.close()
+    del report["committed"]
+    report["stats"] = store.stats()
+    results.put(report)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=4, help="worker processes sharing the database")
+    parser.add_argument("--rate", type=int, default=2000, help="target bookings/s across workers (0 = unthrottled)")
+    parser.add_argument("--seconds", type=int, default=5, help="duration of the run")
+    parser.add_argument("--in-flight", type=int, default=32, help="concurrent bookings per worker")
+    parser.add_argument("--readers", type=int, default=2, help="reader threads per worker")
+    parser.add_argument("--max-batch", type=int, default=256, help="bookings per group commit")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="longest wait to fill a batch")
+    parser.add_argument("--db", default=None, help="database path (defaults to a temporary file)")
+    args = parser.parse_args()
+
+    directory = None
+    if args.db is None:
+        directory = tempfile.TemporaryDirectory()
+        args.db = os.path.join(directory.name, "bookings.db")
+    SQLiteBookingStore(args.db).close()
+
+    results: "multiprocessing.Queue" = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_worker, args=(worker, args, results))
+        for worker in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    latencies = [sample for report in reports for sample in report["latencies"]]
+    stalls = [sample for report in reports for sample in report["stalls"]]
+    read_latencies = [sample for report in reports for sample in report["read_latencies"]]
+    commits = sum(report["stats"]["commits"] for report in reports)
+    rows = sum(report["stats"]["rows_written"] for report in reports)
+    elapsed = max(report["elapsed"] for report in reports)
+
+    failures = [error for report in reports for error in report["errors"]]
+    confirmed: Dict[int, str] = {}
+    for report in reports:
+        for request, number in report["confirmations"].items():
+            first = confirmed.setdefault(request, number)
+            if first != number:
+                failures.append(f"request {request} got two confirmations: {first}, {number}")
+
+    connection = sqlite3.connect(args.db)
+    stored = dict(connection.execute("SELECT idempotency_key, confirmation_number FROM bookings"))
+    connection.close()
+    if len(stored) != len(confirmed):
+        failures.append(f"{len(stored)} rows stored for {len(confirmed)} distinct requests")
+    lost = [request for request, number in confirmed.items() if stored.get(f"request-{request}") != number]
+    if lost:
+        failures.append(f"{len(lost)} confirmations missing from the database")
+
+    print(f"{rows} submissions from {args.processes} workers in {elapsed:.2f}s "
+          f"({rows / elapsed:,.0f}/s, target {args.rate or 'unthrottled'})")
+    print(f"{len(confirmed)} distinct bookings, {commits} commits (average batch {rows / max(commits, 1):.1f})")
+    print(f"booking latency ms: p50 {_percentile(latencies, 0.5) * 1000:.2f} "
+          f"p95 {_percentile(latencies, 0.95) * 1000:.2f} p99 {_percentile(latencies, 0.99) * 1000:.2f}")
+    print(f"loop stall ms:      p50 {_percentile(stalls, 0.5) * 1000:.3f} "
+          f"p99 {_percentile(stalls, 0.99) * 1000:.3f} max {max(stalls, default=0.0) * 1000:.3f}")
+    print(f"read latency ms:    p50 {_percentile(read_latencies, 0.5) * 1000:.3f} "
+          f"p99 {_percentile(read_latencies, 0.99) * 1000:.3f} ({len(read_latencies)} reads)")
+
+    if directory is not None:
+        directory.cleanup()
+    for failure in failures[:20]:
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for date_resolver_tool.
+
+Measures per-call latency of the compiled grammar with the cache bypassed,
+then replays a conversation-like workload (a small set of phrasings asked
+over and over, with a few reference dates) through the cached tool and
+reports latency and cache hit rate.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.bench_date_resolver [--calls 200000]
+"""
+import argparse
+import random
+import sys
+import time
+
+from cruise_booking_tools.date_resolver_tool import (
+    date_resolver_tool,
+    normalize_expression,
+    resolve_expression
+)
+
+
+EXPRESSIONS = [
+    "next summer", "Next Winter", "this spring", "autumn 2026", "in 3 months", "in two weeks",
+    "10 days from now", "next month", "next weekend", "next friday", "late December",
+    "mid-jan 2026", "from june to august", "between 2025-06-01 and 2025-06-15",
+    "november to february", "2025-07-04", "sometime in march", "We may go in July",
+    "around the holidays", "as soon as possible"
+]
+
+REFERENCE_DATES = ["2025-01-15", "2025-01-16", "2025-01-17"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200000, help="tool calls in the cached workload")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for the workload")
+    args = parser.parse_args()
+
+    uncached = resolve_expression.__wrapped__
+    normalized = [normalize_expression(expression) for expression in EXPRESSIONS]
+    rounds = max(1, args.calls // (10 * len(normalized)))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for expression in normalized:
+            uncached(expression, REFERENCE_DATES[0])
+    uncached_us = (time.perf_counter() - started) / (rounds * len(normalized)) * 1e6
+
+    rng = random.Random(args.seed)
+    workload = [(rng.choice(EXPRESSIONS), rng.choice(REFERENCE_DATES)) for _ in range(args.calls)]
+    resolve_expression.cache_clear()
+    started = time.perf_counter()
+    for expression, reference_date in workload:
+        date_resolver_tool(expression, reference_date)
+    cached_us = (time.perf_counter() - started) / args.calls * 1e6
+    info = resolve_expression.cache_info()
+    hit_rate = info.hits / (info.hits + info.misses)
+
+    print(f"grammar only (no cache): {uncached_us:.2f} us/call over {rounds * len(normalized)} calls")
+    print(f"tool with cache:         {cached_us:.2f} us/call over {args.calls} calls")
+    print(f"cache: {info.hits} hits, {info.misses} misses, hit rate {hit_rate:.2%}, "
+          f"size {info.currsize}/{info.maxsize}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Burst benchmark for error_logger_tool and its background log sink.
+
+Many threads log errors at once, optionally while the disk is slow (to
+mimic a backend outage), and the per-call latency seen by the agents is
+reported together with what the sink wrote, dropped and rotated. Error IDs
+are checked to be unique and increasing.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.bench_error_logger [--errors 50000] [--threads 16] [--write-delay-ms 0]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--errors", type=int, default=50000, help="errors logged in the burst")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent logging threads")
+    parser.add_argument("--write-delay-ms", type=float, default=0.0, help="extra delay per batch write")
+    parser.add_argument("--policy", choices=["drop", "block"], default="drop", help="backpressure policy")
+    parser.add_argument("--queue-size", type=int, default=10000, help="sink buffer size")
+    parser.add_argument("--max-bytes", type=int, default=1024 * 1024, help="rotate log files at this size")
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    os.environ["ERROR_LOG_FILE"] = os.path.join(directory.name, "errors.jsonl")
+    os.environ["ERROR_LOG_BACKPRESSURE"] = args.policy
+    os.environ["ERROR_LOG_QUEUE_SIZE"] = str(args.queue_size)
+    os.environ["ERROR_LOG_MAX_BYTES"] = str(args.max_bytes)
+    os.environ["ERROR_LOG_BACKUP_COUNT"] = "1000"
+
+    from cruise_booking_tools.error_logger_tool import error_logger_tool
+    from cruise_booking_tools.log_sink import get_error_sink
+
+    sink = get_error_sink()
+    if args.write_delay_ms:
+        write_batch = sink._write_batch
+
+        def slow_write_batch(records):
+            time.sleep(args.write_delay_ms / 1000)
+            write_batch(records)
+
+        sink._write_batch = slow_write_batch
+
+    def log(request: int):
+        started = time.perf_counter()
+        result = error_logger_tool(
+            error_type="API_FAILURE",
+            error_message=f"Cruise search API timeout #{request}",
+            agent_name="CruiseSearchAgent",
+            context={"attempt": request % 3, "endpoint": "/search"},
+            severity="medium"
+        )
+        return time.perf_counter() - started, result["error_id"]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(log, range(args.errors)))
+    elapsed = time.perf_counter() - started
+    sink.flush()
+    stats = sink.stats()
+
+    failures = []
+    latencies = [latency for latency, _ in results]
+    ids = [error_id for _, error_id in results]
+    if len(set(ids)) != len(ids):
+        failures.append(f"{len(ids) - len(set(ids))} duplicate error IDs")
+    if sorted(ids) != sorted(ids, key=lambda error_id: error_id.split("_")[1:4]):
+        failures.append("error IDs do not sort by time")
+    if stats["written"] + stats["dropped"] != args.errors:
+        failures.append(f"written {stats['written']} + dropped {stats['dropped']} != {args.errors}")
+
+    files = [name for name in os.listdir(directory.name) if name.startswith("errors.jsonl")]
+    lines = 0
+    for name in files:
+        with open(os.path.join(directory.name, name), encoding="utf-8") as handle:
+            lines += sum(1 for _ in handle)
+    if lines != stats["written"]:
+        failures.append(f"{lines} lines on disk, sink reports {stats['written']} written")
+
+    print(f"{args.errors} errors from {args.threads} threads in {elapsed:.2f}s ({args.errors / elapsed:,.0f}/s), "
+          f"policy {args.policy}, write delay {args.write_delay_ms}ms")
+    print(f"call latency us: p50 {_percentile(latencies, 0.5) * 1e6:.1f} p99 {_percentile(latencies, 0.99) * 1e6:.1f} "
+          f"max {max(latencies) * 1e6:.1f}")
+    print(f"written {stats['written']} in {stats['batches']} batches, dropped {stats['dropped']}, "
+          f"{stats['rotations']} rotations across {len(files)} files")
+
+    sink.close()
+    directory.cleanup()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
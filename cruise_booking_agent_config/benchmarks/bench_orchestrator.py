@@ -0,0 +1,197 @@
+"""
+Offline end-to-end benchmark of the CruiseBookingOrchestrator agent tree.
+
+Loads root_agent.yaml with its four sub-agents, swaps every agent's model
+for a ScriptedLlm replaying a fixed booking conversation, and measures what
+ADK routing, state handling, callbacks and our tools cost without any
+model latency:
+
+- per-turn overhead of the three-turn conversation, one session at a time
+- agent-transfer cost: a turn the orchestrator answers itself vs. one it
+  transfers to IntentUnderstandingAgent
+- throughput and turn latency across many concurrent sessions
+- memory retained per session (tracemalloc)
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.bench_orchestrator [--sessions 300] [--turns 200]
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+
+from google.adk.agents import config_agent_utils
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from scripted_llm import register_script
+
+
+APP_NAME = "cruise_booking_bench"
+
+
+def _transfer(agent_name: str):
+    return {"function_call": {"name": "transfer_to_agent", "args": {"agent_name": agent_name}}}
+
+
+# (guest message, reply expected to end the turn)
+CONVERSATION = [
+    ("Hi! We're a family of 4 looking for a balcony cabin next summer, around $3,000 per person.",
+     "Next summer for four guests in a balcony cabin - let me find some options."),
+    ("Great, show me some options.", "Here are the best three cruises for your family."),
+    ("Book the first one please.", "You're booked! Your confirmation number is in the booking details.")
+]
+
+CONVERSATION_SCRIPT = {
+    "CruiseBookingOrchestrator": [_transfer("IntentUnderstandingAgent")],
+    "IntentUnderstandingAgent": [
+        {"function_call": {"name": "date_resolver_tool", "args": {"time_expression": "next summer"}}},
+        {"text": CONVERSATION[0][1]},
+        _transfer("CruiseSearchAgent")
+    ],
+    "CruiseSearchAgent": [
+        {"function_call": {"name": "cruise_cards_api", "args": {
+            "party_size": 4, "cabin_types": ["Balcony"], "top_k": 3, "months_ahead": 6
+        }}},
+        {"text": CONVERSATION[1][1]},
+        _transfer("CruiseBookingAgent")
+    ],
+    "CruiseBookingAgent": [
+        {"function_call": {"name": "cruise_booking_api", "args": {
+            "itinerary_id": "CAR001",
+            "cabin_code": "BAL",
+            "passenger_details": [{"name": f"Guest {guest}"} for guest in range(4)],
+            "contact_info": {"email": "family@example.com"}
+        }}},
+        {"text": CONVERSATION[2][1]}
+    ]
+}
+
+DIRECT_SCRIPT = {"CruiseBookingOrchestrator": [{"text": "Welcome aboard!"}]}
+TRANSFER_SCRIPT = {
+    "CruiseBookingOrchestrator": [_transfer("IntentUnderstandingAgent")],
+    "IntentUnderstandingAgent": [{"text": "Welcome aboard!"}]
+}
+
+
+def _use_model(agent, model: str) -> None:
+    agent.model = model
+    for sub_agent in agent.sub_agents:
+        _use_model(sub_agent, model)
+
+
+def _message(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+async def _turn(runner: Runner, session_id: str, text: str) -> tuple:
+    """Run one turn; returns (seconds, events, final reply text)."""
+    started = time.perf_counter()
+    events = 0
+    reply = None
+    async for event in runner.run_async(user_id="guest", session_id=session_id, new_message=_message(text)):
+        events += 1
+        if event.content and event.content.parts and event.content.parts[0].text:
+            reply = event.content.parts[0].text
+    return time.perf_counter() - started, events, reply
+
+
+async def _conversation(runner: Runner, failures: list) -> list:
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id="guest")
+    timings = []
+    for text, expected in CONVERSATION:
+        elapsed, events, reply = await _turn(runner, session.id, text)
+        timings.append((elapsed, events))
+        if reply != expected:
+            failures.append(f"expected {expected!r}, got {reply!r}")
+    return timings
+
+
+def _percentile(ordered, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def _ms(ordered) -> str:
+    return (f"p50 {_percentile(ordered, 0.5) * 1000:.2f} ms, p95 {_percentile(ordered, 0.95) * 1000:.2f} ms, "
+            f"p99 {_percentile(ordered, 0.99) * 1000:.2f} ms")
+
+
+async def _single_turns(root, model: str, turns: int) -> list:
+    _use_model(root, model)
+    runner = Runner(app_name=APP_NAME, agent=root, session_service=InMemorySessionService())
+    timings = []
+    for _ in range(turns):
+        session = await runner.session_service.create_session(app_name=APP_NAME, user_id="guest")
+        timings.append((await _turn(runner, session.id, "Hello"))[0])
+    return sorted(timings)
+
+
+async def _run(args) -> int:
+    root = config_agent_utils.from_config("root_agent.yaml")
+    failures: list = []
+
+    # Sequential conversations: per-turn overhead
+    _use_model(root, register_script("conversation", CONVERSATION_SCRIPT))
+    runner = Runner(app_name=APP_NAME, agent=root, session_service=InMemorySessionService())
+    await _conversation(runner, failures)
+    sequential = [[] for _ in CONVERSATION]
+    events = [0] * len(CONVERSATION)
+    for _ in range(max(1, args.turns // len(CONVERSATION))):
+        for position, (elapsed, count) in enumerate(await _conversation(runner, failures)):
+            sequential[position].append(elapsed)
+            events[position] = count
+    print("per-turn overhead, one session at a time:")
+    for position, timings in enumerate(sequential):
+        print(f"  turn {position + 1} ({events[position]} events): {_ms(sorted(timings))}")
+
+    # Agent transfer cost
+    direct = await _single_turns(root, register_script("direct", DIRECT_SCRIPT), args.turns)
+    transfer = await _single_turns(root, register_script("transfer", TRANSFER_SCRIPT), args.turns)
+    print(f"orchestrator answers directly:   {_ms(direct)}")
+    print(f"orchestrator transfers to agent: {_ms(transfer)}")
+    print(f"transfer cost (p50 difference):  {(_percentile(transfer, 0.5) - _percentile(direct, 0.5)) * 1000:.2f} ms")
+
+    # Concurrent sessions, then memory retained per session
+    _use_model(root, "scripted/conversation")
+    for measure_memory in (False, True):
+        runner = Runner(app_name=APP_NAME, agent=root, session_service=InMemorySessionService())
+        if measure_memory:
+            gc.collect()
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_conversation(runner, failures) for _ in range(args.sessions)))
+        elapsed = time.perf_counter() - started
+        if measure_memory:
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"memory: {(current - baseline) / args.sessions / 1024:.1f} KiB retained per session, "
+                  f"peak {(peak - baseline) / 1024 / 1024:.1f} MiB for {args.sessions} sessions")
+        else:
+            turns = sorted(elapsed for timings in results for elapsed, _ in timings)
+            print(f"{args.sessions} concurrent sessions: {len(turns) / elapsed:.0f} turns/s, turn latency {_ms(turns)}")
+
+    for failure in sorted(set(failures)):
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=300, help="concurrent sessions")
+    parser.add_argument("--turns", type=int, default=200, help="turns per sequential measurement")
+    args = parser.parse_args()
+
+    # ADK warns about every tool declaration it builds; keep the report readable
+    logging.getLogger("google_adk").setLevel(logging.ERROR)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Benchmark for preference_extractor_tool on long pasted messages.
+
+Guests paste whole emails, reviews or previous chat transcripts; this
+measures extraction time and throughput as the message grows, and checks
+that the result is the same however much filler surrounds the preferences.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.bench_preference_extractor [--sizes 1 10 100 1000] [--repeat 20]
+"""
+import argparse
+import sys
+import time
+
+from cruise_booking_tools.preference_extractor_tool import preference_extractor_tool
+
+
+REQUEST = (
+    "We're a family of four (2 adults, 2 kids) hoping for a 7-night Royal Caribbean or Celebrity "
+    "cruise to the Bahamas or Cozumel, balcony or suite, budget around $3,500 per person. "
+    "We love fine dining, shows and the spa; one of us is vegetarian and we need wheelchair access. "
+)
+
+FILLER = (
+    "Last year we took a road trip along the coast, stopped at a few towns, read a lot of reviews "
+    "and compared prices for hotels and flights before deciding to look at something different. "
+)
+
+
+def _message(kilobytes: int) -> str:
+    filler = FILLER * max(1, (kilobytes * 1024 - len(REQUEST)) // len(FILLER))
+    middle = len(filler) // 2
+    return filler[:middle] + REQUEST + filler[middle:]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000], help="message sizes in KB")
+    parser.add_argument("--repeat", type=int, default=20, help="calls per size")
+    args = parser.parse_args()
+
+    expected = preference_extractor_tool(REQUEST)
+    failures = []
+    print(f"{'size':>8}  {'ms/call':>9}  {'MB/s':>7}")
+    for kilobytes in args.sizes:
+        message = _message(kilobytes)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            result = preference_extractor_tool(message)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        if result != expected:
+            failures.append(f"{kilobytes} KB message extracted {result}")
+        print(f"{kilobytes:>6}KB  {elapsed * 1000:>9.3f}  {len(message) / elapsed / 1e6:>7.1f}")
+
+    print(f"extracted: {expected}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
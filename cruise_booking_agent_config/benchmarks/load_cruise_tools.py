@@ -0,0 +1,191 @@
+"""
+Load generator for the async cruise tools against a simulated backend.
+
+Runs N concurrent guest sessions for a fixed time. Each session searches,
+fetches the package and sailing calendar of one result concurrently, looks
+up entitlements and sometimes books and checks the booking. Reports
+throughput and p50/p95/p99 latency per tool, as seen by the agent through
+the pooled client (including time queued for a connection).
+
+By default the backend runs in-process through httpx.ASGITransport with the
+default simulation profile; pass --base-url to drive a backend started with
+`python -m cruise_backend --simulate`.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.load_cruise_tools [--sessions 50] [--seconds 20] [--profile profile.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from cruise_backend.app import create_app
+from cruise_backend.simulation import SimulationMiddleware, load_profile
+from cruise_booking_tools import async_cruise_tools as remote
+from cruise_booking_tools.cruise_api_client import (
+    close_cruise_api_client,
+    configure_cruise_api,
+    get_cruise_api_client
+)
+
+
+ACTIVITIES = ["spa", "fine dining", "snorkeling", "shows", "hiking", "family", "nightlife", "history"]
+# (cabin type as listed in packages, cabin code for bookings)
+CABINS = [("Interior", "INT"), ("Oceanview", "OV"), ("Balcony", "BAL"), ("Suite", "SUITE")]
+
+# Errors caused by the backend rather than by the request; everything else is a business answer
+BACKEND_ERRORS = {
+    "Cruise backend timed out",
+    "Cruise backend unavailable",
+    "Cruise backend error",
+    "Cruise backend returned an invalid response",
+    "Service temporarily unavailable",
+    "Rate limit exceeded"
+}
+
+
+def _percentile(ordered, fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class Recorder:
+    """Per-tool latencies and outcomes."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.backend_errors = defaultdict(int)
+        self.business_errors = defaultdict(int)
+        self.error_kinds = defaultdict(int)
+
+    async def call(self, tool: str, request):
+        started = time.perf_counter()
+        result = await request
+        self.latencies[tool].append(time.perf_counter() - started)
+        error = result.get("error")
+        if error in BACKEND_ERRORS:
+            self.backend_errors[tool] += 1
+            self.error_kinds[error] += 1
+        elif error:
+            self.business_errors[tool] += 1
+        if result.get("retry_after"):
+            # Back off as a well-behaved client would instead of hammering a rate-limited service
+            await asyncio.sleep(result["retry_after"])
+        return result
+
+
+async def _session(session: int, recorder: Recorder, deadline: float, args, completed: list) -> None:
+    rng = random.Random(args.seed * 100003 + session)
+    visit = 0
+    while time.perf_counter() < deadline:
+        visit += 1
+        search = await recorder.call("search", remote.cruise_semantic_search_api_async(
+            activities=rng.sample(ACTIVITIES, 2), fields=["card"], limit=3
+        ))
+        results = search.get("results") or []
+        if results:
+            itinerary_id = rng.choice(results)["itinerary_id"]
+            cabin_type, cabin_code = rng.choice(CABINS)
+            party_size = rng.randint(1, 4)
+            await asyncio.gather(
+                recorder.call("packages", remote.cruise_package_api_async(itinerary_id, [cabin_type], party_size)),
+                recorder.call("calendar", remote.calendar_api_async(itinerary_id, "2024-01-01", "2024-12-31"))
+            )
+            await recorder.call("entitlements", remote.cruise_entitlements_api_async(
+                itinerary_id, cabin_type, party_size, rng.sample(ACTIVITIES, 2)
+            ))
+            if rng.random() < args.book_fraction:
+                booking = await recorder.call("booking", remote.cruise_booking_api_async(
+                    itinerary_id,
+                    cabin_code,
+                    [{"name": f"Guest {session}-{visit}-{guest}"} for guest in range(party_size)],
+                    {"email": f"guest{session}@example.com"},
+                    idempotency_key=f"load-{args.seed}-{session}-{visit}"
+                ))
+                if "confirmation_number" in booking:
+                    await recorder.call("booking_status", remote.get_booking_status_async(booking["confirmation_number"]))
+            completed[0] += 1
+        if args.think_ms:
+            await asyncio.sleep(rng.expovariate(1000 / args.think_ms))
+
+
+async def _run(args, simulation) -> int:
+    recorder = Recorder()
+    completed = [0]
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    await asyncio.gather(*(_session(session, recorder, deadline, args, completed) for session in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    client = get_cruise_api_client()
+    if simulation is None:
+        response = await client.request("GET", "/simulation/stats")
+        backend_stats = None if "error" in response else response
+    else:
+        backend_stats = simulation.stats()
+    await close_cruise_api_client()
+
+    calls = sum(len(latencies) for latencies in recorder.latencies.values())
+    backend_errors = sum(recorder.backend_errors.values())
+    print(f"backend: {client.base_url}, {args.sessions} sessions for {elapsed:.1f}s, "
+          f"per-host limit {client.per_host_limit}")
+    print(f"{'tool':<15}{'calls':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for tool, latencies in recorder.latencies.items():
+        ordered = sorted(latencies)
+        print(f"{tool:<15}{len(ordered):>8}{recorder.backend_errors[tool]:>8}"
+              f"{_percentile(ordered, 0.50) * 1000:>10.1f}{_percentile(ordered, 0.95) * 1000:>10.1f}"
+              f"{_percentile(ordered, 0.99) * 1000:>10.1f}{ordered[-1] * 1000:>10.1f}")
+    print(f"throughput: {calls / elapsed:.1f} calls/s, {completed[0] / elapsed:.1f} sessions/s")
+    print(f"backend errors: {backend_errors}/{calls} ({backend_errors / max(calls, 1):.2%}) {dict(recorder.error_kinds)}")
+    print(f"business errors (not found, sold out, ...): {sum(recorder.business_errors.values())}")
+    if backend_stats is not None:
+        print(f"simulation: {backend_stats}")
+
+    failures = []
+    if not calls:
+        failures.append("no calls completed")
+    elif backend_errors / calls > args.max_error_rate:
+        failures.append(f"backend error rate above {args.max_error_rate:.2%}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent guest sessions")
+    parser.add_argument("--seconds", type=float, default=20, help="test duration")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a session's visits")
+    parser.add_argument("--book-fraction", type=float, default=0.2, help="share of visits that end in a booking")
+    parser.add_argument("--per-host-limit", type=int, default=20, help="client requests in flight per host")
+    parser.add_argument("--max-error-rate", type=float, default=0.05, help="fail above this backend error rate")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for sessions and simulation")
+    parser.add_argument("--base-url", help="drive a running backend instead of an in-process one")
+    parser.add_argument("--profile", help="JSON simulation profile for the in-process backend")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every simulated latency")
+    parser.add_argument("--no-simulation", action="store_true", help="in-process backend without latency or errors")
+    args = parser.parse_args()
+
+    os.environ["CRUISE_API_PER_HOST_LIMIT"] = str(args.per_host_limit)
+    os.environ["CRUISE_API_MAX_CONNECTIONS"] = str(max(100, args.per_host_limit))
+    simulation = None
+    if args.base_url:
+        configure_cruise_api(base_url=args.base_url)
+    else:
+        app = create_app()
+        if not args.no_simulation:
+            app = simulation = SimulationMiddleware(
+                app, load_profile(args.profile), seed=args.seed, latency_scale=args.latency_scale
+            )
+        configure_cruise_api(base_url="http://cruise-backend", transport=httpx.ASGITransport(app=app))
+    return asyncio.run(_run(args, simulation))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Concurrency stress test for the booking inventory ledger.
+
+Runs thousands of parallel cruise_booking_api calls, including retries of
+the same request, against a few sailings with limited inventory and checks
+that no sailing is oversold and every retry returns the original booking.
+Calls run on many threads at once (each with its own event loop) so the
+ledger's locks are contended.
+
+Run from cruise_booking_agent_config:
+    python -m benchmarks.stress_booking_ledger [--bookings 5000] [--workers 64]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from cruise_booking_tools.booking_ledger import ledger
+from cruise_booking_tools.cruise_booking_api import cruise_booking_api, get_booking_status
+
+
+SAILINGS = [
+    ("CAR001", "2024-06-15", "SUITE"),
+    ("CAR001", "2024-06-22", "BAL"),
+    ("MED002", "2024-07-20", "INT")
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=5000, help="number of distinct booking requests")
+    parser.add_argument("--retries", type=int, default=2, help="extra submissions of each request")
+    parser.add_argument("--capacity", type=int, default=500, help="cabins per sailing")
+    parser.add_argument("--workers", type=int, default=64, help="concurrent threads")
+    args = parser.parse_args()
+
+    for sailing in SAILINGS:
+        ledger.set_inventory(sailing, args.capacity)
+
+    def book(request: int):
+        itinerary_id, departure_date, cabin_code = SAILINGS[request % len(SAILINGS)]
+        return request, asyncio.run(cruise_booking_api(
+            itinerary_id=itinerary_id,
+            cabin_code=cabin_code,
+            departure_date=departure_date,
+            passenger_details=[{"name": f"Guest {request}"}],
+            contact_info={"email": f"guest{request}@example.com"}
+        ))
+
+    submissions = [request for request in range(args.bookings) for _ in range(1 + args.retries)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(book, submissions))
+    elapsed = time.perf_counter() - started
+
+    confirmations = {}
+    failures = []
+    sold_out = Counter()
+    for request, result in results:
+        if "error" in result:
+            sold_out[request] += 1
+            continue
+        first = confirmations.setdefault(request, result["confirmation_number"])
+        if first != result["confirmation_number"]:
+            failures.append(f"request {request} got two confirmations: {first}, {result['confirmation_number']}")
+
+    booked = Counter(SAILINGS[request % len(SAILINGS)] for request in confirmations)
+    for sailing in SAILINGS:
+        if booked[sailing] + ledger.remaining(sailing) != args.capacity:
+            failures.append(f"{sailing}: {booked[sailing]} booked + {ledger.remaining(sailing)} left != {args.capacity}")
+        if booked[sailing] > args.capacity:
+            failures.append(f"{sailing} oversold: {booked[sailing]} > {args.capacity}")
+
+    for request in sold_out:
+        if request in confirmations:
+            failures.append(f"request {request} was both confirmed and sold out")
+
+    missing = [number for number in confirmations.values() if "error" in get_booking_status(number)]
+    if missing:
+        failures.append(f"{len(missing)} confirmations not found by get_booking_status")
+
+    print(f"{len(submissions)} submissions in {elapsed:.2f}s ({len(submissions) / elapsed:,.0f}/s) "
+          f"with {args.workers} workers")
+    print(f"confirmed {len(confirmations)} bookings, {len(sold_out)} requests sold out")
+    for sailing in SAILINGS:
+        print(f"  {' '.join(sailing)}: {booked[sailing]} booked, {ledger.remaining(sailing)} left")
+
+    for failure in failures[:20]:
+        print(f"FAIL: {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
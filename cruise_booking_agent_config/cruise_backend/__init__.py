@@ -0,0 +1 @@
+# Stand-in Cruise Backend Package
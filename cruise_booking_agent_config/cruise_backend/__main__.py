@@ -0,0 +1,35 @@
+"""
+Run the stand-in cruise backend.
+
+With --simulate (or --profile), responses get partner-like latency,
+transient errors and rate limits; see cruise_backend.simulation.
+
+Run from cruise_booking_agent_config:
+    python -m cruise_backend [--host 127.0.0.1] [--port 8765] [--simulate] [--profile profile.json] [--seed 7]
+"""
+import argparse
+
+import uvicorn
+
+from .app import create_app
+from .simulation import SimulationMiddleware, load_profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--simulate", action="store_true", help="apply the default latency/error profile")
+    parser.add_argument("--profile", help="JSON simulation profile (implies --simulate)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every simulated latency")
+    parser.add_argument("--seed", type=int, help="random seed for repeatable simulations")
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.simulate or args.profile:
+        app = SimulationMiddleware(app, load_profile(args.profile), seed=args.seed, latency_scale=args.latency_scale)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Stand-in cruise backend serving today's mock data over HTTP.
+
+Each route calls the in-process tool that owns the data, so responses are
+exactly what the tools return. Tool error dictionaries come back
+with a 4xx status. Used by the async tools in tests, benchmarks and local
+runs until the real partner APIs are available.
+"""
+from typing import Dict, Any, Callable, List, Optional
+import inspect
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cruise_booking_tools.calendar_api import calendar_api
+from cruise_booking_tools.cruise_booking_api import cruise_booking_api, get_booking_status
+from cruise_booking_tools.cruise_entitlements_api import book_entitlements_cart, cruise_entitlements_api
+from cruise_booking_tools.cruise_package_api import cruise_package_api
+from cruise_booking_tools.cruise_semantic_search_api import cruise_semantic_search_api
+
+
+class BadRequest(Exception):
+    """A request whose parameters or body the backend cannot use."""
+
+
+def _status(result: Dict[str, Any]) -> int:
+    error = result.get("error")
+    if error is None:
+        return 200
+    return 404 if "not found" in error.lower() else 422
+
+
+async def _respond(tool: Callable[..., Dict[str, Any]], arguments: Dict[str, Any]) -> JSONResponse:
+    """Call a tool with validated arguments; synchronous tools run off the event loop."""
+    try:
+        inspect.signature(tool).bind(**arguments)
+    except TypeError as error:
+        # Unknown parameters or missing required ones
+        raise BadRequest(str(error)) from None
+    if inspect.iscoroutinefunction(tool):
+        result = await tool(**arguments)
+    else:
+        result = await run_in_threadpool(tool, **arguments)
+    return JSONResponse(result, status_code=_status(result))
+
+
+def _int_param(request: Request, name: str) -> Optional[int]:
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer") from None
+
+
+def _list_param(request: Request, name: str) -> Optional[List[str]]:
+    return request.query_params.getlist(name) or None
+
+
+async def _json_body(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("Request body must be JSON") from None
+    if not isinstance(body, dict):
+        raise BadRequest("Request body must be a JSON object")
+    return body
+
+
+async def search_itineraries(request: Request) -> JSONResponse:
+    return await _respond(cruise_semantic_search_api, await _json_body(request))
+
+
+async def itinerary_packages(request: Request) -> JSONResponse:
+    return await _respond(cruise_package_api, {
+        "itinerary_id": request.path_params["itinerary_id"],
+        "cabin_types": _list_param(request, "cabin_types"),
+        "party_size": _int_param(request, "party_size")
+    })
+
+
+async def itinerary_sailings(request: Request) -> JSONResponse:
+    months_ahead = _int_param(request, "months_ahead")
+    return await _respond(calendar_api, {
+        "itinerary_id": request.path_params["itinerary_id"],
+        "start_date": request.query_params.get("start_date"),
+        "end_date": request.query_params.get("end_date"),
+        "months_ahead": 6 if months_ahead is None else months_ahead
+    })
+
+
+async def itinerary_entitlements(request: Request) -> JSONResponse:
+    passenger_count = _int_param(request, "passenger_count")
+    cabin_type = request.query_params.get("cabin_type")
+    if passenger_count is None or cabin_type is None:
+        raise BadRequest("cabin_type and passenger_count are required")
+    return await _respond(cruise_entitlements_api, {
+        "itinerary_id": request.path_params["itinerary_id"],
+        "cabin_type": cabin_type,
+        "passenger_count": passenger_count,
+        "preferences": _list_param(request, "preferences")
+    })
+
+
+async def entitlements_cart(request: Request) -> JSONResponse:
+    body = await _json_body(request)
+    return await _respond(book_entitlements_cart, {**body, "itinerary_id": request.path_params["itinerary_id"]})
+
+
+async def create_booking(request: Request) -> JSONResponse:
+    return await _respond(cruise_booking_api, await _json_body(request))
+
+
+async def booking_status(request: Request) -> JSONResponse:
+    return await _respond(get_booking_status, {"confirmation_number": request.path_params["confirmation_number"]})
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok"})
+
+
+async def bad_request(request: Request, exc: Exception) -> JSONResponse:
+    return JSONResponse({"error": "Bad request", "message": str(exc), "path": request.url.path}, status_code=400)
+
+
+def create_app() -> Starlette:
+    """Build the stand-in backend application."""
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/itineraries/search", search_itineraries, methods=["POST"]),
+            Route("/itineraries/{itinerary_id}/packages", itinerary_packages),
+            Route("/itineraries/{itinerary_id}/sailings", itinerary_sailings),
+            Route("/itineraries/{itinerary_id}/entitlements", itinerary_entitlements),
+            Route("/itineraries/{itinerary_id}/entitlements/cart", entitlements_cart, methods=["POST"]),
+            Route("/bookings", create_booking, methods=["POST"]),
+            Route("/bookings/{confirmation_number}", booking_status)
+        ],
+        exception_handlers={BadRequest: bad_request}
+    )
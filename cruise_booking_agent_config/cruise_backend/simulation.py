@@ -0,0 +1,200 @@
+"""
+Latency, error and rate-limit simulation for the stand-in cruise backend.
+
+Each backend service (search, packages, calendar, entitlements, bookings)
+gets a profile: a latency distribution, a probability of answering with a
+transient 503, and an optional token-bucket rate limit answered with 429.
+The middleware applies the profile before the request reaches the route,
+so an injected failure never books anything.
+
+A profile file is JSON mapping service names to settings, e.g.
+    {"search": {"latency": {"distribution": "lognormal", "median_ms": 120, "p99_ms": 600},
+                "error_rate": 0.01, "rate_limit": {"rate": 50, "burst": 100}}}
+Services missing from the file keep their defaults.
+"""
+from typing import Dict, Any, Callable, Optional
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+
+from starlette.responses import JSONResponse
+
+
+SERVICES = ("search", "packages", "calendar", "entitlements", "bookings")
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z99 = 2.3263
+
+# Partner-like defaults; override per service with a profile file
+DEFAULT_PROFILE: Dict[str, Dict[str, Any]] = {
+    "search": {"latency": {"distribution": "lognormal", "median_ms": 120, "p99_ms": 600}, "error_rate": 0.005},
+    "packages": {"latency": {"distribution": "lognormal", "median_ms": 60, "p99_ms": 250}, "error_rate": 0.005},
+    "calendar": {"latency": {"distribution": "lognormal", "median_ms": 40, "p99_ms": 150}, "error_rate": 0.005},
+    "entitlements": {"latency": {"distribution": "lognormal", "median_ms": 50, "p99_ms": 200}, "error_rate": 0.005},
+    "bookings": {"latency": {"distribution": "lognormal", "median_ms": 250, "p99_ms": 1200}, "error_rate": 0.01}
+}
+
+
+# Service behind each /itineraries/{itinerary_id}/<resource> route
+_RESOURCE_SERVICES = {"packages": "packages", "sailings": "calendar", "entitlements": "entitlements"}
+
+
+def service_for(path: str) -> Optional[str]:
+    """Map a request path to the service that would serve it."""
+    if path.startswith("/bookings"):
+        return "bookings"
+    if path == "/itineraries/search":
+        return "search"
+    parts = path.split("/")
+    if len(parts) >= 4 and parts[1] == "itineraries":
+        return _RESOURCE_SERVICES.get(parts[3])
+    return None
+
+
+def latency_sampler(spec: Dict[str, Any], rng: random.Random) -> Callable[[], float]:
+    """
+    Build a sampler returning latencies in seconds.
+
+    Distributions: "none", "fixed" (ms), "uniform" (min_ms, max_ms) and
+    "lognormal" (median_ms, p99_ms), the usual shape of service latency.
+    """
+    distribution = spec.get("distribution", "none")
+    if distribution == "none":
+        return lambda: 0.0
+    if distribution == "fixed":
+        delay = spec["ms"] / 1000
+        return lambda: delay
+    if distribution == "uniform":
+        low, high = spec["min_ms"] / 1000, spec["max_ms"] / 1000
+        return lambda: rng.uniform(low, high)
+    if distribution == "lognormal":
+        mu = math.log(spec["median_ms"] / 1000)
+        sigma = math.log(spec["p99_ms"] / spec["median_ms"]) / _Z99
+        return lambda: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency distribution: {distribution!r}")
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity
+        clock: Monotonic time source
+    """
+
+    def __init__(self, rate: float, burst: float, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token; returns 0 on success, otherwise the seconds until one is available."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class ServiceSimulator:
+    """Latency, error injection and rate limiting for one service."""
+
+    def __init__(self, settings: Dict[str, Any], rng: random.Random, latency_scale: float = 1.0):
+        sample = latency_sampler(settings.get("latency", {}), rng)
+        self.latency = lambda: sample() * latency_scale
+        self.error_rate = settings.get("error_rate", 0.0)
+        limit = settings.get("rate_limit")
+        self.bucket = TokenBucket(limit["rate"], limit.get("burst", limit["rate"])) if limit else None
+        self._rng = rng
+        self.requests = 0
+        self.rate_limited = 0
+        self.injected_errors = 0
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "rate_limited": self.rate_limited, "injected_errors": self.injected_errors}
+
+
+def load_profile(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Return the default profile, with the services in the JSON file at `path` replaced."""
+    profile = {service: dict(settings) for service, settings in DEFAULT_PROFILE.items()}
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            overrides = json.load(handle)
+        unknown = set(overrides) - set(SERVICES)
+        if unknown:
+            raise ValueError(f"Unknown services in profile: {', '.join(sorted(unknown))}")
+        profile.update(overrides)
+    return profile
+
+
+class SimulationMiddleware:
+    """
+    ASGI middleware applying a simulation profile to backend requests.
+
+    GET /simulation/stats returns the per-service counters.
+
+    Args:
+        app: The backend application
+        profile: Settings per service (see load_profile)
+        seed: Random seed, for repeatable runs
+        latency_scale: Multiplier applied to every sampled latency
+    """
+
+    def __init__(self, app, profile: Dict[str, Dict[str, Any]], seed: Optional[int] = None, latency_scale: float = 1.0):
+        self.app = app
+        rng = random.Random(seed)
+        self.services = {
+            service: ServiceSimulator(settings, random.Random(rng.random()), latency_scale)
+            for service, settings in profile.items()
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-service simulation counters."""
+        return {service: simulator.stats() for service, simulator in self.services.items()}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"] == "/simulation/stats":
+            await JSONResponse(self.stats())(scope, receive, send)
+            return
+        simulator = self.services.get(service_for(scope["path"])) if scope["type"] == "http" else None
+        if simulator is None:
+            await self.app(scope, receive, send)
+            return
+
+        simulator.requests += 1
+        if simulator.bucket is not None:
+            retry_after = simulator.bucket.acquire()
+            if retry_after:
+                simulator.rate_limited += 1
+                response = JSONResponse(
+                    {"error": "Rate limit exceeded", "retry_after": round(retry_after, 3), "path": scope["path"]},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+                )
+                await response(scope, receive, send)
+                return
+
+        await asyncio.sleep(simulator.latency())
+        if simulator.should_fail():
+            simulator.injected_errors += 1
+            response = JSONResponse(
+                {"error": "Service temporarily unavailable", "retryable": True, "path": scope["path"]},
+                status_code=503
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,226 @@
+"""
+Async versions of the cruise search, package, calendar, entitlements and booking tools.
+
+Each tool takes the same arguments and returns the same dictionary as its
+synchronous counterpart, but fetches it from the cruise backend through the
+pooled client in cruise_api_client instead of computing it in-process, so
+slow backends never block the agent's event loop. Run the stand-in backend
+with `python -m cruise_backend` to serve today's mock data.
+"""
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote
+
+from .cruise_api_client import get_cruise_api_client
+
+
+def _without_none(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in values.items() if value is not None}
+
+
+async def cruise_semantic_search_api_async(
+    destinations: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    party_size: Optional[int] = None,
+    budget_range: Optional[Dict[str, float]] = None,
+    cruise_lines: Optional[List[str]] = None,
+    activities: Optional[List[str]] = None,
+    duration_preference: Optional[str] = None,
+    top_k: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Search for cruise itineraries based on semantic criteria.
+
+    Args:
+        destinations: List of preferred destinations
+        start_date: Earliest departure date in YYYY-MM-DD format
+        end_date: Latest departure date in YYYY-MM-DD format
+        party_size: Number of passengers
+        budget_range: Budget constraints (min, max, target)
+        cruise_lines: Preferred cruise lines
+        activities: Preferred activities; matching itineraries are ranked by
+            similarity of their highlights and amenities to these activities
+        duration_preference: Preferred cruise duration
+        top_k: Maximum number of ranked results to return when activities are given
+        limit: Page size; when set, `next_cursor` points at the following page
+        cursor: Cursor returned by a previous call with the same criteria
+        fields: Fields to return for each result ("card" for a compact cruise card);
+            itinerary_id is always included. Defaults to all fields
+
+    Returns:
+        Dictionary containing search results
+    """
+    return await get_cruise_api_client().request("POST", "/itineraries/search", json=_without_none({
+        "destinations": destinations,
+        "start_date": start_date,
+        "end_date": end_date,
+        "party_size": party_size,
+        "budget_range": budget_range,
+        "cruise_lines": cruise_lines,
+        "activities": activities,
+        "duration_preference": duration_preference,
+        "top_k": top_k,
+        "limit": limit,
+        "cursor": cursor,
+        "fields": fields
+    }))
+
+
+async def cruise_package_api_async(
+    itinerary_id: str,
+    cabin_types: Optional[List[str]] = None,
+    party_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Fetch detailed cabin information, pricing, and inclusions for a specific itinerary.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        cabin_types: List of preferred cabin types
+        party_size: Number of passengers; when given, each cabin includes a
+            `party_quote` with exact totals (None if the party exceeds the cabin's occupancy)
+
+    Returns:
+        Dictionary containing detailed package information
+    """
+    return await get_cruise_api_client().request(
+        "GET",
+        f"/itineraries/{quote(itinerary_id, safe='')}/packages",
+        params={"cabin_types": cabin_types, "party_size": party_size}
+    )
+
+
+async def calendar_api_async(
+    itinerary_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    months_ahead: int = 6
+) -> Dict[str, Any]:
+    """
+    Get sailing availability and dates for a specific itinerary.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        start_date: Start date for availability search (YYYY-MM-DD)
+        end_date: End date for availability search (YYYY-MM-DD)
+        months_ahead: Calendar months after the start date to search when no
+            end date is given (default 6)
+
+    Returns:
+        Dictionary containing sailing availability
+    """
+    return await get_cruise_api_client().request(
+        "GET",
+        f"/itineraries/{quote(itinerary_id, safe='')}/sailings",
+        params={"start_date": start_date, "end_date": end_date, "months_ahead": months_ahead}
+    )
+
+
+async def cruise_entitlements_api_async(
+    itinerary_id: str,
+    cabin_type: str,
+    passenger_count: int,
+    preferences: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get available entitlements and add-ons for a cruise booking.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        cabin_type: Type of cabin booked (name such as "Balcony" or code such as "BAL")
+        passenger_count: Number of passengers
+        preferences: List of preferred activity types
+
+    Returns:
+        Dictionary containing available entitlements
+    """
+    return await get_cruise_api_client().request(
+        "GET",
+        f"/itineraries/{quote(itinerary_id, safe='')}/entitlements",
+        params={"cabin_type": cabin_type, "passenger_count": passenger_count, "preferences": preferences}
+    )
+
+
+async def book_entitlements_cart_async(
+    itinerary_id: str,
+    items: List[Dict[str, Any]],
+    passenger_count: int,
+    special_requests: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Book several entitlements and add-ons in one all-or-nothing cart.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        items: Cart items, each {"entitlement_id": str} with optional
+            "passenger_count" (defaults to the party size) and "special_requests"
+        passenger_count: Number of passengers in the party
+        special_requests: Special requests applying to the whole cart
+
+    Returns:
+        Dictionary containing the cart confirmation, or every problem found
+    """
+    return await get_cruise_api_client().request(
+        "POST",
+        f"/itineraries/{quote(itinerary_id, safe='')}/entitlements/cart",
+        json=_without_none({
+            "items": items,
+            "passenger_count": passenger_count,
+            "special_requests": special_requests
+        })
+    )
+
+
+async def cruise_booking_api_async(
+    itinerary_id: str,
+    cabin_code: str,
+    passenger_details: List[Dict[str, Any]],
+    contact_info: Dict[str, str],
+    special_requests: Optional[List[str]] = None,
+    departure_date: Optional[str] = None,
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Finalize cruise booking and create reservation.
+
+    Retrying the same request returns the original booking rather than
+    reserving another cabin, so a request that timed out can be sent again.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        cabin_code: Code of the selected cabin
+        passenger_details: List of passenger information
+        contact_info: Contact information for the booking
+        special_requests: List of special requests
+        departure_date: Sailing departure date in YYYY-MM-DD format
+        idempotency_key: Key identifying this booking request (derived from
+            the request details when omitted)
+
+    Returns:
+        Dictionary containing booking confirmation
+    """
+    return await get_cruise_api_client().request("POST", "/bookings", json=_without_none({
+        "itinerary_id": itinerary_id,
+        "cabin_code": cabin_code,
+        "passenger_details": passenger_details,
+        "contact_info": contact_info,
+        "special_requests": special_requests,
+        "departure_date": departure_date,
+        "idempotency_key": idempotency_key
+    }))
+
+
+async def get_booking_status_async(confirmation_number: str) -> Dict[str, Any]:
+    """
+    Get the current status of a booking.
+
+    Args:
+        confirmation_number: Booking confirmation number
+
+    Returns:
+        Dictionary containing booking status
+    """
+    return await get_cruise_api_client().request("GET", f"/bookings/{quote(confirmation_number, safe='')}")
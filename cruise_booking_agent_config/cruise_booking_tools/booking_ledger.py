@@ -0,0 +1,164 @@
+"""
+In-process inventory ledger and booking store for the booking tools.
+
+Each sailing/cabin pair has its own lock, so concurrent bookings for
+different sailings never contend. Bookings are indexed by confirmation
+number, and retried requests with the same idempotency key return the
+original booking instead of reserving a second cabin.
+
+The ledger lives in one process. Workers sharing a booking store agree on
+confirmations, but each keeps its own inventory counts, so a multi-worker
+deployment can oversell a sailing until inventory moves to a shared service.
+"""
+from typing import Dict, Any, Callable, Optional, Tuple
+import hashlib
+import json
+import threading
+
+
+# Mock cabin inventory per sailing - in real scenario, this would come from the inventory service
+DEFAULT_CABIN_INVENTORY: Dict[str, int] = {
+    "INT": 50,
+    "OV": 40,
+    "BAL": 30,
+    "SUITE": 10
+}
+
+SailingKey = Tuple[str, str, str]
+
+
+class SoldOutError(Exception):
+    """Raised when no cabins of the requested type are left on a sailing."""
+
+
+def idempotency_key_for(*parts: Any) -> str:
+    """Derive a stable idempotency key from the content of a request."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InventoryLedger:
+    """
+    Cabin inventory, bookings and idempotency keys.
+
+    Inventory is keyed by (itinerary_id, departure_date, cabin_code). An
+    idempotency key is scoped to its sailing, so both the check and the
+    reservation happen under that sailing's lock.
+    """
+
+    def __init__(self, default_inventory: Optional[Dict[str, int]] = None):
+        self.default_inventory = dict(default_inventory or DEFAULT_CABIN_INVENTORY)
+        self._remaining: Dict[SailingKey, int] = {}
+        self._idempotency: Dict[Tuple[SailingKey, str], str] = {}
+        self._bookings: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[SailingKey, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, sailing: SailingKey) -> threading.Lock:
+        lock = self._locks.get(sailing)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(sailing, threading.Lock())
+        return lock
+
+    def set_inventory(self, sailing: SailingKey, cabins: int) -> None:
+        """Set the number of cabins left on a sailing."""
+        with self._lock_for(sailing):
+            self._remaining[sailing] = cabins
+
+    def remaining(self, sailing: SailingKey) -> int:
+        """Return the number of cabins left on a sailing."""
+        with self._lock_for(sailing):
+            return self._remaining_locked(sailing)
+
+    def _remaining_locked(self, sailing: SailingKey) -> int:
+        if sailing not in self._remaining:
+            self._remaining[sailing] = self.default_inventory.get(sailing[2], 0)
+        return self._remaining[sailing]
+
+    def reserve(
+        self,
+        sailing: SailingKey,
+        idempotency_key: str,
+        build_booking: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Reserve one cabin and record the booking, or return the original booking for a retry.
+
+        Args:
+            sailing: (itinerary_id, departure_date, cabin_code)
+            idempotency_key: Key identifying this booking request
+            build_booking: Creates the booking record; must set "confirmation_number"
+
+        Returns:
+            (booking, created) where created is False for a replayed request
+
+        Raises:
+            SoldOutError: if no cabins are left
+        """
+        with self._lock_for(sailing):
+            confirmation_number = self._idempotency.get((sailing, idempotency_key))
+            if confirmation_number is not None:
+                return self._bookings[confirmation_number], False
+
+            if self._remaining_locked(sailing) <= 0:
+                raise SoldOutError(f"No {sailing[2]} cabins left on {sailing[0]} {sailing[1]}".strip())
+
+            booking = build_booking()
+            # Confirmation numbers are short; claim one atomically and rebuild on the rare collision
+            while self._bookings.setdefault(booking["confirmation_number"], booking) is not booking:
+                booking = build_booking()
+
+            self._remaining[sailing] -= 1
+            self._idempotency[(sailing, idempotency_key)] = booking["confirmation_number"]
+            return booking, True
+
+    def renumber(
+        self,
+        sailing: SailingKey,
+        idempotency_key: str,
+        build_booking: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Rebuild a reserved booking under a new confirmation number, keeping its cabin.
+
+        Used when the booking store already holds the old number for another request.
+        """
+        with self._lock_for(sailing):
+            self._bookings.pop(self._idempotency[(sailing, idempotency_key)], None)
+            booking = build_booking()
+            while self._bookings.setdefault(booking["confirmation_number"], booking) is not booking:
+                booking = build_booking()
+            self._idempotency[(sailing, idempotency_key)] = booking["confirmation_number"]
+            return booking
+
+    def release(self, sailing: SailingKey, idempotency_key: str) -> None:
+        """Undo a reservation (e.g. when it could not be persisted) so a retry books afresh."""
+        with self._lock_for(sailing):
+            confirmation_number = self._idempotency.pop((sailing, idempotency_key), None)
+            if confirmation_number is not None:
+                self._bookings.pop(confirmation_number, None)
+                self._remaining[sailing] += 1
+
+    def adopt(self, sailing: SailingKey, idempotency_key: str, booking: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace this process's booking for a request with one stored by another worker.
+
+        The cabin reserved here is released, and retries of the request
+        return the adopted booking from now on.
+        """
+        with self._lock_for(sailing):
+            local = self._idempotency.get((sailing, idempotency_key))
+            if local is not None and local != booking["confirmation_number"]:
+                self._bookings.pop(local, None)
+                self._remaining[sailing] += 1
+            self._bookings[booking["confirmation_number"]] = booking
+            self._idempotency[(sailing, idempotency_key)] = booking["confirmation_number"]
+            return booking
+
+    def get_booking(self, confirmation_number: str) -> Optional[Dict[str, Any]]:
+        """Look up a booking by confirmation number."""
+        return self._bookings.get(confirmation_number)
+
+
+ledger = InventoryLedger()
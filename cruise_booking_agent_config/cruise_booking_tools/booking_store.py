@@ -0,0 +1,254 @@
+"""
+Durable booking store backed by SQLite in WAL mode.
+
+A single writer thread group-commits queued bookings: it takes whatever has
+queued up (up to `max_batch`, waiting at most `max_delay` seconds for more)
+and writes the batch in one transaction, so one fsync covers many bookings.
+Callers wait on a Future that resolves once their booking is committed;
+cancelling the Future before the writer picks the booking up withdraws it.
+Readers use their own per-thread connections; with WAL they read the last
+committed state and never block behind the writer.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    confirmation_number TEXT PRIMARY KEY,
+    sailing_key TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    booking TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (sailing_key, idempotency_key)
+)
+"""
+
+_STOP = object()
+
+
+class DuplicateConfirmationError(sqlite3.IntegrityError):
+    """Raised for a booking whose confirmation number is already stored for another request."""
+
+
+def _sailing_key(sailing: Tuple[str, str, str]) -> str:
+    return "|".join(sailing)
+
+
+class SQLiteBookingStore:
+    """
+    Group-committing SQLite booking store.
+
+    Args:
+        path: Database file path
+        max_batch: Most bookings written in one transaction
+        max_delay: Longest time (seconds) the writer waits to fill a batch
+        synchronous: SQLite synchronous setting ("FULL" fsyncs every commit)
+        save_timeout: Longest time (seconds) callers should wait for a commit
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch: int = 256,
+        max_delay: float = 0.002,
+        synchronous: str = "FULL",
+        save_timeout: float = 5.0
+    ):
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.synchronous = synchronous
+        self.save_timeout = save_timeout
+        self.commits = 0
+        self.rows_written = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(_SCHEMA)
+        connection.commit()
+        connection.close()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._readers = threading.local()
+        self._writer = threading.Thread(target=self._write_loop, name="booking-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        connection.execute(f"PRAGMA synchronous={self.synchronous}")
+        return connection
+
+    def save(self, sailing: Tuple[str, str, str], idempotency_key: str, booking: Dict[str, Any]) -> Future:
+        """
+        Queue a booking for the next group commit.
+
+        Returns:
+            Future resolving to the committed booking. If another worker already
+            stored a booking for the same sailing and idempotency key, the
+            Future resolves to that booking instead. If the confirmation number
+            is taken by a different request, it fails with
+            DuplicateConfirmationError; the rest of the batch is unaffected.
+        """
+        future: Future = Future()
+        self._pending[booking["confirmation_number"]] = future
+        self._queue.put((_sailing_key(sailing), idempotency_key, booking, future))
+        return future
+
+    def pending(self, confirmation_number: str) -> Optional[Future]:
+        """Return the Future of a queued booking that isn't committed yet, or None."""
+        return self._pending.get(confirmation_number)
+
+    def get(self, confirmation_number: str) -> Optional[Dict[str, Any]]:
+        """Read a committed booking; never blocks behind the writer."""
+        connection = getattr(self._readers, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            connection.execute("PRAGMA query_only=ON")
+            self._readers.connection = connection
+        row = connection.execute(
+            "SELECT booking FROM bookings WHERE confirmation_number = ?", (confirmation_number,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _next_batch(self) -> List[Any]:
+        """Block for the first item, then gather more until the batch is full or max_delay passes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            items = []
+            for item in batch:
+                if item is _STOP:
+                    continue
+                # Claim each booking; one whose caller already gave up is dropped unwritten
+                if item[3].set_running_or_notify_cancel():
+                    items.append(item)
+                else:
+                    self._pending.pop(item[2]["confirmation_number"], None)
+            if items:
+                self._commit(connection, items)
+            if stop:
+                connection.close()
+                return
+
+    def _insert(self, connection: sqlite3.Connection, sailing_key: str, idempotency_key: str,
+                booking: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert one booking and return the booking stored for its request."""
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO bookings VALUES (?, ?, ?, ?, ?)",
+            (
+                booking["confirmation_number"],
+                sailing_key,
+                idempotency_key,
+                json.dumps(booking, default=str),
+                booking.get("booking_date", "")
+            )
+        )
+        if cursor.rowcount == 1:
+            return booking
+        # Same request already stored (by another worker): return that booking
+        row = connection.execute(
+            "SELECT booking FROM bookings WHERE sailing_key = ? AND idempotency_key = ?",
+            (sailing_key, idempotency_key)
+        ).fetchone()
+        if row is None:
+            raise DuplicateConfirmationError(f"Duplicate confirmation number {booking['confirmation_number']}")
+        return json.loads(row[0])
+
+    def _commit(self, connection: sqlite3.Connection, items: List[Any]) -> None:
+        # (future, stored booking or None, error or None) per item
+        results = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for sailing_key, idempotency_key, booking, future in items:
+                # A savepoint per row: one bad row fails only its own caller, not the batch
+                connection.execute("SAVEPOINT booking")
+                try:
+                    stored = self._insert(connection, sailing_key, idempotency_key, booking)
+                except sqlite3.Error as error:
+                    connection.execute("ROLLBACK TO booking")
+                    connection.execute("RELEASE booking")
+                    results.append((future, None, error))
+                    continue
+                connection.execute("RELEASE booking")
+                results.append((future, stored, None))
+            connection.execute("COMMIT")
+        except Exception as error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for _, _, booking, future in items:
+                self._pending.pop(booking["confirmation_number"], None)
+                future.set_exception(error)
+            return
+
+        self.commits += 1
+        self.rows_written += len(items)
+        for (_, _, booking, _), (future, stored, error) in zip(items, results):
+            self._pending.pop(booking["confirmation_number"], None)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(stored)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return write counters for monitoring."""
+        return {
+            "commits": self.commits,
+            "rows_written": self.rows_written,
+            "average_batch": round(self.rows_written / self.commits, 2) if self.commits else 0.0,
+            "queued": self._queue.qsize()
+        }
+
+    def close(self) -> None:
+        """Flush queued bookings and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+
+_store: Optional[SQLiteBookingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_booking_store() -> Optional[SQLiteBookingStore]:
+    """
+    Return the process-wide booking store, or None when CRUISE_BOOKING_DB_PATH is not set.
+    """
+    global _store
+    path = os.getenv("CRUISE_BOOKING_DB_PATH")
+    if not path:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteBookingStore(
+                    path,
+                    max_batch=int(os.getenv("CRUISE_BOOKING_DB_MAX_BATCH", "256")),
+                    max_delay=float(os.getenv("CRUISE_BOOKING_DB_MAX_DELAY_MS", "2")) / 1000,
+                    save_timeout=float(os.getenv("CRUISE_BOOKING_DB_SAVE_TIMEOUT_MS", "5000")) / 1000
+                )
+                atexit.register(_store.close)
+    return _store
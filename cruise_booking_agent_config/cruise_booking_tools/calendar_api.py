@@ -2,7 +2,17 @@
 Calendar API Tool for displaying sailing availability and dates.
 """
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+from .date_utils import add_months, from_ordinal, to_ordinal
+from .sailing_calendar import AVAILABILITY_STATUSES, get_sailing_calendar
+
+
+# Longest range the availability heatmap will cover
+MAX_HEATMAP_WEEKS = 106
 
 
 def calendar_api(
@@ -18,160 +28,38 @@ def calendar_api(
         itinerary_id: ID of the cruise itinerary
         start_date: Start date for availability search (YYYY-MM-DD)
         end_date: End date for availability search (YYYY-MM-DD)
-        months_ahead: Number of months to look ahead (default 6)
+        months_ahead: Calendar months after the start date to search when no
+            end date is given (default 6)
     
     Returns:
         Dictionary containing sailing availability
     """
-    # Mock implementation - in real scenario, this would call actual calendar APIs
-    if not start_date:
-        start_date = datetime.now().strftime("%Y-%m-%d")
-    
-    if not end_date:
-        end_date = (datetime.now() + timedelta(days=months_ahead * 30)).strftime("%Y-%m-%d")
-    
-    # Mock sailing dates based on itinerary
-    mock_sailings = {
-        "CAR001": {
-            "itinerary_id": "CAR001",
-            "title": "7-Night Eastern Caribbean",
-            "cruise_line": "Royal Caribbean",
-            "ship": "Symphony of the Seas",
-            "departure_port": "Miami, Florida",
-            "sailing_dates": [
-                {
-                    "departure_date": "2024-06-15",
-                    "return_date": "2024-06-22",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Available",
-                        "Balcony": "Limited",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 899.00
-                },
-                {
-                    "departure_date": "2024-06-22",
-                    "return_date": "2024-06-29",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Available",
-                        "Balcony": "Available",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 899.00
-                },
-                {
-                    "departure_date": "2024-06-29",
-                    "return_date": "2024-07-06",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Limited",
-                        "Balcony": "Available",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 999.00
-                },
-                {
-                    "departure_date": "2024-07-06",
-                    "return_date": "2024-07-13",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Available",
-                        "Balcony": "Available",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 1099.00
-                },
-                {
-                    "departure_date": "2024-07-13",
-                    "return_date": "2024-07-20",
-                    "availability": "Waitlist",
-                    "cabin_availability": {
-                        "Interior": "Waitlist",
-                        "Oceanview": "Waitlist",
-                        "Balcony": "Waitlist",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 1199.00
-                }
-            ]
-        },
-        "MED002": {
-            "itinerary_id": "MED002",
-            "title": "10-Night Mediterranean Explorer",
-            "cruise_line": "Celebrity Cruises",
-            "ship": "Celebrity Edge",
-            "departure_port": "Barcelona, Spain",
-            "sailing_dates": [
-                {
-                    "departure_date": "2024-07-20",
-                    "return_date": "2024-07-30",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Available",
-                        "Balcony": "Available",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 1299.00
-                },
-                {
-                    "departure_date": "2024-08-10",
-                    "return_date": "2024-08-20",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Available",
-                        "Balcony": "Available",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 1399.00
-                },
-                {
-                    "departure_date": "2024-08-30",
-                    "return_date": "2024-09-09",
-                    "availability": "Available",
-                    "cabin_availability": {
-                        "Interior": "Available",
-                        "Oceanview": "Available",
-                        "Balcony": "Available",
-                        "Suite": "Available"
-                    },
-                    "pricing_starting_from": 1299.00
-                }
-            ]
-        }
-    }
-    
-    if itinerary_id not in mock_sailings:
+    calendar = get_sailing_calendar()
+    sailings = calendar.get(itinerary_id)
+    if sailings is None:
         return {
             "error": "Itinerary not found",
             "itinerary_id": itinerary_id
         }
-    
-    sailing_info = mock_sailings[itinerary_id]
-    
-    # Filter sailing dates based on date range
-    filtered_dates = []
-    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    for sailing in sailing_info["sailing_dates"]:
-        sailing_date = datetime.strptime(sailing["departure_date"], "%Y-%m-%d")
-        if start_dt <= sailing_date <= end_dt:
-            filtered_dates.append(sailing)
-    
+
+    if not start_date:
+        start_date = date.today().isoformat()
+
+    try:
+        start_ordinal = to_ordinal(start_date)
+        if not end_date:
+            end_date = add_months(date.fromordinal(start_ordinal), months_ahead).isoformat()
+        end_ordinal = to_ordinal(end_date)
+    except ValueError:
+        return {
+            "error": "Invalid date format, expected YYYY-MM-DD",
+            "itinerary_id": itinerary_id
+        }
+
+    filtered_dates = [sailings.sailing(position) for position in sailings.index_range(start_ordinal, end_ordinal)]
+
     return {
-        "itinerary_id": itinerary_id,
-        "title": sailing_info["title"],
-        "cruise_line": sailing_info["cruise_line"],
-        "ship": sailing_info["ship"],
-        "departure_port": sailing_info["departure_port"],
+        **sailings.info,
         "search_period": {
             "start_date": start_date,
             "end_date": end_date
@@ -182,34 +70,203 @@ def calendar_api(
     }
 
 
-def get_sailing_details(itinerary_id: str, departure_date: str) -> Dict[str, Any]:
+def calendar_availability_heatmap(
+    itinerary_ids: List[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    months_ahead: int = 3
+) -> Dict[str, Any]:
     """
-    Get detailed information for a specific sailing date.
-    
+    Get an itinerary x week grid of availability and lowest prices for many itineraries at once.
+
     Args:
-        itinerary_id: ID of the cruise itinerary
-        departure_date: Departure date in YYYY-MM-DD format
-    
+        itinerary_ids: IDs of the cruise itineraries to compare
+        start_date: Start date of the grid (YYYY-MM-DD, defaults to today)
+        end_date: End date of the grid (YYYY-MM-DD)
+        months_ahead: Calendar months after the start date to cover when no
+            end date is given (default 3)
+
     Returns:
-        Dictionary containing detailed sailing information
+        Dictionary containing week start dates and, per itinerary, the best
+        availability status, lowest starting price and sailing count for each
+        week (None where nothing departs that week)
     """
-    # Mock implementation
+    if not start_date:
+        start_date = date.today().isoformat()
+
+    try:
+        start_ordinal = to_ordinal(start_date)
+        if not end_date:
+            end_date = add_months(date.fromordinal(start_ordinal), months_ahead).isoformat()
+        end_ordinal = to_ordinal(end_date)
+    except ValueError:
+        return {"error": "Invalid date format, expected YYYY-MM-DD"}
+
+    # Weeks start on Monday
+    first_week = start_ordinal - date.fromordinal(start_ordinal).weekday()
+    week_count = max((end_ordinal - first_week) // 7 + 1, 0)
+    if week_count > MAX_HEATMAP_WEEKS:
+        return {
+            "error": f"Date range too large, at most {MAX_HEATMAP_WEEKS} weeks are supported",
+            "search_period": {"start_date": start_date, "end_date": end_date}
+        }
+
+    calendar = get_sailing_calendar()
+    found = [(itinerary_id, calendar.get(itinerary_id)) for itinerary_id in itinerary_ids]
+    found = [(itinerary_id, sailings) for itinerary_id, sailings in found if sailings is not None]
+
+    status = np.zeros((len(found), week_count), dtype=np.int8)
+    min_price = np.full((len(found), week_count), np.inf)
+    sailing_count = np.zeros((len(found), week_count), dtype=np.int64)
+
+    for row, (_, sailings) in enumerate(found):
+        positions = sailings.index_range(start_ordinal, end_ordinal)
+        if not positions:
+            continue
+        window = slice(positions.start, positions.stop)
+        weeks = (sailings.departure_array[window] - first_week) // 7
+        np.maximum.at(status[row], weeks, sailings.status_array[window])
+        np.minimum.at(min_price[row], weeks, sailings.price_array[window])
+        np.add.at(sailing_count[row], weeks, 1)
+
+    has_sailing = sailing_count > 0
+    grid = []
+    for row, (itinerary_id, sailings) in enumerate(found):
+        grid.append({
+            "itinerary_id": itinerary_id,
+            "title": sailings.info["title"],
+            "availability": [AVAILABILITY_STATUSES[rank] for rank in status[row].tolist()],
+            "min_price": [
+                price if present else None
+                for price, present in zip(min_price[row].tolist(), has_sailing[row].tolist())
+            ],
+            "sailings": sailing_count[row].tolist()
+        })
+
+    found_ids = {itinerary_id for itinerary_id, _ in found}
+    return {
+        "search_period": {
+            "start_date": start_date,
+            "end_date": end_date
+        },
+        "weeks": [from_ordinal(first_week + 7 * week) for week in range(week_count)],
+        "itineraries": grid,
+        "not_found": [itinerary_id for itinerary_id in itinerary_ids if itinerary_id not in found_ids],
+        "search_timestamp": datetime.now().isoformat()
+    }
+
+
+@lru_cache(maxsize=None)
+def _ship_details(ship: Optional[str]) -> Dict[str, Any]:
+    """
+    Static sailing details for a ship, built once and shared.
+
+    The cached dictionary holds tuples instead of lists and is never handed
+    out; responses get a fresh copy from _ship_details_response.
+    """
+    # Mock implementation - in real scenario, these would come from the ship operations service
     return {
-        "itinerary_id": itinerary_id,
-        "departure_date": departure_date,
         "boarding_time": "12:00 PM - 3:00 PM",
         "departure_time": "4:00 PM",
         "return_time": "7:00 AM",
         "disembarkation_time": "8:00 AM - 10:00 AM",
         "check_in_deadline": "24 hours before departure",
-        "required_documents": [
+        "required_documents": (
             "Passport (valid for 6 months)",
             "Boarding pass",
             "Health questionnaire"
-        ],
-        "special_instructions": [
+        ),
+        "special_instructions": (
             "Arrive at port 2 hours before departure",
             "Complete online check-in",
             "Download cruise line mobile app"
-        ]
+        )
+    }
+
+
+def _ship_details_response(ship: Optional[str]) -> Dict[str, Any]:
+    """Copy a ship's cached details, with lists, so callers can't change the cache."""
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in _ship_details(ship).items()
+    }
+
+
+def _ship_for(itinerary_id: str) -> Optional[str]:
+    sailings = get_sailing_calendar().get(itinerary_id)
+    return sailings.info["ship"] if sailings is not None else None
+
+
+def get_sailing_details(itinerary_id: str, departure_date: str) -> Dict[str, Any]:
+    """
+    Get detailed information for a specific sailing date.
+    
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        departure_date: Departure date in YYYY-MM-DD format
+    
+    Returns:
+        Dictionary containing detailed sailing information
+    """
+    return {
+        "itinerary_id": itinerary_id,
+        "departure_date": departure_date,
+        **_ship_details_response(_ship_for(itinerary_id))
+    }
+
+
+def get_sailing_details_bulk(sailings: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Get detailed information for many sailings in one call.
+
+    Details that are the same for every sailing of a ship are returned once
+    per ship under `ship_details` rather than repeated for each sailing.
+
+    Args:
+        sailings: List of {"itinerary_id": ..., "departure_date": "YYYY-MM-DD"} objects
+
+    Returns:
+        Dictionary containing per-sailing entries and shared per-ship details
+    """
+    calendar = get_sailing_calendar()
+    ship_details: Dict[str, Dict[str, Any]] = {}
+    entries = []
+
+    for requested in sailings:
+        itinerary_id = requested.get("itinerary_id")
+        departure_date = requested.get("departure_date")
+        itinerary = calendar.get(itinerary_id)
+        entry: Dict[str, Any] = {"itinerary_id": itinerary_id, "departure_date": departure_date}
+
+        if itinerary is None:
+            entry["error"] = "Itinerary not found"
+            entries.append(entry)
+            continue
+
+        ship = itinerary.info["ship"]
+        if ship not in ship_details:
+            ship_details[ship] = _ship_details_response(ship)
+        entry["ship"] = ship
+
+        try:
+            position = itinerary.position(to_ordinal(departure_date))
+        except (TypeError, ValueError):
+            entry["error"] = "Invalid date format, expected YYYY-MM-DD"
+            entries.append(entry)
+            continue
+
+        if position is None:
+            entry["scheduled"] = False
+        else:
+            entry.update({
+                "scheduled": True,
+                "return_date": itinerary.return_dates[position],
+                "availability": itinerary.availability[position]
+            })
+        entries.append(entry)
+
+    return {
+        "sailings": entries,
+        "ship_details": ship_details,
+        "total_sailings": len(entries)
     }
@@ -0,0 +1,175 @@
+"""
+Pooled async HTTP client for the cruise backend.
+
+Each event loop gets one keep-alive httpx.AsyncClient, so tool calls reuse
+connections instead of opening one per request. The connection pool bounds
+total and idle connections, a per-host semaphore bounds concurrent requests
+to any one backend host, and every request has connect and read timeouts.
+The backend is found at CRUISE_API_BASE_URL.
+"""
+from typing import Dict, Any, Optional
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8765"
+
+
+class CruiseApiClient:
+    """
+    Async JSON client for the cruise backend.
+
+    Args:
+        base_url: Backend base URL
+        api_key: Optional key sent as a bearer token
+        transport: Optional httpx transport (e.g. httpx.ASGITransport to call an app in-process)
+        max_connections: Most open connections in the pool
+        max_keepalive_connections: Most idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept
+        per_host_limit: Most concurrent requests to one host
+        connect_timeout: Seconds to wait for a connection
+        read_timeout: Seconds to wait for a response
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: int = 20,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 10.0
+    ):
+        self.base_url = base_url
+        self.per_host_limit = per_host_limit
+        self.requests = 0
+        self.failures = 0
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=read_timeout)
+        )
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a request and return the JSON response body.
+
+        The backend answers with the same dictionaries as the local tools,
+        including their error dictionaries. Timeouts, connection failures and
+        non-JSON responses are returned as error dictionaries too.
+        """
+        request = self._client.build_request(
+            method,
+            path,
+            params={name: value for name, value in (params or {}).items() if value is not None},
+            json=json
+        )
+        host = f"{request.url.host}:{request.url.port}"
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        self.requests += 1
+        try:
+            async with slots:
+                response = await self._client.send(request)
+        except httpx.TimeoutException:
+            self.failures += 1
+            return {"error": "Cruise backend timed out", "path": path}
+        except httpx.TransportError as exc:
+            self.failures += 1
+            return {"error": "Cruise backend unavailable", "detail": str(exc), "path": path}
+
+        try:
+            body = response.json()
+        except ValueError:
+            self.failures += 1
+            return {"error": "Cruise backend returned an invalid response", "status_code": response.status_code, "path": path}
+
+        if response.status_code >= 400 and not (isinstance(body, dict) and "error" in body):
+            self.failures += 1
+            return {"error": "Cruise backend error", "status_code": response.status_code, "path": path}
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        """Return client counters for monitoring."""
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
+
+
+# httpx clients and semaphores belong to the event loop they were first used on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CruiseApiClient]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+_transport: Optional[httpx.AsyncBaseTransport] = None
+_base_url: Optional[str] = None
+
+
+def configure_cruise_api(base_url: Optional[str] = None, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+    """
+    Point clients created from now on at another backend.
+
+    Args:
+        base_url: Backend base URL (defaults to CRUISE_API_BASE_URL)
+        transport: Transport to use instead of the network, e.g. httpx.ASGITransport(app=...)
+    """
+    global _base_url, _transport
+    with _clients_lock:
+        _base_url = base_url
+        _transport = transport
+        _clients.clear()
+
+
+def get_cruise_api_client() -> CruiseApiClient:
+    """Return the cruise backend client for the running event loop, configured from the environment on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(loop)
+            if client is None:
+                client = _clients[loop] = CruiseApiClient(
+                    _base_url or os.getenv("CRUISE_API_BASE_URL", DEFAULT_BASE_URL),
+                    api_key=os.getenv("CRUISE_API_KEY"),
+                    transport=_transport,
+                    max_connections=int(os.getenv("CRUISE_API_MAX_CONNECTIONS", "100")),
+                    max_keepalive_connections=int(os.getenv("CRUISE_API_MAX_KEEPALIVE", "20")),
+                    per_host_limit=int(os.getenv("CRUISE_API_PER_HOST_LIMIT", "20")),
+                    connect_timeout=float(os.getenv("CRUISE_API_CONNECT_TIMEOUT_MS", "2000")) / 1000,
+                    read_timeout=float(os.getenv("CRUISE_API_READ_TIMEOUT_MS", "10000")) / 1000
+                )
+    return client
+
+
+async def close_cruise_api_client() -> None:
+    """Close the running event loop's client, if any."""
+    with _clients_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
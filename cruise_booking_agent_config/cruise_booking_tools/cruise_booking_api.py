@@ -1,68 +1,249 @@
 """
 Cruise Booking API Tool for finalizing reservations.
+
+cruise_booking_api is async: it waits for the booking store's group commit
+without blocking the event loop, so other tool calls keep running while a
+booking is written.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future
+import asyncio
+import functools
+import sqlite3
 import uuid
 from datetime import datetime
 
+from .booking_ledger import SoldOutError, idempotency_key_for, ledger
+from .booking_store import DuplicateConfirmationError, get_booking_store
+from .cruise_package_api import QUOTE_INDEX, quote_cabin
+from .date_utils import to_ordinal
+from .sailing_calendar import get_sailing_calendar
+
+# Attempts to store a booking whose confirmation number turns out to be taken
+SAVE_ATTEMPTS = 3
+
+
+async def _committed(future: Future, timeout: float) -> Dict[str, Any]:
+    """
+    Wait for a booking store commit without blocking the event loop.
+
+    Raises:
+        TimeoutError: if the commit hasn't finished within timeout seconds,
+            or its booking was withdrawn
+    """
+    waiter = asyncio.wrap_future(future)
+    done, _ = await asyncio.wait([waiter], timeout=timeout)
+    if not done:
+        # A late failure is handled through the store's Future; don't log it as unretrieved here
+        waiter.add_done_callback(lambda late: late.cancelled() or late.exception())
+    if not done or waiter.cancelled():
+        raise TimeoutError("Timed out waiting for the booking store")
+    return waiter.result()
+
+
+def _settle(sailing: Tuple[str, str, str], idempotency_key: str, future: Future) -> None:
+    """Update the ledger once a booking the caller stopped waiting for is committed or fails."""
+    if future.cancelled() or future.exception() is not None:
+        ledger.release(sailing, idempotency_key)
+    else:
+        ledger.adopt(sailing, idempotency_key, future.result())
+
 
-def cruise_booking_api(
+async def cruise_booking_api(
     itinerary_id: str,
     cabin_code: str,
     passenger_details: List[Dict[str, Any]],
     contact_info: Dict[str, str],
-    special_requests: Optional[List[str]] = None
+    special_requests: Optional[List[str]] = None,
+    departure_date: Optional[str] = None,
+    idempotency_key: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Finalize cruise booking and create reservation.
     
+    Retrying the same request returns the original booking rather than
+    reserving another cabin. When CRUISE_BOOKING_DB_PATH is set, the booking
+    is returned only after it has been committed to the booking store. If
+    the commit takes longer than the store's save timeout, the booking is
+    withdrawn if it hasn't been written yet; otherwise it comes back with
+    booking_status "Pending" and can be checked with get_booking_status.
+
     Args:
         itinerary_id: ID of the cruise itinerary
         cabin_code: Code of the selected cabin
         passenger_details: List of passenger information
         contact_info: Contact information for the booking
         special_requests: List of special requests
+        departure_date: Sailing departure date in YYYY-MM-DD format (defaults
+            to the package's advertised sailing)
+        idempotency_key: Key identifying this booking request (derived from
+            the request details when omitted)
     
     Returns:
         Dictionary containing booking confirmation
     """
+    cabin_code = cabin_code.upper()
+    invalid = _validate_sailing(itinerary_id, cabin_code, departure_date)
+    if invalid is not None:
+        return invalid
+    if not departure_date:
+        # Every booking draws on a real sailing's inventory, never a dateless pool of its own
+        departure_date = QUOTE_INDEX[itinerary_id].package["departure_date"]
+
+    # Priced exactly as cruise_package_api / cruise_package_quote quote it
+    price = quote_cabin(itinerary_id, cabin_code, len(passenger_details))
+    if price is None:
+        return {
+            "error": "Party exceeds cabin occupancy",
+            "message": f"{len(passenger_details)} guests don't fit a {cabin_code} cabin on {itinerary_id}",
+            "itinerary_id": itinerary_id,
+            "departure_date": departure_date,
+            "cabin_code": cabin_code,
+            "booking_status": "Unavailable"
+        }
+
+    sailing = (itinerary_id, departure_date, cabin_code)
+    if idempotency_key is None:
+        idempotency_key = idempotency_key_for(
+            itinerary_id, departure_date, cabin_code, passenger_details, contact_info, special_requests or []
+        )
+
+    def build_booking() -> Dict[str, Any]:
+        return _build_booking(
+            itinerary_id, cabin_code, passenger_details, contact_info, special_requests, departure_date, price
+        )
+
+    try:
+        booking_details, created = ledger.reserve(sailing, idempotency_key, build_booking)
+    except SoldOutError as error:
+        return {
+            "error": "Cabin sold out",
+            "message": str(error),
+            "itinerary_id": itinerary_id,
+            "departure_date": departure_date,
+            "cabin_code": cabin_code,
+            "booking_status": "Unavailable"
+        }
+
+    store = get_booking_store()
+    if store is not None:
+        future = None
+        try:
+            if created:
+                for attempt in range(SAVE_ATTEMPTS):
+                    future = store.save(sailing, idempotency_key, booking_details)
+                    try:
+                        stored = await _committed(future, store.save_timeout)
+                        break
+                    except DuplicateConfirmationError:
+                        # Another worker holds this confirmation number; retry under a fresh one
+                        if attempt == SAVE_ATTEMPTS - 1:
+                            raise
+                        booking_details = ledger.renumber(sailing, idempotency_key, build_booking)
+                if stored["confirmation_number"] != booking_details["confirmation_number"]:
+                    # Another worker already booked this request; use its confirmation
+                    booking_details = ledger.adopt(sailing, idempotency_key, stored)
+                    created = False
+            else:
+                # A replay can race the original's commit; don't hand out an unsaved confirmation
+                future = store.pending(booking_details["confirmation_number"])
+                if future is not None:
+                    await _committed(future, store.save_timeout)
+        except TimeoutError as error:
+            if created and not future.cancel():
+                # The writer already has the booking, so it may still commit; settle the ledger when it does
+                future.add_done_callback(functools.partial(_settle, sailing, idempotency_key))
+            if future.cancelled():
+                if created:
+                    ledger.release(sailing, idempotency_key)
+                return {
+                    "error": "Booking could not be saved",
+                    "message": str(error),
+                    "itinerary_id": itinerary_id,
+                    "departure_date": departure_date,
+                    "cabin_code": cabin_code,
+                    "booking_status": "Failed"
+                }
+            return dict(booking_details, booking_status="Pending", idempotent_replay=not created)
+        except sqlite3.Error as error:
+            if created:
+                ledger.release(sailing, idempotency_key)
+            return {
+                "error": "Booking could not be saved",
+                "message": str(error),
+                "itinerary_id": itinerary_id,
+                "departure_date": departure_date,
+                "cabin_code": cabin_code,
+                "booking_status": "Failed"
+            }
+
+    return dict(booking_details, idempotent_replay=not created)
+
+
+def _validate_sailing(itinerary_id: str, cabin_code: str, departure_date: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return an error dictionary unless the itinerary, cabin code and departure exist in the package data."""
+    index = QUOTE_INDEX.get(itinerary_id)
+    if index is None:
+        error, message = "Unknown itinerary", f"No itinerary {itinerary_id}"
+    elif cabin_code not in {cabin["cabin_code"] for cabin in index.cabins}:
+        codes = ", ".join(cabin["cabin_code"] for cabin in index.cabins)
+        error, message = "Unknown cabin", f"{itinerary_id} has no cabin {cabin_code} (cabin codes: {codes})"
+    elif departure_date:
+        sailings = get_sailing_calendar().get(itinerary_id)
+        try:
+            departure = to_ordinal(departure_date)
+        except (TypeError, ValueError):
+            departure = None
+        if departure is None:
+            error, message = "Invalid date format, expected YYYY-MM-DD", f"Could not read {departure_date!r}"
+        elif sailings is None or sailings.position(departure) is None:
+            error, message = "Unknown sailing", f"{itinerary_id} has no sailing departing {departure_date}"
+        else:
+            return None
+    else:
+        return None
+    return {
+        "error": error,
+        "message": message,
+        "itinerary_id": itinerary_id,
+        "departure_date": departure_date,
+        "cabin_code": cabin_code,
+        "booking_status": "Unavailable"
+    }
+
+
+def _build_booking(
+    itinerary_id: str,
+    cabin_code: str,
+    passenger_details: List[Dict[str, Any]],
+    contact_info: Dict[str, str],
+    special_requests: Optional[List[str]],
+    departure_date: Optional[str],
+    price: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Create the booking record for a reserved cabin, priced by quote_cabin."""
     # Mock implementation - in real scenario, this would call actual booking APIs
     booking_id = str(uuid.uuid4())
     confirmation_number = f"CRU{booking_id[:8].upper()}"
-    
-    # Mock pricing calculation
-    base_prices = {
-        "INT": 899.00,
-        "OV": 1099.00,
-        "BAL": 1299.00,
-        "SUITE": 2199.00
-    }
-    
-    base_price = base_prices.get(cabin_code, 899.00)
     total_passengers = len(passenger_details)
-    subtotal = base_price * total_passengers
-    
-    # Calculate taxes and fees (mock)
-    taxes_fees = subtotal * 0.15  # 15% taxes and fees
-    gratuities = subtotal * 0.10  # 10% gratuities
-    total_amount = subtotal + taxes_fees + gratuities
-    
+
     booking_details = {
         "booking_id": booking_id,
         "confirmation_number": confirmation_number,
         "itinerary_id": itinerary_id,
+        "departure_date": departure_date,
         "cabin_code": cabin_code,
         "passenger_count": total_passengers,
         "passenger_details": passenger_details,
         "contact_info": contact_info,
         "special_requests": special_requests or [],
         "pricing": {
-            "base_price_per_person": base_price,
-            "subtotal": subtotal,
-            "taxes_and_fees": taxes_fees,
-            "gratuities": gratuities,
-            "total_amount": total_amount,
-            "currency": "USD"
+            "base_price_per_person": price["price_per_person"],
+            "subtotal": price["subtotal"],
+            "taxes_and_fees": price["taxes_and_fees"],
+            "gratuities": price["gratuities"],
+            "total_amount": price["total_amount"],
+            "currency": price["currency"]
         },
         "booking_status": "Confirmed",
         "booking_date": datetime.now().isoformat(),
@@ -89,11 +270,28 @@ def get_booking_status(confirmation_number: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing booking status
     """
-    # Mock implementation
+    confirmation_number = confirmation_number.strip().upper()
+    booking = ledger.get_booking(confirmation_number)
+    store = get_booking_store()
+    if booking is None and store is not None:
+        # Bookings made by other workers are only in the shared store
+        booking = store.get(confirmation_number)
+    if booking is None:
+        return {
+            "error": "Booking not found",
+            "confirmation_number": confirmation_number
+        }
+
+    # A booking still waiting for its commit isn't confirmed yet
+    committing = store is not None and store.pending(confirmation_number) is not None
     return {
         "confirmation_number": confirmation_number,
-        "booking_status": "Confirmed",
-        "last_updated": datetime.now().isoformat(),
+        "booking_status": "Pending" if committing else booking["booking_status"],
+        "itinerary_id": booking["itinerary_id"],
+        "departure_date": booking["departure_date"],
+        "cabin_code": booking["cabin_code"],
+        "passenger_count": booking["passenger_count"],
+        "last_updated": booking["booking_date"],
         "check_in_available": True,
         "excursion_booking_available": True,
         "specialty_dining_available": True
@@ -0,0 +1,113 @@
+"""
+Cruise Cards API Tool: search, then packages and sailing calendars, in one call.
+
+The search runs first, then the package and calendar of each of the top
+results are looked up, so presenting k options costs one tool turn instead
+of 2k + 1. All three are in-memory index lookups taking microseconds, so
+they run inline; handing them to threads would cost more than they do.
+"""
+from typing import Dict, Any, List, Optional
+
+from .calendar_api import calendar_api
+from .cruise_package_api import cruise_package_api
+from .cruise_semantic_search_api import cruise_semantic_search_api
+
+
+# Most cards assembled per call; each card costs two lookups
+MAX_CARDS = 10
+
+
+def _card(
+    summary: Dict[str, Any],
+    package: Dict[str, Any],
+    calendar: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge a search result with its package and calendar into one cruise card with its own lists."""
+    card = dict(summary)
+    if "error" in package:
+        card["package_error"] = package["error"]
+    else:
+        card.update({
+            "return_date": package["return_date"],
+            "cabin_options": [dict(cabin, amenities=list(cabin["amenities"])) for cabin in package["cabin_options"]],
+            "inclusions": list(package["inclusions"]),
+            "exclusions": list(package["exclusions"])
+        })
+    if "error" in calendar:
+        card["calendar_error"] = calendar["error"]
+    else:
+        card.update({
+            "sailing_dates": calendar["sailing_dates"],
+            "total_sailings": calendar["total_sailings"]
+        })
+    return card
+
+
+def cruise_cards_api(
+    destinations: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    party_size: Optional[int] = None,
+    budget_range: Optional[Dict[str, float]] = None,
+    cruise_lines: Optional[List[str]] = None,
+    activities: Optional[List[str]] = None,
+    duration_preference: Optional[str] = None,
+    cabin_types: Optional[List[str]] = None,
+    top_k: int = 3,
+    months_ahead: int = 6
+) -> Dict[str, Any]:
+    """
+    Search for cruises and return the top results as complete cruise cards.
+
+    Each card combines the search result with its cabin options, pricing and
+    inclusions (as from cruise_package_api) and its sailing dates (as from
+    calendar_api).
+
+    Args:
+        destinations: List of preferred destinations
+        start_date: Earliest departure date in YYYY-MM-DD format
+        end_date: Latest departure date in YYYY-MM-DD format
+        party_size: Number of passengers; each cabin then carries a `party_quote`
+        budget_range: Budget constraints (min, max, target)
+        cruise_lines: Preferred cruise lines
+        activities: Preferred activities, used to rank the results
+        duration_preference: Preferred cruise duration
+        cabin_types: Cabin types to include in each card (defaults to all)
+        top_k: Number of cards to return (at most 10)
+        months_ahead: Calendar months of sailings to list when no end date is given
+
+    Returns:
+        Dictionary containing the cruise cards, in search ranking order
+    """
+    top_k = max(1, min(top_k, MAX_CARDS))
+    search = cruise_semantic_search_api(
+        destinations=destinations,
+        start_date=start_date,
+        end_date=end_date,
+        party_size=party_size,
+        budget_range=budget_range,
+        cruise_lines=cruise_lines,
+        activities=activities,
+        duration_preference=duration_preference,
+        top_k=top_k if activities else None,
+        limit=top_k,
+        fields=["card"]
+    )
+    if "error" in search:
+        return search
+
+    cards = [
+        _card(
+            result,
+            cruise_package_api(result["itinerary_id"], cabin_types, party_size),
+            calendar_api(result["itinerary_id"], start_date, end_date, months_ahead)
+        )
+        for result in search["results"]
+    ]
+    return {
+        "search_criteria": search["search_criteria"],
+        "cards": cards,
+        "returned_cards": len(cards),
+        "total_results": search["total_results"],
+        "search_timestamp": search["search_timestamp"]
+    }
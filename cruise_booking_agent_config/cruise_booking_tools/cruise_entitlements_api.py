@@ -1,7 +1,266 @@
 """
 Cruise Entitlements API Tool for offering add-ons and value-added services.
+
+The entitlement catalog is loaded once per process. Preferences are matched
+through a keyword -> category index, entitlements are looked up by ID, and
+per-cabin recommendations are precomputed.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+import math
+import re
+import uuid
+from datetime import datetime
+
+
+# Mock entitlement catalog - in real scenario, this would be loaded from the entitlements service
+ENTITLEMENTS: Dict[str, List[Dict[str, Any]]] = {
+    "dining_packages": [
+        {
+            "package_id": "DINE001",
+            "name": "Specialty Dining Package",
+            "description": "3-night specialty dining package",
+            "price_per_person": 89.00,
+            "includes": [
+                "Choice of 3 specialty restaurants",
+                "Priority reservations",
+                "Complimentary wine pairing"
+            ],
+            "restaurants": ["Chops Grille", "Izumi", "150 Central Park"],
+            "availability": "Available"
+        },
+        {
+            "package_id": "DINE002",
+            "name": "Ultimate Dining Package",
+            "description": "Unlimited specialty dining",
+            "price_per_person": 199.00,
+            "includes": [
+                "Unlimited specialty dining",
+                "Priority reservations",
+                "Complimentary beverages"
+            ],
+            "restaurants": ["All specialty restaurants"],
+            "availability": "Available"
+        }
+    ],
+    "beverage_packages": [
+        {
+            "package_id": "BEV001",
+            "name": "Classic Beverage Package",
+            "description": "Unlimited alcoholic and non-alcoholic beverages",
+            "price_per_person": 65.00,
+            "includes": [
+                "Unlimited cocktails, wine, beer",
+                "Premium coffee and tea",
+                "Fresh juices and sodas",
+                "Bottled water"
+            ],
+            "restrictions": "Must be purchased for all adults in cabin",
+            "availability": "Available"
+        },
+        {
+            "package_id": "BEV002",
+            "name": "Premium Beverage Package",
+            "description": "Premium alcoholic and non-alcoholic beverages",
+            "price_per_person": 89.00,
+            "includes": [
+                "Premium spirits and cocktails",
+                "Premium wines",
+                "Specialty coffee drinks",
+                "Fresh juices and sodas",
+                "Bottled water"
+            ],
+            "restrictions": "Must be purchased for all adults in cabin",
+            "availability": "Available"
+        }
+    ],
+    "excursions": [
+        {
+            "excursion_id": "EXC001",
+            "name": "Nassau City Tour & Beach Break",
+            "port": "Nassau, Bahamas",
+            "duration": "4 hours",
+            "price_per_person": 79.00,
+            "description": "Explore historic Nassau and relax at Cable Beach",
+            "includes": ["Transportation", "Guide", "Beach access", "Lunch"],
+            "difficulty": "Easy",
+            "availability": "Available"
+        },
+        {
+            "excursion_id": "EXC002",
+            "name": "St. Thomas Island Drive & Shopping",
+            "port": "St. Thomas, USVI",
+            "duration": "3 hours",
+            "price_per_person": 59.00,
+            "description": "Scenic island tour with shopping time",
+            "includes": ["Transportation", "Guide", "Shopping time"],
+            "difficulty": "Easy",
+            "availability": "Available"
+        },
+        {
+            "excursion_id": "EXC003",
+            "name": "St. Maarten Beach & Snorkeling",
+            "port": "St. Maarten",
+            "duration": "5 hours",
+            "price_per_person": 99.00,
+            "description": "Beach day with snorkeling equipment",
+            "includes": ["Transportation", "Snorkeling gear", "Beach access", "Lunch"],
+            "difficulty": "Moderate",
+            "availability": "Available"
+        }
+    ],
+    "spa_services": [
+        {
+            "service_id": "SPA001",
+            "name": "Couples Massage Package",
+            "description": "60-minute couples massage",
+            "price_per_couple": 299.00,
+            "duration": "60 minutes",
+            "includes": ["Couples massage", "Champagne", "Chocolates"],
+            "availability": "Available"
+        },
+        {
+            "service_id": "SPA002",
+            "name": "Spa Day Pass",
+            "description": "Full day access to spa facilities",
+            "price_per_person": 89.00,
+            "duration": "Full day",
+            "includes": ["Thermal suite access", "Sauna", "Steam room", "Relaxation area"],
+            "availability": "Available"
+        }
+    ],
+    "internet_packages": [
+        {
+            "package_id": "WIFI001",
+            "name": "Basic Internet Package",
+            "description": "Basic internet access for email and browsing",
+            "price_per_person": 15.00,
+            "speed": "Basic",
+            "devices": 1,
+            "availability": "Available"
+        },
+        {
+            "package_id": "WIFI002",
+            "name": "Premium Internet Package",
+            "description": "High-speed internet for streaming and video calls",
+            "price_per_person": 25.00,
+            "speed": "Premium",
+            "devices": 2,
+            "availability": "Available"
+        }
+    ],
+    "photo_packages": [
+        {
+            "package_id": "PHOTO001",
+            "name": "Digital Photo Package",
+            "description": "All digital photos from your cruise",
+            "price_per_cabin": 199.00,
+            "includes": ["All digital photos", "USB drive", "Online gallery access"],
+            "availability": "Available"
+        }
+    ]
+}
+
+# Preference keywords per category; the category's own name is always a keyword too
+CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "dining_packages": ["dining", "dinner", "food", "restaurant", "restaurants", "specialty dining", "culinary"],
+    "beverage_packages": ["beverage", "beverages", "drinks", "drink", "alcohol", "wine", "cocktails", "bar"],
+    "excursions": [
+        "excursion", "excursions", "shore", "tour", "tours", "sightseeing", "snorkeling",
+        "beach", "adventure", "ports", "activities"
+    ],
+    "spa_services": ["spa", "massage", "wellness", "relaxation", "sauna"],
+    "internet_packages": ["internet", "wifi", "wi-fi", "connectivity", "streaming", "online"],
+    "photo_packages": ["photo", "photos", "photography", "pictures"]
+}
+
+# Cabin-specific recommendations, keyed by cabin type name
+CABIN_RECOMMENDATIONS: Dict[str, List[str]] = {
+    "Suite": [
+        "Priority reservations for all services",
+        "Complimentary specialty dining",
+        "Concierge service",
+        "Priority boarding and disembarkation"
+    ],
+    "Balcony": [
+        "Private balcony dining",
+        "Room service on balcony",
+        "Priority excursion booking"
+    ],
+    "Oceanview": [
+        "Window dining experience",
+        "Priority spa booking"
+    ],
+    "Interior": [
+        "Public area recommendations",
+        "Entertainment package upgrades"
+    ]
+}
+
+CABIN_CODES = {"SUITE": "Suite", "BAL": "Balcony", "OV": "Oceanview", "INT": "Interior"}
+
+_ID_FIELDS = ("package_id", "excursion_id", "service_id")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def _build_keyword_index() -> Dict[str, Set[str]]:
+    index: Dict[str, Set[str]] = {}
+    for category in ENTITLEMENTS:
+        keywords = list(CATEGORY_KEYWORDS.get(category, []))
+        keywords.append(category)
+        keywords.append(category.replace("_", " "))
+        keywords.extend(part for part in category.split("_") if part != "packages")
+        for keyword in keywords:
+            index.setdefault(keyword.lower(), set()).add(category)
+    return index
+
+
+def _build_entitlement_index() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    index: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for category, items in ENTITLEMENTS.items():
+        for item in items:
+            for field in _ID_FIELDS:
+                if field in item:
+                    index[item[field].upper()] = (category, item)
+    return index
+
+
+KEYWORD_INDEX = _build_keyword_index()
+ENTITLEMENT_INDEX = _build_entitlement_index()
+CABIN_RECOMMENDATION_INDEX: Dict[str, List[str]] = {
+    **{cabin.lower(): recommendations for cabin, recommendations in CABIN_RECOMMENDATIONS.items()},
+    **{code.lower(): CABIN_RECOMMENDATIONS[cabin] for code, cabin in CABIN_CODES.items()}
+}
+
+
+def match_categories(preferences: List[str]) -> Set[str]:
+    """
+    Map free-text preferences to entitlement categories.
+
+    Whole preferences and their words are looked up in the keyword index;
+    a preference that matches nothing falls back to a substring match on the
+    category names.
+    """
+    categories: Set[str] = set()
+    for preference in preferences:
+        preference = preference.lower().strip()
+        matched = KEYWORD_INDEX.get(preference)
+        if matched is None:
+            matched = set()
+            for token in _TOKEN_PATTERN.findall(preference):
+                matched |= KEYWORD_INDEX.get(token, set())
+        if not matched and preference:
+            matched = {category for category in ENTITLEMENTS if preference in category}
+        categories |= matched
+    return categories
+
+
+def _line_price(item: Dict[str, Any], passenger_count: int) -> Tuple[str, float, int]:
+    """Return (price field, unit price, units) for buying an entitlement for the party."""
+    if "price_per_person" in item:
+        return "price_per_person", item["price_per_person"], passenger_count
+    if "price_per_couple" in item:
+        return "price_per_couple", item["price_per_couple"], math.ceil(passenger_count / 2)
+    return "price_per_cabin", item["price_per_cabin"], 1
 
 
 def cruise_entitlements_api(
@@ -15,206 +274,133 @@ def cruise_entitlements_api(
     
     Args:
         itinerary_id: ID of the cruise itinerary
-        cabin_type: Type of cabin booked
+        cabin_type: Type of cabin booked (name such as "Balcony" or code such as "BAL")
         passenger_count: Number of passengers
         preferences: List of preferred activity types
     
     Returns:
         Dictionary containing available entitlements
     """
-    # Mock implementation - in real scenario, this would call actual entitlements APIs
-    mock_entitlements = {
-        "dining_packages": [
-            {
-                "package_id": "DINE001",
-                "name": "Specialty Dining Package",
-                "description": "3-night specialty dining package",
-                "price_per_person": 89.00,
-                "includes": [
-                    "Choice of 3 specialty restaurants",
-                    "Priority reservations",
-                    "Complimentary wine pairing"
-                ],
-                "restaurants": ["Chops Grille", "Izumi", "150 Central Park"],
-                "availability": "Available"
-            },
-            {
-                "package_id": "DINE002",
-                "name": "Ultimate Dining Package",
-                "description": "Unlimited specialty dining",
-                "price_per_person": 199.00,
-                "includes": [
-                    "Unlimited specialty dining",
-                    "Priority reservations",
-                    "Complimentary beverages"
-                ],
-                "restaurants": ["All specialty restaurants"],
-                "availability": "Available"
-            }
-        ],
-        "beverage_packages": [
-            {
-                "package_id": "BEV001",
-                "name": "Classic Beverage Package",
-                "description": "Unlimited alcoholic and non-alcoholic beverages",
-                "price_per_person": 65.00,
-                "includes": [
-                    "Unlimited cocktails, wine, beer",
-                    "Premium coffee and tea",
-                    "Fresh juices and sodas",
-                    "Bottled water"
-                ],
-                "restrictions": "Must be purchased for all adults in cabin",
-                "availability": "Available"
-            },
-            {
-                "package_id": "BEV002",
-                "name": "Premium Beverage Package",
-                "description": "Premium alcoholic and non-alcoholic beverages",
-                "price_per_person": 89.00,
-                "includes": [
-                    "Premium spirits and cocktails",
-                    "Premium wines",
-                    "Specialty coffee drinks",
-                    "Fresh juices and sodas",
-                    "Bottled water"
-                ],
-                "restrictions": "Must be purchased for all adults in cabin",
-                "availability": "Available"
-            }
-        ],
-        "excursions": [
-            {
-                "excursion_id": "EXC001",
-                "name": "Nassau City Tour & Beach Break",
-                "port": "Nassau, Bahamas",
-                "duration": "4 hours",
-                "price_per_person": 79.00,
-                "description": "Explore historic Nassau and relax at Cable Beach",
-                "includes": ["Transportation", "Guide", "Beach access", "Lunch"],
-                "difficulty": "Easy",
-                "availability": "Available"
-            },
-            {
-                "excursion_id": "EXC002",
-                "name": "St. Thomas Island Drive & Shopping",
-                "port": "St. Thomas, USVI",
-                "duration": "3 hours",
-                "price_per_person": 59.00,
-                "description": "Scenic island tour with shopping time",
-                "includes": ["Transportation", "Guide", "Shopping time"],
-                "difficulty": "Easy",
-                "availability": "Available"
-            },
-            {
-                "excursion_id": "EXC003",
-                "name": "St. Maarten Beach & Snorkeling",
-                "port": "St. Maarten",
-                "duration": "5 hours",
-                "price_per_person": 99.00,
-                "description": "Beach day with snorkeling equipment",
-                "includes": ["Transportation", "Snorkeling gear", "Beach access", "Lunch"],
-                "difficulty": "Moderate",
-                "availability": "Available"
-            }
-        ],
-        "spa_services": [
-            {
-                "service_id": "SPA001",
-                "name": "Couples Massage Package",
-                "description": "60-minute couples massage",
-                "price_per_couple": 299.00,
-                "duration": "60 minutes",
-                "includes": ["Couples massage", "Champagne", "Chocolates"],
-                "availability": "Available"
-            },
-            {
-                "service_id": "SPA002",
-                "name": "Spa Day Pass",
-                "description": "Full day access to spa facilities",
-                "price_per_person": 89.00,
-                "duration": "Full day",
-                "includes": ["Thermal suite access", "Sauna", "Steam room", "Relaxation area"],
-                "availability": "Available"
-            }
-        ],
-        "internet_packages": [
-            {
-                "package_id": "WIFI001",
-                "name": "Basic Internet Package",
-                "description": "Basic internet access for email and browsing",
-                "price_per_person": 15.00,
-                "speed": "Basic",
-                "devices": 1,
-                "availability": "Available"
-            },
-            {
-                "package_id": "WIFI002",
-                "name": "Premium Internet Package",
-                "description": "High-speed internet for streaming and video calls",
-                "price_per_person": 25.00,
-                "speed": "Premium",
-                "devices": 2,
-                "availability": "Available"
-            }
-        ],
-        "photo_packages": [
-            {
-                "package_id": "PHOTO001",
-                "name": "Digital Photo Package",
-                "description": "All digital photos from your cruise",
-                "price_per_cabin": 199.00,
-                "includes": ["All digital photos", "USB drive", "Online gallery access"],
-                "availability": "Available"
-            }
-        ]
-    }
-    
-    # Filter entitlements based on preferences
-    filtered_entitlements = {}
-    
-    for category, items in mock_entitlements.items():
-        if preferences:
-            # Simple filtering based on category names
-            if any(pref.lower() in category.lower() for pref in preferences):
-                filtered_entitlements[category] = items
-        else:
-            filtered_entitlements[category] = items
-    
-    # Add cabin-specific recommendations
-    cabin_recommendations = {
-        "Suite": [
-            "Priority reservations for all services",
-            "Complimentary specialty dining",
-            "Concierge service",
-            "Priority boarding and disembarkation"
-        ],
-        "Balcony": [
-            "Private balcony dining",
-            "Room service on balcony",
-            "Priority excursion booking"
-        ],
-        "Oceanview": [
-            "Window dining experience",
-            "Priority spa booking"
-        ],
-        "Interior": [
-            "Public area recommendations",
-            "Entertainment package upgrades"
-        ]
+    categories = match_categories(preferences) if preferences else set(ENTITLEMENTS)
+    filtered_entitlements = {
+        category: [dict(item) for item in items]
+        for category, items in ENTITLEMENTS.items()
+        if category in categories
     }
-    
+
     return {
         "itinerary_id": itinerary_id,
         "cabin_type": cabin_type,
         "passenger_count": passenger_count,
         "entitlements": filtered_entitlements,
-        "cabin_recommendations": cabin_recommendations.get(cabin_type, []),
+        "cabin_recommendations": list(CABIN_RECOMMENDATION_INDEX.get(cabin_type.lower().strip(), [])),
         "total_categories": len(filtered_entitlements),
         "search_timestamp": "2024-01-15T10:30:00Z"
     }
 
 
+def book_entitlements_cart(
+    itinerary_id: str,
+    items: List[Dict[str, Any]],
+    passenger_count: int,
+    special_requests: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Book several entitlements and add-ons in one all-or-nothing cart.
+
+    Every item is validated before anything is booked; if any item is
+    invalid, nothing is booked and all problems are returned together.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        items: Cart items, each {"entitlement_id": str} with optional
+            "passenger_count" (defaults to the party size) and "special_requests"
+        passenger_count: Number of passengers in the party
+        special_requests: Special requests applying to the whole cart
+
+    Returns:
+        Dictionary containing the cart confirmation with priced line items
+    """
+    if not items:
+        return {"error": "Cart is empty", "itinerary_id": itinerary_id}
+
+    problems = []
+    lines = []
+    seen: Set[str] = set()
+    for position, cart_item in enumerate(items):
+        entitlement_id = str(cart_item.get("entitlement_id", "")).strip().upper()
+        entry = ENTITLEMENT_INDEX.get(entitlement_id)
+        if entry is None:
+            problems.append({"item": position, "entitlement_id": entitlement_id, "error": "Entitlement not found"})
+            continue
+        if entitlement_id in seen:
+            problems.append({"item": position, "entitlement_id": entitlement_id, "error": "Duplicate entitlement in cart"})
+            continue
+        seen.add(entitlement_id)
+
+        category, entitlement = entry
+        count = cart_item.get("passenger_count", passenger_count)
+        if not isinstance(count, int) or count < 1 or count > passenger_count:
+            problems.append({
+                "item": position,
+                "entitlement_id": entitlement_id,
+                "error": f"passenger_count must be between 1 and {passenger_count}"
+            })
+            continue
+        if entitlement.get("availability") != "Available":
+            problems.append({"item": position, "entitlement_id": entitlement_id, "error": "Entitlement not available"})
+            continue
+        if "all adults" in entitlement.get("restrictions", "").lower() and count != passenger_count:
+            problems.append({
+                "item": position,
+                "entitlement_id": entitlement_id,
+                "error": entitlement["restrictions"]
+            })
+            continue
+
+        price_field, unit_price, units = _line_price(entitlement, count)
+        lines.append({
+            "entitlement_id": entitlement_id,
+            "name": entitlement["name"],
+            "category": category,
+            "passenger_count": count,
+            "pricing_basis": price_field,
+            "unit_price": unit_price,
+            "units": units,
+            "line_total": unit_price * units,
+            "special_requests": cart_item.get("special_requests", [])
+        })
+
+    if problems:
+        return {
+            "error": "Cart could not be booked",
+            "itinerary_id": itinerary_id,
+            "problems": problems,
+            "booking_status": "Not booked"
+        }
+
+    # Mock implementation - in real scenario, this would submit the cart in one entitlements API transaction
+    confirmation_number = f"ENT{uuid.uuid4().hex[:8].upper()}"
+    return {
+        "cart_id": confirmation_number,
+        "confirmation_number": confirmation_number,
+        "itinerary_id": itinerary_id,
+        "passenger_count": passenger_count,
+        "items": lines,
+        "total_items": len(lines),
+        "total_amount": sum(line["line_total"] for line in lines),
+        "currency": "USD",
+        "special_requests": special_requests or [],
+        "booking_status": "Confirmed",
+        "booking_date": datetime.now().isoformat(),
+        "next_steps": [
+            "Confirmation will be sent via email",
+            "Entitlements will be added to your cruise account",
+            "Present confirmation at service location"
+        ]
+    }
+
+
 def book_entitlement(
     itinerary_id: str,
     entitlement_id: str,
@@ -2,6 +2,262 @@
 Cruise Package API Tool for fetching detailed cabin information and pricing.
 """
 from typing import Dict, Any, List, Optional
+import re
+
+import numpy as np
+
+
+# Pricing rules applied to the cabin subtotal (shared with the booking API)
+TAXES_AND_FEES_RATE = 0.15
+GRATUITY_RATE = 0.10
+
+# Mock packages - in real scenario, these would come from the cruise package service
+PACKAGES: Dict[str, Dict[str, Any]] = {
+    "CAR001": {
+        "itinerary_id": "CAR001",
+        "title": "7-Night Eastern Caribbean",
+        "cruise_line": "Royal Caribbean",
+        "ship": "Symphony of the Seas",
+        "departure_date": "2024-06-15",
+        "return_date": "2024-06-22",
+        "cabin_options": [
+            {
+                "cabin_type": "Interior",
+                "cabin_code": "INT",
+                "description": "Cozy interior stateroom with twin beds",
+                "size": "149 sq ft",
+                "occupancy": "Up to 4 guests",
+                "amenities": ["TV", "Phone", "Private bathroom", "Air conditioning"],
+                "price_per_person": 899.00,
+                "total_price": 1798.00,
+                "availability": "Available",
+                "deck": "Deck 3-8"
+            },
+            {
+                "cabin_type": "Oceanview",
+                "cabin_code": "OV",
+                "description": "Stateroom with ocean view window",
+                "size": "179 sq ft",
+                "occupancy": "Up to 4 guests",
+                "amenities": ["Ocean view window", "TV", "Phone", "Private bathroom", "Air conditioning"],
+                "price_per_person": 1099.00,
+                "total_price": 2198.00,
+                "availability": "Available",
+                "deck": "Deck 2-7"
+            },
+            {
+                "cabin_type": "Balcony",
+                "cabin_code": "BAL",
+                "description": "Stateroom with private balcony",
+                "size": "182 sq ft + 50 sq ft balcony",
+                "occupancy": "Up to 4 guests",
+                "amenities": ["Private balcony", "Ocean view", "TV", "Phone", "Private bathroom", "Air conditioning"],
+                "price_per_person": 1299.00,
+                "total_price": 2598.00,
+                "availability": "Available",
+                "deck": "Deck 6-14"
+            },
+            {
+                "cabin_type": "Suite",
+                "cabin_code": "SUITE",
+                "description": "Luxury suite with concierge service",
+                "size": "300 sq ft + 100 sq ft balcony",
+                "occupancy": "Up to 4 guests",
+                "amenities": ["Private balcony", "Concierge service", "Priority boarding", "Complimentary specialty dining", "WiFi", "TV", "Phone", "Private bathroom", "Air conditioning"],
+                "price_per_person": 2199.00,
+                "total_price": 4398.00,
+                "availability": "Available",
+                "deck": "Deck 10-14"
+            }
+        ],
+        "inclusions": [
+            "All meals in main dining rooms",
+            "Room service (limited hours)",
+            "Entertainment shows",
+            "Fitness center access",
+            "Pool and hot tub access",
+            "Kids' programs",
+            "Port taxes and fees"
+        ],
+        "exclusions": [
+            "Alcoholic beverages",
+            "Specialty dining",
+            "Spa services",
+            "Shore excursions",
+            "WiFi (except suites)",
+            "Gratuities"
+        ]
+    },
+    "MED002": {
+        "itinerary_id": "MED002",
+        "title": "10-Night Mediterranean Explorer",
+        "cruise_line": "Celebrity Cruises",
+        "ship": "Celebrity Edge",
+        "departure_date": "2024-07-20",
+        "return_date": "2024-07-30",
+        "cabin_options": [
+            {
+                "cabin_type": "Interior",
+                "cabin_code": "INT",
+                "description": "Modern interior stateroom",
+                "size": "200 sq ft",
+                "occupancy": "Up to 2 guests",
+                "amenities": ["TV", "Phone", "Private bathroom", "Air conditioning", "WiFi"],
+                "price_per_person": 1299.00,
+                "total_price": 2598.00,
+                "availability": "Available",
+                "deck": "Deck 3-6"
+            },
+            {
+                "cabin_type": "Oceanview",
+                "cabin_code": "OV",
+                "description": "Stateroom with ocean view window",
+                "size": "200 sq ft",
+                "occupancy": "Up to 2 guests",
+                "amenities": ["Ocean view window", "TV", "Phone", "Private bathroom", "Air conditioning", "WiFi"],
+                "price_per_person": 1499.00,
+                "total_price": 2998.00,
+                "availability": "Available",
+                "deck": "Deck 3-6"
+            },
+            {
+                "cabin_type": "Balcony",
+                "cabin_code": "BAL",
+                "description": "Infinite veranda stateroom",
+                "size": "200 sq ft + infinite veranda",
+                "occupancy": "Up to 2 guests",
+                "amenities": ["Infinite veranda", "Ocean view", "TV", "Phone", "Private bathroom", "Air conditioning", "WiFi"],
+                "price_per_person": 1799.00,
+                "total_price": 3598.00,
+                "availability": "Available",
+                "deck": "Deck 6-12"
+            },
+            {
+                "cabin_type": "Suite",
+                "cabin_code": "SUITE",
+                "description": "Luxury suite with butler service",
+                "size": "400 sq ft + 100 sq ft veranda",
+                "occupancy": "Up to 4 guests",
+                "amenities": ["Private veranda", "Butler service", "Priority boarding", "Complimentary specialty dining", "WiFi", "TV", "Phone", "Private bathroom", "Air conditioning", "Mini bar"],
+                "price_per_person": 2999.00,
+                "total_price": 5998.00,
+                "availability": "Available",
+                "deck": "Deck 10-12"
+            }
+        ],
+        "inclusions": [
+            "All meals in main dining rooms",
+            "Room service",
+            "Entertainment shows",
+            "Fitness center access",
+            "Pool and hot tub access",
+            "WiFi",
+            "Port taxes and fees"
+        ],
+        "exclusions": [
+            "Alcoholic beverages",
+            "Specialty dining",
+            "Spa services",
+            "Shore excursions",
+            "Gratuities"
+        ]
+    }
+}
+
+_OCCUPANCY_RE = re.compile(r"(\d+)")
+
+
+def _max_occupancy(occupancy: str) -> int:
+    """Parse "Up to 4 guests" into 4."""
+    match = _OCCUPANCY_RE.search(occupancy)
+    return int(match.group(1)) if match else 0
+
+
+class PackageQuoteIndex:
+    """
+    Per-itinerary cabin index keyed by normalized cabin type, with the cabin
+    prices and occupancy limits kept as arrays for vectorized quoting.
+    """
+
+    def __init__(self, package: Dict[str, Any]):
+        self.package = package
+        self.cabins: List[Dict[str, Any]] = package["cabin_options"]
+        self.cabin_index: Dict[str, int] = {}
+        for position, cabin in enumerate(self.cabins):
+            self.cabin_index[cabin["cabin_type"].lower()] = position
+            self.cabin_index[cabin["cabin_code"].lower()] = position
+        self.prices = np.array([cabin["price_per_person"] for cabin in self.cabins], dtype=np.float64)
+        self.occupancy = np.array([_max_occupancy(cabin["occupancy"]) for cabin in self.cabins], dtype=np.int64)
+
+    def positions(self, cabin_types: Optional[List[str]] = None) -> List[int]:
+        """Return cabin positions for the requested types (all cabins if none), in catalog order."""
+        if not cabin_types:
+            return list(range(len(self.cabins)))
+        wanted = {self.cabin_index.get(cabin_type.lower().strip()) for cabin_type in cabin_types}
+        return [position for position in range(len(self.cabins)) if position in wanted]
+
+    def quote(self, positions: List[int], party_sizes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Price every (cabin, party size) pair in one vectorized computation.
+
+        Returns:
+            Arrays of shape (cabins, party sizes) for subtotal, taxes_and_fees,
+            gratuities and total_amount, plus a boolean `fits` mask for parties
+            within the cabin's occupancy
+        """
+        prices = self.prices[positions][:, None]
+        subtotal = prices * party_sizes[None, :]
+        taxes_and_fees = subtotal * TAXES_AND_FEES_RATE
+        gratuities = subtotal * GRATUITY_RATE
+        return {
+            "subtotal": np.round(subtotal, 2),
+            "taxes_and_fees": np.round(taxes_and_fees, 2),
+            "gratuities": np.round(gratuities, 2),
+            "total_amount": np.round(subtotal + taxes_and_fees + gratuities, 2),
+            "fits": party_sizes[None, :] <= self.occupancy[positions][:, None]
+        }
+
+
+QUOTE_INDEX: Dict[str, PackageQuoteIndex] = {
+    itinerary_id: PackageQuoteIndex(package) for itinerary_id, package in PACKAGES.items()
+}
+
+
+def _cabin_response(cabin: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a catalog cabin, with its amenities list, so callers can't change the catalog."""
+    return dict(cabin, amenities=list(cabin["amenities"]))
+
+
+def _party_quote(quote: Dict[str, np.ndarray], row: int, column: int, party_size: int) -> Optional[Dict[str, Any]]:
+    """Extract one cell of a quote matrix, or None if the party doesn't fit the cabin."""
+    if not quote["fits"][row, column]:
+        return None
+    return {
+        "party_size": party_size,
+        "subtotal": float(quote["subtotal"][row, column]),
+        "taxes_and_fees": float(quote["taxes_and_fees"][row, column]),
+        "gratuities": float(quote["gratuities"][row, column]),
+        "total_amount": float(quote["total_amount"][row, column]),
+        "currency": "USD"
+    }
+
+
+def quote_cabin(itinerary_id: str, cabin_code: str, party_size: int) -> Optional[Dict[str, Any]]:
+    """
+    Price one cabin for a party with the same rules as the package quotes.
+
+    Returns:
+        The party quote plus `price_per_person`, or None if the itinerary or
+        cabin is unknown or the party exceeds the cabin's occupancy
+    """
+    index = QUOTE_INDEX.get(itinerary_id)
+    position = index.cabin_index.get(cabin_code.lower()) if index is not None else None
+    if position is None:
+        return None
+    quote = _party_quote(index.quote([position], np.array([party_size], dtype=np.int64)), 0, 0, party_size)
+    if quote is None:
+        return None
+    return dict(quote, price_per_person=index.cabins[position]["price_per_person"])
 
 
 def cruise_package_api(
@@ -15,180 +271,37 @@ def cruise_package_api(
     Args:
         itinerary_id: ID of the cruise itinerary
         cabin_types: List of preferred cabin types
-        party_size: Number of passengers
+        party_size: Number of passengers (at least 1); when given, each cabin
+            includes a `party_quote` with exact totals (None if the party
+            exceeds the cabin's occupancy)
     
     Returns:
         Dictionary containing detailed package information
     """
-    # Mock implementation - in real scenario, this would call actual cruise APIs
-    mock_packages = {
-        "CAR001": {
-            "itinerary_id": "CAR001",
-            "title": "7-Night Eastern Caribbean",
-            "cruise_line": "Royal Caribbean",
-            "ship": "Symphony of the Seas",
-            "departure_date": "2024-06-15",
-            "return_date": "2024-06-22",
-            "cabin_options": [
-                {
-                    "cabin_type": "Interior",
-                    "cabin_code": "INT",
-                    "description": "Cozy interior stateroom with twin beds",
-                    "size": "149 sq ft",
-                    "occupancy": "Up to 4 guests",
-                    "amenities": ["TV", "Phone", "Private bathroom", "Air conditioning"],
-                    "price_per_person": 899.00,
-                    "total_price": 1798.00,
-                    "availability": "Available",
-                    "deck": "Deck 3-8"
-                },
-                {
-                    "cabin_type": "Oceanview",
-                    "cabin_code": "OV",
-                    "description": "Stateroom with ocean view window",
-                    "size": "179 sq ft",
-                    "occupancy": "Up to 4 guests",
-                    "amenities": ["Ocean view window", "TV", "Phone", "Private bathroom", "Air conditioning"],
-                    "price_per_person": 1099.00,
-                    "total_price": 2198.00,
-                    "availability": "Available",
-                    "deck": "Deck 2-7"
-                },
-                {
-                    "cabin_type": "Balcony",
-                    "cabin_code": "BAL",
-                    "description": "Stateroom with private balcony",
-                    "size": "182 sq ft + 50 sq ft balcony",
-                    "occupancy": "Up to 4 guests",
-                    "amenities": ["Private balcony", "Ocean view", "TV", "Phone", "Private bathroom", "Air conditioning"],
-                    "price_per_person": 1299.00,
-                    "total_price": 2598.00,
-                    "availability": "Available",
-                    "deck": "Deck 6-14"
-                },
-                {
-                    "cabin_type": "Suite",
-                    "cabin_code": "SUITE",
-                    "description": "Luxury suite with concierge service",
-                    "size": "300 sq ft + 100 sq ft balcony",
-                    "occupancy": "Up to 4 guests",
-                    "amenities": ["Private balcony", "Concierge service", "Priority boarding", "Complimentary specialty dining", "WiFi", "TV", "Phone", "Private bathroom", "Air conditioning"],
-                    "price_per_person": 2199.00,
-                    "total_price": 4398.00,
-                    "availability": "Available",
-                    "deck": "Deck 10-14"
-                }
-            ],
-            "inclusions": [
-                "All meals in main dining rooms",
-                "Room service (limited hours)",
-                "Entertainment shows",
-                "Fitness center access",
-                "Pool and hot tub access",
-                "Kids' programs",
-                "Port taxes and fees"
-            ],
-            "exclusions": [
-                "Alcoholic beverages",
-                "Specialty dining",
-                "Spa services",
-                "Shore excursions",
-                "WiFi (except suites)",
-                "Gratuities"
-            ]
-        },
-        "MED002": {
-            "itinerary_id": "MED002",
-            "title": "10-Night Mediterranean Explorer",
-            "cruise_line": "Celebrity Cruises",
-            "ship": "Celebrity Edge",
-            "departure_date": "2024-07-20",
-            "return_date": "2024-07-30",
-            "cabin_options": [
-                {
-                    "cabin_type": "Interior",
-                    "cabin_code": "INT",
-                    "description": "Modern interior stateroom",
-                    "size": "200 sq ft",
-                    "occupancy": "Up to 2 guests",
-                    "amenities": ["TV", "Phone", "Private bathroom", "Air conditioning", "WiFi"],
-                    "price_per_person": 1299.00,
-                    "total_price": 2598.00,
-                    "availability": "Available",
-                    "deck": "Deck 3-6"
-                },
-                {
-                    "cabin_type": "Oceanview",
-                    "cabin_code": "OV",
-                    "description": "Stateroom with ocean view window",
-                    "size": "200 sq ft",
-                    "occupancy": "Up to 2 guests",
-                    "amenities": ["Ocean view window", "TV", "Phone", "Private bathroom", "Air conditioning", "WiFi"],
-                    "price_per_person": 1499.00,
-                    "total_price": 2998.00,
-                    "availability": "Available",
-                    "deck": "Deck 3-6"
-                },
-                {
-                    "cabin_type": "Balcony",
-                    "cabin_code": "BAL",
-                    "description": "Infinite veranda stateroom",
-                    "size": "200 sq ft + infinite veranda",
-                    "occupancy": "Up to 2 guests",
-                    "amenities": ["Infinite veranda", "Ocean view", "TV", "Phone", "Private bathroom", "Air conditioning", "WiFi"],
-                    "price_per_person": 1799.00,
-                    "total_price": 3598.00,
-                    "availability": "Available",
-                    "deck": "Deck 6-12"
-                },
-                {
-                    "cabin_type": "Suite",
-                    "cabin_code": "SUITE",
-                    "description": "Luxury suite with butler service",
-                    "size": "400 sq ft + 100 sq ft veranda",
-                    "occupancy": "Up to 4 guests",
-                    "amenities": ["Private veranda", "Butler service", "Priority boarding", "Complimentary specialty dining", "WiFi", "TV", "Phone", "Private bathroom", "Air conditioning", "Mini bar"],
-                    "price_per_person": 2999.00,
-                    "total_price": 5998.00,
-                    "availability": "Available",
-                    "deck": "Deck 10-12"
-                }
-            ],
-            "inclusions": [
-                "All meals in main dining rooms",
-                "Room service",
-                "Entertainment shows",
-                "Fitness center access",
-                "Pool and hot tub access",
-                "WiFi",
-                "Port taxes and fees"
-            ],
-            "exclusions": [
-                "Alcoholic beverages",
-                "Specialty dining",
-                "Spa services",
-                "Shore excursions",
-                "Gratuities"
-            ]
+    if party_size is not None and party_size < 1:
+        return {
+            "error": "party_size must be at least 1",
+            "party_size": party_size
         }
-    }
-    
-    if itinerary_id not in mock_packages:
+
+    if itinerary_id not in QUOTE_INDEX:
         return {
             "error": "Itinerary not found",
             "itinerary_id": itinerary_id
         }
     
-    package = mock_packages[itinerary_id]
+    index = QUOTE_INDEX[itinerary_id]
+    package = index.package
     
     # Filter cabin options based on preferences
-    if cabin_types:
-        filtered_cabins = [
-            cabin for cabin in package["cabin_options"]
-            if cabin["cabin_type"].lower() in [ct.lower() for ct in cabin_types]
-        ]
-    else:
-        filtered_cabins = package["cabin_options"]
+    positions = index.positions(cabin_types)
+    filtered_cabins = [_cabin_response(index.cabins[position]) for position in positions]
+
+    # Exact totals for the party, so the guest sees real numbers without extra arithmetic
+    if party_size and filtered_cabins:
+        quote = index.quote(positions, np.array([party_size], dtype=np.int64))
+        for row, cabin in enumerate(filtered_cabins):
+            cabin["party_quote"] = _party_quote(quote, row, 0, party_size)
     
     return {
         "itinerary_id": itinerary_id,
@@ -198,8 +311,73 @@ def cruise_package_api(
         "departure_date": package["departure_date"],
         "return_date": package["return_date"],
         "cabin_options": filtered_cabins,
-        "inclusions": package["inclusions"],
-        "exclusions": package["exclusions"],
+        "inclusions": list(package["inclusions"]),
+        "exclusions": list(package["exclusions"]),
         "total_cabin_options": len(filtered_cabins),
         "search_timestamp": "2024-01-15T10:30:00Z"
     }
+
+
+def cruise_package_quote(
+    itinerary_id: str,
+    cabin_types: Optional[List[str]] = None,
+    max_party_size: int = 4
+) -> Dict[str, Any]:
+    """
+    Get a full price matrix of cabins x party sizes 1..max_party_size.
+
+    Totals apply the same taxes/fees and gratuity rules as the booking API.
+
+    Args:
+        itinerary_id: ID of the cruise itinerary
+        cabin_types: Cabin types or codes to quote (defaults to all cabins)
+        max_party_size: Largest party size to quote (default 4, at least 1);
+            capped at the package's largest cabin occupancy, since bigger
+            parties fit no cabin
+
+    Returns:
+        Dictionary containing one row of quotes per cabin; a quote is None
+        where the party exceeds the cabin's occupancy
+    """
+    if max_party_size < 1:
+        return {
+            "error": "max_party_size must be at least 1",
+            "max_party_size": max_party_size
+        }
+
+    if itinerary_id not in QUOTE_INDEX:
+        return {
+            "error": "Itinerary not found",
+            "itinerary_id": itinerary_id
+        }
+
+    index = QUOTE_INDEX[itinerary_id]
+    positions = index.positions(cabin_types)
+    party_sizes = np.arange(1, min(max_party_size, int(index.occupancy.max())) + 1, dtype=np.int64)
+    quote = index.quote(positions, party_sizes)
+
+    rows = []
+    for row, position in enumerate(positions):
+        cabin = index.cabins[position]
+        rows.append({
+            "cabin_type": cabin["cabin_type"],
+            "cabin_code": cabin["cabin_code"],
+            "price_per_person": cabin["price_per_person"],
+            "occupancy": cabin["occupancy"],
+            "quotes": [
+                _party_quote(quote, row, column, int(party_size))
+                for column, party_size in enumerate(party_sizes)
+            ]
+        })
+
+    return {
+        "itinerary_id": itinerary_id,
+        "title": index.package["title"],
+        "party_sizes": party_sizes.tolist(),
+        "cabins": rows,
+        "pricing_rules": {
+            "taxes_and_fees_rate": TAXES_AND_FEES_RATE,
+            "gratuity_rate": GRATUITY_RATE
+        },
+        "currency": "USD"
+    }
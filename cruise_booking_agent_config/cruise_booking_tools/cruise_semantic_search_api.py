@@ -1,9 +1,271 @@
 """
 Cruise Semantic Search API Tool for finding relevant cruise itineraries.
 """
-from typing import Dict, Any, List, Optional
+from typing import AbstractSet, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from itertools import islice
+import base64
+import hashlib
 import json
 
+import numpy as np
+
+from .date_utils import to_ordinal
+from .itinerary_catalog import (
+    FIELDS,
+    ItineraryCatalog,
+    get_itinerary_catalog,
+    parse_duration_preference,
+)
+from .itinerary_embeddings import rank_scores
+from .search_cache import canonical_search_key, search_cache
+
+
+# Compact "cruise card" projection, enough to present options before fetching details
+CARD_FIELDS = [
+    "itinerary_id",
+    "title",
+    "cruise_line",
+    "ship",
+    "duration",
+    "departure_date",
+    "starting_price",
+    "currency",
+    "availability",
+    "relevance_score"
+]
+
+RESULT_FIELDS = set(FIELDS) | {"relevance_score"}
+
+# Criteria accepted by each query of cruise_batch_search_api
+SEARCH_CRITERIA = (
+    "destinations",
+    "start_date",
+    "end_date",
+    "party_size",
+    "budget_range",
+    "cruise_lines",
+    "activities",
+    "duration_preference",
+    "top_k"
+)
+
+
+def _price_bounds(budget_range: Dict[str, float]) -> Tuple[Optional[float], Optional[float]]:
+    """Turn a budget range (min, max, target +/- 20%) into inclusive price bounds."""
+    low = budget_range.get("min")
+    high = budget_range.get("max")
+    if "target" in budget_range:
+        target = budget_range["target"]
+        low = target * 0.8 if low is None else max(low, target * 0.8)
+        high = target * 1.2 if high is None else min(high, target * 1.2)
+    return low, high
+
+
+def _match_rows(
+    catalog: ItineraryCatalog,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    destinations: Optional[List[str]] = None,
+    budget_range: Optional[Dict[str, float]] = None,
+    cruise_lines: Optional[List[str]] = None,
+    activities: Optional[List[str]] = None,
+    duration_preference: Optional[str] = None,
+    top_k: Optional[int] = None
+) -> List[Tuple[int, Optional[float]]]:
+    """
+    Find matching catalog rows in result order.
+
+    Returns:
+        (row, relevance_score) pairs; the score is None when no activities are given
+    """
+    # Date window first: an empty window prunes the search before any other filter runs
+    candidate_sets = []
+    if start_date or end_date:
+        date_rows = catalog.rows_in_date_window(start_date, end_date)
+        if not date_rows:
+            return []
+        candidate_sets.append(date_rows)
+
+    if destinations:
+        candidate_sets.append(catalog.rows_for_destinations(destinations))
+
+    if cruise_lines:
+        candidate_sets.append(catalog.rows_for_cruise_lines(cruise_lines))
+
+    if budget_range:
+        candidate_sets.append(catalog.rows_in_price_range(*_price_bounds(budget_range)))
+
+    if duration_preference:
+        nights = parse_duration_preference(duration_preference)
+        if nights is not None:
+            candidate_sets.append(catalog.rows_for_nights(nights))
+
+    if candidate_sets:
+        candidate_sets.sort(key=len)
+        matching_rows = set.intersection(*candidate_sets)
+    else:
+        matching_rows = catalog.all_rows
+
+    if activities:
+        return catalog.activity_index.top_k(activities, sorted(matching_rows), top_k)
+    return [(row, None) for row in sorted(matching_rows)]
+
+
+def _match_rows_batch(
+    catalog: ItineraryCatalog,
+    criteria_list: List[Dict[str, Any]]
+) -> List[List[Tuple[int, Optional[float]]]]:
+    """
+    Evaluate many queries in one pass with a (queries x itineraries) boolean mask.
+
+    Returns the same (row, relevance_score) lists as _match_rows, one per query.
+    """
+    count = len(criteria_list)
+    int_min, int_max = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+    first_departure = np.full(count, int_min, dtype=np.int64)
+    last_departure = np.full(count, int_max, dtype=np.int64)
+    low_price = np.full(count, -np.inf)
+    high_price = np.full(count, np.inf)
+    nights = np.full(count, -1, dtype=np.int64)
+    allowed_lines = np.ones((count, len(catalog.cruise_line_names)), dtype=bool)
+    wanted_destinations = np.zeros((count, len(catalog.destination_keys)), dtype=np.float32)
+    filters_destinations = np.zeros(count, dtype=bool)
+
+    for query, criteria in enumerate(criteria_list):
+        if criteria.get("start_date"):
+            first_departure[query] = to_ordinal(criteria["start_date"])
+        if criteria.get("end_date"):
+            last_departure[query] = to_ordinal(criteria["end_date"])
+        if criteria.get("budget_range"):
+            low, high = _price_bounds(criteria["budget_range"])
+            if low is not None:
+                low_price[query] = low
+            if high is not None:
+                high_price[query] = high
+        if criteria.get("duration_preference"):
+            parsed = parse_duration_preference(criteria["duration_preference"])
+            if parsed is not None:
+                nights[query] = parsed
+        if criteria.get("cruise_lines"):
+            allowed_lines[query] = False
+            for name in catalog.matching_cruise_lines(criteria["cruise_lines"]):
+                allowed_lines[query, catalog.cruise_line_names.index(name)] = True
+        if criteria.get("destinations"):
+            filters_destinations[query] = True
+            for destination in criteria["destinations"]:
+                column = catalog.destination_keys.get(destination.lower().strip())
+                if column is not None:
+                    wanted_destinations[query, column] = 1.0
+
+    departures, prices = catalog.departure_array[None, :], catalog.price_array[None, :]
+    mask = (departures >= first_departure[:, None]) & (departures <= last_departure[:, None])
+    mask &= (prices >= low_price[:, None]) & (prices <= high_price[:, None])
+    mask &= (nights[:, None] < 0) | (catalog.nights_array[None, :] == nights[:, None])
+    mask &= allowed_lines[:, catalog.cruise_line_codes]
+    if filters_destinations.any():
+        calls_at = (wanted_destinations @ catalog.destination_matrix.T) > 0
+        mask &= calls_at | ~filters_destinations[:, None]
+
+    activity_sets = [criteria.get("activities") or [] for criteria in criteria_list]
+    scores = catalog.activity_index.score_batch(activity_sets) if any(activity_sets) else None
+
+    results = []
+    for query, criteria in enumerate(criteria_list):
+        rows = np.flatnonzero(mask[query])
+        if activity_sets[query]:
+            results.append(rank_scores(rows, scores[query, rows], criteria.get("top_k")))
+        else:
+            results.append([(int(row), None) for row in rows])
+    return results
+
+
+def _search_key(criteria: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Canonical cache key for a criteria dictionary."""
+    return canonical_search_key(**{
+        name: criteria.get(name) for name in SEARCH_CRITERIA if name != "party_size"
+    })
+
+
+def _query_fingerprint(catalog: ItineraryCatalog, cache_key: Tuple[Any, ...]) -> str:
+    """Fingerprint of the canonical query and catalog version, embedded in cursors."""
+    payload = json.dumps([catalog.version, cache_key])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _encode_cursor(offset: int, fingerprint: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{fingerprint}".encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> Optional[int]:
+    """Return the offset stored in a cursor, or None if it is invalid for this query."""
+    try:
+        offset, cursor_fingerprint = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(":")
+        offset = int(offset)
+    except ValueError:
+        return None
+    if cursor_fingerprint != fingerprint or offset < 0:
+        return None
+    return offset
+
+
+def _page(
+    catalog: ItineraryCatalog,
+    matches: Tuple[Tuple[int, Optional[float]], ...],
+    fingerprint: str,
+    offset: int,
+    limit: Optional[int],
+    fields: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Build the results page starting at `offset`, with a cursor for the next page."""
+    end = len(matches) if limit is None else min(offset + limit, len(matches))
+    page = list(_project(catalog, islice(matches, offset, end), fields))
+    return {
+        "results": page,
+        "total_results": len(matches),
+        "returned_results": len(page),
+        "next_cursor": _encode_cursor(end, fingerprint) if end < len(matches) else None
+    }
+
+
+def _project(
+    catalog: ItineraryCatalog,
+    matches: Iterable[Tuple[int, Optional[float]]],
+    fields: Optional[List[str]]
+) -> Iterator[Dict[str, Any]]:
+    """Materialize matches lazily, keeping only the requested fields."""
+    for row, score in matches:
+        result = catalog.row(row, fields)
+        if score is not None and (fields is None or "relevance_score" in fields):
+            result["relevance_score"] = round(score, 4)
+        yield result
+
+
+def _resolve_fields(
+    fields: Optional[List[str]],
+    available: AbstractSet[str] = RESULT_FIELDS
+) -> Tuple[Optional[List[str]], List[str]]:
+    """
+    Expand the "card" shorthand and validate field names.
+
+    Args:
+        fields: Requested field names, possibly including "card"
+        available: Fields the caller can return; "card" expands to the card
+            fields among them (details have no relevance_score)
+
+    Returns:
+        (fields to project or None for all fields, unknown field names)
+    """
+    if not fields:
+        return None, []
+    card = [name for name in CARD_FIELDS if name in available]
+    resolved = ["itinerary_id"]
+    for field in fields:
+        for name in (card if field == "card" else [field]):
+            if name not in resolved:
+                resolved.append(name)
+    return resolved, [name for name in resolved if name not in available]
+
 
 def cruise_semantic_search_api(
     destinations: Optional[List[str]] = None,
@@ -13,128 +275,230 @@ def cruise_semantic_search_api(
     budget_range: Optional[Dict[str, float]] = None,
     cruise_lines: Optional[List[str]] = None,
     activities: Optional[List[str]] = None,
-    duration_preference: Optional[str] = None
+    duration_preference: Optional[str] = None,
+    top_k: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Search for cruise itineraries based on semantic criteria.
-    
+
     Args:
         destinations: List of preferred destinations
-        start_date: Start date in YYYY-MM-DD format
-        end_date: End date in YYYY-MM-DD format
+        start_date: Earliest departure date in YYYY-MM-DD format
+        end_date: Latest departure date in YYYY-MM-DD format
         party_size: Number of passengers
         budget_range: Budget constraints (min, max, target)
         cruise_lines: Preferred cruise lines
-        activities: Preferred activities
+        activities: Preferred activities; matching itineraries are ranked by
+            similarity of their highlights and amenities to these activities
         duration_preference: Preferred cruise duration
-    
+        top_k: Maximum number of ranked results to return when activities are given
+        limit: Page size; when set, `next_cursor` points at the following page
+        cursor: Cursor returned by a previous call with the same criteria
+        fields: Fields to return for each result ("card" for a compact cruise card);
+            itinerary_id is always included. Defaults to all fields
+
     Returns:
         Dictionary containing search results
     """
-    # Mock implementation - in real scenario, this would call actual cruise APIs
-    mock_results = [
-        {
-            "itinerary_id": "CAR001",
-            "title": "7-Night Eastern Caribbean",
-            "cruise_line": "Royal Caribbean",
-            "ship": "Symphony of the Seas",
-            "departure_port": "Miami, Florida",
-            "ports": ["Nassau, Bahamas", "St. Thomas, USVI", "St. Maarten"],
-            "duration": "7 nights",
-            "departure_date": "2024-06-15",
-            "return_date": "2024-06-22",
-            "starting_price": 899.00,
-            "currency": "USD",
-            "availability": "Available",
-            "highlights": ["Largest cruise ship", "Broadway shows", "Water slides", "Fine dining"],
-            "amenities": ["WiFi", "Gym", "Spa", "Casino", "Multiple restaurants"],
-            "cabin_types": ["Interior", "Oceanview", "Balcony", "Suite"]
-        },
-        {
-            "itinerary_id": "MED002",
-            "title": "10-Night Mediterranean Explorer",
-            "cruise_line": "Celebrity Cruises",
-            "ship": "Celebrity Edge",
-            "departure_port": "Barcelona, Spain",
-            "ports": ["Rome, Italy", "Santorini, Greece", "Mykonos, Greece", "Naples, Italy"],
-            "duration": "10 nights",
-            "departure_date": "2024-07-20",
-            "return_date": "2024-07-30",
-            "starting_price": 1299.00,
-            "currency": "USD",
-            "availability": "Available",
-            "highlights": ["Modern luxury", "Michelin-starred dining", "Art collection", "Rooftop garden"],
-            "amenities": ["WiFi", "Spa", "Fine dining", "Art gallery", "Rooftop terrace"],
-            "cabin_types": ["Interior", "Oceanview", "Balcony", "Suite"]
-        },
-        {
-            "itinerary_id": "ALASKA003",
-            "title": "7-Night Alaska Glacier Discovery",
-            "cruise_line": "Princess Cruises",
-            "ship": "Royal Princess",
-            "departure_port": "Seattle, Washington",
-            "ports": ["Juneau, Alaska", "Skagway, Alaska", "Glacier Bay", "Ketchikan, Alaska"],
-            "duration": "7 nights",
-            "departure_date": "2024-08-10",
-            "return_date": "2024-08-17",
-            "starting_price": 1099.00,
-            "currency": "USD",
-            "availability": "Available",
-            "highlights": ["Glacier viewing", "Wildlife spotting", "Scenic cruising", "Alaska culture"],
-            "amenities": ["WiFi", "Naturalist talks", "Observation deck", "Alaska cuisine"],
-            "cabin_types": ["Interior", "Oceanview", "Balcony", "Suite"]
+    search_criteria = {
+        "destinations": destinations,
+        "start_date": start_date,
+        "end_date": end_date,
+        "party_size": party_size,
+        "budget_range": budget_range,
+        "cruise_lines": cruise_lines,
+        "activities": activities,
+        "duration_preference": duration_preference
+    }
+
+    projected_fields, unknown_fields = _resolve_fields(fields)
+    if unknown_fields:
+        return {
+            "error": "Unknown result fields",
+            "unknown_fields": unknown_fields,
+            "available_fields": sorted(RESULT_FIELDS) + ["card"]
         }
-    ]
-    
-    # Filter results based on criteria
-    filtered_results = []
-    
-    for result in mock_results:
-        include_result = True
-        
-        # Filter by destinations
-        if destinations:
-            result_destinations = [port.split(',')[1].strip() for port in result["ports"]]
-            if not any(dest.lower() in [d.lower() for d in destinations] for dest in result_destinations):
-                include_result = False
-        
-        # Filter by cruise lines
-        if cruise_lines:
-            if not any(line.lower() in result["cruise_line"].lower() for line in cruise_lines):
-                include_result = False
-        
-        # Filter by budget
-        if budget_range:
-            price = result["starting_price"]
-            if "min" in budget_range and price < budget_range["min"]:
-                include_result = False
-            if "max" in budget_range and price > budget_range["max"]:
-                include_result = False
-            if "target" in budget_range and abs(price - budget_range["target"]) > budget_range["target"] * 0.2:
-                include_result = False
-        
-        # Filter by duration
-        if duration_preference:
-            if "week" in duration_preference:
-                weeks = int(duration_preference.split()[0])
-                if result["duration"] != f"{weeks * 7} nights":
-                    include_result = False
-        
-        if include_result:
-            filtered_results.append(result)
-    
+    if limit is not None and limit < 1:
+        # A page of nothing would hand back a cursor to the same offset forever
+        return {
+            "error": "limit must be at least 1",
+            "limit": limit
+        }
+
+    catalog = get_itinerary_catalog()
+    cache_key = canonical_search_key(
+        start_date=start_date,
+        end_date=end_date,
+        destinations=destinations,
+        budget_range=budget_range,
+        cruise_lines=cruise_lines,
+        activities=activities,
+        duration_preference=duration_preference,
+        top_k=top_k
+    )
+    fingerprint = _query_fingerprint(catalog, cache_key)
+
+    offset = 0
+    if cursor:
+        offset = _decode_cursor(cursor, fingerprint)
+        if offset is None:
+            return {
+                "error": "Invalid or expired cursor",
+                "cursor": cursor,
+                "search_criteria": search_criteria
+            }
+
+    try:
+        for value in (start_date, end_date):
+            if value:
+                to_ordinal(value)
+    except ValueError:
+        return {
+            "error": "Invalid date format, expected YYYY-MM-DD",
+            "search_criteria": search_criteria
+        }
+
+    matches = search_cache.get(cache_key, catalog.version)
+    if matches is None:
+        matches = tuple(_match_rows(
+            catalog,
+            start_date=start_date,
+            end_date=end_date,
+            destinations=destinations,
+            budget_range=budget_range,
+            cruise_lines=cruise_lines,
+            activities=activities,
+            duration_preference=duration_preference,
+            top_k=top_k
+        ))
+        search_cache.put(cache_key, matches, catalog.version)
+
     return {
-        "search_criteria": {
-            "destinations": destinations,
-            "start_date": start_date,
-            "end_date": end_date,
-            "party_size": party_size,
-            "budget_range": budget_range,
-            "cruise_lines": cruise_lines,
-            "activities": activities,
-            "duration_preference": duration_preference
-        },
-        "results": filtered_results,
-        "total_results": len(filtered_results),
+        "search_criteria": search_criteria,
+        **_page(catalog, matches, fingerprint, offset, limit, projected_fields),
         "search_timestamp": "2024-01-15T10:30:00Z"
     }
+
+
+def cruise_batch_search_api(
+    queries: List[Dict[str, Any]],
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Run several cruise searches in one call, e.g. to compare options side by side.
+
+    Args:
+        queries: List of search criteria objects, each with the same keys as
+            cruise_semantic_search_api (destinations, start_date, end_date,
+            party_size, budget_range, cruise_lines, activities,
+            duration_preference, top_k)
+        limit: Page size for each query; use the returned `next_cursor` with
+            cruise_semantic_search_api to fetch further pages
+        fields: Fields to return for each result ("card" for a compact cruise card)
+
+    Returns:
+        Dictionary containing one result set per query, in request order
+    """
+    projected_fields, unknown_fields = _resolve_fields(fields)
+    if unknown_fields:
+        return {
+            "error": "Unknown result fields",
+            "unknown_fields": unknown_fields,
+            "available_fields": sorted(RESULT_FIELDS) + ["card"]
+        }
+    if limit is not None and limit < 1:
+        # A page of nothing would hand back a cursor to the same offset forever
+        return {
+            "error": "limit must be at least 1",
+            "limit": limit
+        }
+
+    catalog = get_itinerary_catalog()
+    responses: List[Dict[str, Any]] = []
+    matches_by_query: Dict[int, Tuple[Tuple[int, Optional[float]], ...]] = {}
+    pending: List[int] = []
+
+    for position, criteria in enumerate(queries):
+        search_criteria = {name: criteria.get(name) for name in SEARCH_CRITERIA}
+        responses.append({"query_index": position, "search_criteria": search_criteria})
+
+        unknown_criteria = sorted(set(criteria) - set(SEARCH_CRITERIA))
+        if unknown_criteria:
+            responses[position]["error"] = f"Unknown search criteria: {', '.join(unknown_criteria)}"
+            continue
+        try:
+            for value in (criteria.get("start_date"), criteria.get("end_date")):
+                if value:
+                    to_ordinal(value)
+        except ValueError:
+            responses[position]["error"] = "Invalid date format, expected YYYY-MM-DD"
+            continue
+
+        matches = search_cache.get(_search_key(criteria), catalog.version)
+        if matches is None:
+            pending.append(position)
+        else:
+            matches_by_query[position] = matches
+
+    # Evaluate every cache miss together in one vectorized pass
+    if pending:
+        batch = _match_rows_batch(catalog, [queries[position] for position in pending])
+        for position, matches in zip(pending, batch):
+            matches_by_query[position] = tuple(matches)
+            search_cache.put(_search_key(queries[position]), matches_by_query[position], catalog.version)
+
+    for position, matches in matches_by_query.items():
+        fingerprint = _query_fingerprint(catalog, _search_key(queries[position]))
+        responses[position].update(_page(catalog, matches, fingerprint, 0, limit, projected_fields))
+
+    return {
+        "queries": responses,
+        "total_queries": len(responses),
+        "search_timestamp": "2024-01-15T10:30:00Z"
+    }
+
+
+def get_itinerary_details(
+    itinerary_ids: List[str],
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get full (or projected) details for itineraries found by a previous search.
+
+    Args:
+        itinerary_ids: IDs of the cruise itineraries
+        fields: Fields to return for each itinerary (defaults to all fields;
+            "card" selects the compact card fields)
+
+    Returns:
+        Dictionary containing itinerary details
+    """
+    projected_fields, unknown_fields = _resolve_fields(fields, set(FIELDS))
+    if unknown_fields:
+        return {
+            "error": "Unknown itinerary fields",
+            "unknown_fields": unknown_fields,
+            "available_fields": list(FIELDS) + ["card"]
+        }
+
+    catalog = get_itinerary_catalog()
+    rows = [catalog.id_index.get(itinerary_id) for itinerary_id in itinerary_ids]
+
+    return {
+        "itineraries": [catalog.row(row, projected_fields) for row in rows if row is not None],
+        "not_found": [itinerary_id for itinerary_id, row in zip(itinerary_ids, rows) if row is None]
+    }
+
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit/miss/eviction counters of the search cache.
+
+    Returns:
+        Dictionary containing cache statistics
+    """
+    return search_cache.stats()
@@ -1,136 +1,446 @@
 """
 Date Resolver Tool for normalizing vague time expressions into structured dates.
+
+Expressions are matched in a single pass by one precompiled grammar covering
+explicit ranges, seasons, relative offsets, month names, weekdays and ISO
+dates. Resolutions are cached per (expression, reference date).
 """
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 import re
 
+from .date_utils import add_months, from_ordinal, last_day_of_month, to_ordinal
+
+
+MONTH_ABBREVIATIONS: Dict[str, int] = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+MONTHS: Dict[str, int] = {
+    "january": 1, "february": 2, "march": 3, "april": 4,
+    "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12,
+    **MONTH_ABBREVIATIONS
+}
+
+# Season -> (first month, last month); winter wraps into the next year
+SEASONS: Dict[str, Tuple[int, int]] = {
+    "spring": (3, 5),
+    "summer": (6, 8),
+    "fall": (9, 11),
+    "autumn": (9, 11),
+    "winter": (12, 2)
+}
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+NUMBER_WORDS: Dict[str, int] = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12
+}
+
+# Part of a month -> (first day, last day); None means the month's last day
+MONTH_PARTS: Dict[str, Tuple[int, Optional[int]]] = {
+    "early": (1, 10),
+    "mid": (11, 20),
+    "late": (21, None)
+}
+
+
+def _alternation(words) -> str:
+    """Regex alternation with longer words first, so "sept" wins over "sep"."""
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+_MONTH = _alternation(MONTHS)
+# "may" followed by a word is usually the verb ("we may go in june"), unless it joins another date.
+# A lone abbreviation is often just a word ("a mar appointment"), so it needs a
+# trailing period or a day number or year beside it ("mar.", "mar 2025", "15 mar").
+_MONTH_NAME = (
+    _alternation(name for name in MONTHS if name != "may" and name not in MONTH_ABBREVIATIONS)
+    + r"|may(?!\s+(?!and\b|or\b|to\b|through\b|until\b)[a-z])"
+    + rf"|(?:{_alternation(MONTH_ABBREVIATIONS)})(?=\.|\s+\d)"
+    + rf"|(?<=\d\s)(?:{_alternation(MONTH_ABBREVIATIONS)})"
+)
+_NUMBER = rf"\d+|{_alternation(NUMBER_WORDS)}"
+_UNIT = r"day|week|month|year"
+_POINT = rf"\d{{4}}-\d{{2}}-\d{{2}}|(?:{_MONTH})(?:\s+\d{{4}})?"
+
+# Alternatives are tried in order at each position, so ranges come before
+# the single months and dates they are built from.
+DATE_PATTERN = re.compile(rf"""
+    (?<![a-z0-9])(?:
+        between\s+(?P<between_start>{_POINT})\s+and\s+(?P<between_end>{_POINT})
+      | (?:from\s+)?(?P<range_start>{_POINT})\s*(?:-|–|to|through|thru|until|till)\s*(?P<range_end>{_POINT})
+      | (?:(?P<season_modifier>next|this)\s+)?(?P<season>{_alternation(SEASONS)})(?:\s+(?P<season_year>\d{{4}}))?
+      | in\s+(?P<offset_amount>{_NUMBER})\s+(?P<offset_unit>{_UNIT})s?
+      | (?P<from_now_amount>{_NUMBER})\s+(?P<from_now_unit>{_UNIT})s?\s+from\s+(?:now|today)
+      | (?P<relative_modifier>next|this)\s+(?P<relative_unit>week|month|year|weekend)
+      | (?:(?P<weekday_modifier>next|this)\s+)?(?P<weekday>{_alternation(WEEKDAYS)})
+      | (?:(?P<month_part>early|mid|late)[\s-]+)?(?P<month>{_MONTH_NAME})(?:\s+(?P<month_year>\d{{4}}))?
+      | (?P<iso>\d{{4}}-\d{{2}}-\d{{2}})
+    )(?![a-z0-9])
+""", re.VERBOSE)
+
+
+def _number(text: str) -> int:
+    return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+
+def _window(start: date, end: date, confidence: float, **extra: Any) -> Dict[str, Any]:
+    return {"start_date": start.isoformat(), "end_date": end.isoformat(), **extra, "confidence": confidence}
+
+
+def _month_window(month: int, year: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, last_day_of_month(year, month))
+
+
+def _point_window(text: str, ref: date) -> Tuple[date, date]:
+    """Resolve one endpoint of a range: an ISO date or a month with optional year."""
+    if text[0].isdigit():
+        day = date.fromisoformat(text)
+        return day, day
+    parts = text.split()
+    month = MONTHS[parts[0]]
+    year = int(parts[1]) if len(parts) > 1 else ref.year + (1 if ref.month > month else 0)
+    return _month_window(month, year)
+
+
+def _has_year(text: str) -> bool:
+    return text[0].isdigit() or len(text.split()) > 1
+
+
+def _resolve_range(start_text: str, end_text: str, ref: date) -> Dict[str, Any]:
+    end_start, end = _point_window(end_text, ref)
+    if not _has_year(start_text) and _has_year(end_text):
+        # "june to august 2025": the start takes the end's year ("november to
+        # february 2025" starts the year before)
+        month = MONTHS[start_text]
+        start, _ = _month_window(month, end_start.year - (1 if month > end_start.month else 0))
+    else:
+        start, _ = _point_window(start_text, ref)
+    if end < start and not _has_year(end_text):
+        # "november to february" runs into the following year
+        _, end = _month_window(end_start.month, start.year + (1 if end_start.month < start.month else 0))
+    if end < start:
+        return _window(start, start, 0.4, note="Range ends before it starts; using its start date")
+    return _window(start, end, 0.95, range=f"{start_text} to {end_text}")
+
+
+def _resolve_season(name: str, modifier: Optional[str], year_text: Optional[str], ref: date) -> Dict[str, Any]:
+    first, last = SEASONS[name]
+    if year_text:
+        year = int(year_text)
+    elif modifier == "next":
+        year = ref.year + (1 if ref.month >= first else 0)
+    elif first > last and ref.month <= last:
+        # This winter started last December
+        year = ref.year - 1
+    elif modifier == "this" or ref.month <= last or first > last:
+        year = ref.year
+    else:
+        year = ref.year + 1
+    end_year = year + 1 if first > last else year
+    return _window(
+        date(year, first, 1),
+        date(end_year, last, last_day_of_month(end_year, last)),
+        0.9,
+        season="fall" if name == "autumn" else name
+    )
+
+
+def _resolve_offset(amount: int, unit: str, ref: date) -> Dict[str, Any]:
+    if unit == "day":
+        start = ref + timedelta(days=amount)
+        return _window(start, start + timedelta(days=7), 0.8, days_ahead=amount)
+    if unit == "week":
+        start = ref + timedelta(weeks=amount)
+        return _window(start, start + timedelta(days=7), 0.8, weeks_ahead=amount)
+    months = amount * 12 if unit == "year" else amount
+    start = add_months(ref, months)
+    extra = {"years_ahead": amount} if unit == "year" else {"months_ahead": amount}
+    return _window(start, add_months(start, 1), 0.8, **extra)
+
+
+def _resolve_relative(modifier: str, unit: str, ref: date) -> Dict[str, Any]:
+    if unit == "week":
+        monday = ref - timedelta(days=ref.weekday())
+        if modifier == "next":
+            monday += timedelta(weeks=1)
+        return _window(monday, monday + timedelta(days=6), 0.85, period=f"{modifier} week")
+    if unit == "weekend":
+        saturday = ref + timedelta(days=(5 - ref.weekday()) % 7)
+        if ref.weekday() == 6:
+            saturday = ref - timedelta(days=1)
+        if modifier == "next":
+            saturday += timedelta(weeks=1)
+        return _window(saturday, saturday + timedelta(days=1), 0.85, period=f"{modifier} weekend")
+    if unit == "month":
+        first = add_months(ref.replace(day=1), 1 if modifier == "next" else 0)
+        start, end = _month_window(first.month, first.year)
+        return _window(start, end, 0.85, period=f"{modifier} month")
+    year = ref.year + (1 if modifier == "next" else 0)
+    return _window(date(year, 1, 1), date(year, 12, 31), 0.85, period=f"{modifier} year")
+
+
+def _resolve_weekday(name: str, modifier: Optional[str], ref: date) -> Dict[str, Any]:
+    # Bare and "this" mean the coming occurrence (today included); "next" is strictly after today
+    days_ahead = (WEEKDAYS.index(name) - ref.weekday()) % 7
+    if modifier == "next" and days_ahead == 0:
+        days_ahead = 7
+    day = ref + timedelta(days=days_ahead)
+    return _window(day, day, 0.8, weekday=name)
+
+
+def _resolve_month(name: str, part: Optional[str], year_text: Optional[str], ref: date) -> Dict[str, Any]:
+    month = MONTHS[name]
+    year = int(year_text) if year_text else ref.year + (1 if ref.month > month else 0)
+    start, end = _month_window(month, year)
+    extra: Dict[str, Any] = {"month": date(year, month, 1).strftime("%B").lower()}
+    if part:
+        first, last = MONTH_PARTS[part]
+        start, end = start.replace(day=first), end.replace(day=last or end.day)
+        extra["month_part"] = part
+    return _window(start, end, 0.7, **extra)
+
+
+def _resolve_match(match: "re.Match[str]", ref: date) -> Dict[str, Any]:
+    """Turn one grammar match into a date window."""
+    groups = match.groupdict()
+    if groups["between_start"]:
+        return _resolve_range(groups["between_start"], groups["between_end"], ref)
+    if groups["range_start"]:
+        return _resolve_range(groups["range_start"], groups["range_end"], ref)
+    if groups["season"]:
+        return _resolve_season(groups["season"], groups["season_modifier"], groups["season_year"], ref)
+    if groups["offset_amount"]:
+        return _resolve_offset(_number(groups["offset_amount"]), groups["offset_unit"], ref)
+    if groups["from_now_amount"]:
+        return _resolve_offset(_number(groups["from_now_amount"]), groups["from_now_unit"], ref)
+    if groups["relative_unit"]:
+        return _resolve_relative(groups["relative_modifier"], groups["relative_unit"], ref)
+    if groups["weekday"]:
+        return _resolve_weekday(groups["weekday"], groups["weekday_modifier"], ref)
+    if groups["month"]:
+        return _resolve_month(groups["month"], groups["month_part"], groups["month_year"], ref)
+    day = date.fromisoformat(groups["iso"])
+    return _window(day, day, 0.95)
+
+
+_FALLBACK_NOTE = "Could not parse specific date, using approximate range"
+
+# A date mention preceded by one of these is excluded ("not december", "except next week")
+_NEGATION = re.compile(r"(?<![a-z])(?:not|except|excluding|avoid|avoiding|without|no)\s+(?:in\s+|during\s+|the\s+)?$")
+
+# Window searched when a batch only excludes dates ("anything but december")
+EXCLUSION_HORIZON_DAYS = 365
+
+
+def _fallback(ref: date) -> Dict[str, Any]:
+    return {
+        "start_date": ref.isoformat(),
+        "end_date": (ref + timedelta(days=30)).isoformat(),
+        "confidence": 0.3,
+        "note": _FALLBACK_NOTE
+    }
+
+
+@lru_cache(maxsize=4096)
+def resolve_expression(time_expression: str, reference_date: str) -> Dict[str, Any]:
+    """
+    Resolve a normalized (lowercase, single-spaced) expression against a YYYY-MM-DD reference date.
+
+    Results are cached; callers must not mutate the returned dictionary.
+    """
+    ref = date.fromisoformat(reference_date)
+    match = DATE_PATTERN.search(time_expression)
+    if match is None:
+        return _fallback(ref)
+    try:
+        return _resolve_match(match, ref)
+    except ValueError:
+        # Grammatical but impossible, e.g. "2025-02-30"
+        return _fallback(ref)
+
+
+def normalize_expression(time_expression: str) -> str:
+    """Lowercase and collapse whitespace so equivalent expressions share a cache entry."""
+    return " ".join(time_expression.lower().split())
+
 
 def date_resolver_tool(time_expression: str, reference_date: Optional[str] = None) -> Dict[str, Any]:
     """
     Resolves vague time expressions into structured date information.
-    
+
+    Understands seasons ("next summer", "winter 2025"), relative offsets
+    ("in 3 months", "two weeks from now", "next month"), month names
+    ("late december"), weekdays ("next friday") and explicit ranges
+    ("from june to august", "2025-06-01 to 2025-06-15").
+
     Args:
         time_expression: Natural language time expression (e.g., "next summer", "in 3 months")
         reference_date: Reference date in YYYY-MM-DD format (defaults to today)
-    
+
     Returns:
         Dictionary containing structured date information
     """
-    if reference_date:
-        ref_date = datetime.strptime(reference_date, "%Y-%m-%d")
-    else:
-        ref_date = datetime.now()
-    
-    time_expression = time_expression.lower().strip()
-    
-    # Handle "next" expressions
-    if "next summer" in time_expression:
-        # Find next summer (June-August)
-        current_year = ref_date.year
-        if ref_date.month >= 6:
-            current_year += 1
-        return {
-            "start_date": f"{current_year}-06-01",
-            "end_date": f"{current_year}-08-31",
-            "season": "summer",
-            "confidence": 0.9
-        }
-    
-    elif "next winter" in time_expression:
-        # Find next winter (December-February)
-        current_year = ref_date.year
-        if ref_date.month >= 12:
-            current_year += 1
-        return {
-            "start_date": f"{current_year}-12-01",
-            "end_date": f"{current_year + 1}-02-28",
-            "season": "winter",
-            "confidence": 0.9
-        }
-    
-    elif "next spring" in time_expression:
-        # Find next spring (March-May)
-        current_year = ref_date.year
-        if ref_date.month >= 3:
-            current_year += 1
-        return {
-            "start_date": f"{current_year}-03-01",
-            "end_date": f"{current_year}-05-31",
-            "season": "spring",
-            "confidence": 0.9
-        }
-    
-    elif "next fall" in time_expression or "next autumn" in time_expression:
-        # Find next fall (September-November)
-        current_year = ref_date.year
-        if ref_date.month >= 9:
-            current_year += 1
-        return {
-            "start_date": f"{current_year}-09-01",
-            "end_date": f"{current_year}-11-30",
-            "season": "fall",
-            "confidence": 0.9
-        }
-    
-    # Handle "in X months" expressions
-    months_match = re.search(r'in (\d+) months?', time_expression)
-    if months_match:
-        months = int(months_match.group(1))
-        target_date = ref_date + timedelta(days=months * 30)  # Approximate
-        return {
-            "start_date": target_date.strftime("%Y-%m-%d"),
-            "end_date": (target_date + timedelta(days=30)).strftime("%Y-%m-%d"),
-            "months_ahead": months,
-            "confidence": 0.8
-        }
-    
-    # Handle "in X weeks" expressions
-    weeks_match = re.search(r'in (\d+) weeks?', time_expression)
-    if weeks_match:
-        weeks = int(weeks_match.group(1))
-        target_date = ref_date + timedelta(weeks=weeks)
-        return {
-            "start_date": target_date.strftime("%Y-%m-%d"),
-            "end_date": (target_date + timedelta(days=7)).strftime("%Y-%m-%d"),
-            "weeks_ahead": weeks,
-            "confidence": 0.8
+    reference_date, error = _reference_date(reference_date)
+    if error:
+        return error
+
+    return dict(resolve_expression(normalize_expression(time_expression), reference_date))
+
+
+def _reference_date(reference_date: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Validate a YYYY-MM-DD reference date (defaulting to today); returns (date, error)."""
+    if not reference_date:
+        return datetime.now().date().isoformat(), None
+    try:
+        return date.fromisoformat(reference_date).isoformat(), None
+    except ValueError:
+        return reference_date, {
+            "error": "Invalid reference_date, expected YYYY-MM-DD",
+            "reference_date": reference_date
         }
-    
-    # Handle specific month mentions
-    months = {
-        'january': 1, 'february': 2, 'march': 3, 'april': 4,
-        'may': 5, 'june': 6, 'july': 7, 'august': 8,
-        'september': 9, 'october': 10, 'november': 11, 'december': 12
-    }
-    
-    for month_name, month_num in months.items():
-        if month_name in time_expression:
-            current_year = ref_date.year
-            if ref_date.month > month_num:
-                current_year += 1
-            
-            # Get the last day of the month
-            if month_num == 12:
-                next_month = 1
-                next_year = current_year + 1
+
+
+Interval = Tuple[int, int]
+
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    """Union of inclusive day-ordinal intervals, sorted and with touching intervals joined."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _intersect(left: List[Interval], right: List[Interval]) -> List[Interval]:
+    """Intersection of two merged interval lists."""
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        start, end = max(left[i][0], right[j][0]), min(left[i][1], right[j][1])
+        if start <= end:
+            result.append((start, end))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _subtract(intervals: List[Interval], excluded: List[Interval]) -> List[Interval]:
+    """Remove merged `excluded` intervals from merged `intervals`."""
+    result: List[Interval] = []
+    for start, end in intervals:
+        for excluded_start, excluded_end in excluded:
+            if excluded_end < start or excluded_start > end:
+                continue
+            if excluded_start > start:
+                result.append((start, excluded_start - 1))
+            start = excluded_end + 1
+            if start > end:
+                break
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+def _interval(window: Dict[str, Any]) -> Interval:
+    return to_ordinal(window["start_date"]), to_ordinal(window["end_date"])
+
+
+def _windows(intervals: List[Interval]) -> List[Dict[str, str]]:
+    return [{"start_date": from_ordinal(start), "end_date": from_ordinal(end)} for start, end in intervals]
+
+
+def batch_date_resolver_tool(
+    time_expressions: List[str],
+    reference_date: Optional[str] = None,
+    combine: str = "union"
+) -> Dict[str, Any]:
+    """
+    Resolve several time expressions in one call and combine them into date windows.
+
+    Every date mention in every expression is resolved with the same grammar
+    as date_resolver_tool. Mentions preceded by "not", "except", "excluding"
+    or "avoid" are exclusions and are cut out of the result.
+
+    Args:
+        time_expressions: Expressions such as ["in 3 months", "next summer", "not December"];
+            one expression may also hold several mentions ("june or july, but not late july")
+        reference_date: Reference date in YYYY-MM-DD format (defaults to today)
+        combine: "union" to accept any expression's dates, "intersection" to
+            require dates that satisfy every expression
+
+    Returns:
+        Dictionary with the merged date windows, the overall start/end dates,
+        what was excluded, and how each expression was resolved
+    """
+    reference_date, error = _reference_date(reference_date)
+    if error:
+        return error
+    if combine not in ("union", "intersection"):
+        return {"error": "combine must be 'union' or 'intersection'", "combine": combine}
+
+    ref = date.fromisoformat(reference_date)
+    resolved = []
+    unresolved = []
+    included: List[List[Interval]] = []
+    excluded: List[Interval] = []
+    confidences = []
+
+    for expression in time_expressions:
+        text = normalize_expression(expression)
+        mentions = []
+        expression_intervals: List[Interval] = []
+        for match in DATE_PATTERN.finditer(text):
+            window = resolve_expression(match.group(0), reference_date)
+            if window.get("note") == _FALLBACK_NOTE:
+                continue
+            negated = _NEGATION.search(text, 0, match.start()) is not None
+            mentions.append(dict(window, text=match.group(0), excluded=negated))
+            confidences.append(window["confidence"])
+            if negated:
+                excluded.append(_interval(window))
             else:
-                next_month = month_num + 1
-                next_year = current_year
-            
-            last_day = (datetime(next_year, next_month, 1) - timedelta(days=1)).day
-            
-            return {
-                "start_date": f"{current_year}-{month_num:02d}-01",
-                "end_date": f"{current_year}-{month_num:02d}-{last_day}",
-                "month": month_name,
-                "confidence": 0.7
-            }
-    
-    # Default fallback
-    return {
-        "start_date": ref_date.strftime("%Y-%m-%d"),
-        "end_date": (ref_date + timedelta(days=30)).strftime("%Y-%m-%d"),
-        "confidence": 0.3,
-        "note": "Could not parse specific date, using approximate range"
+                expression_intervals.append(_interval(window))
+        if not mentions:
+            unresolved.append(expression)
+        if expression_intervals:
+            included.append(_merge(expression_intervals))
+        resolved.append({"expression": expression, "mentions": mentions})
+
+    if not included:
+        # Only exclusions (or nothing) given: search the coming year
+        horizon = ref.toordinal() + (EXCLUSION_HORIZON_DAYS if excluded else 30)
+        included.append([(ref.toordinal(), horizon)])
+        confidences.append(0.3)
+
+    if combine == "intersection":
+        intervals = included[0]
+        for expression_intervals in included[1:]:
+            intervals = _intersect(intervals, expression_intervals)
+    else:
+        intervals = _merge([interval for expression_intervals in included for interval in expression_intervals])
+    intervals = _subtract(intervals, _merge(excluded))
+
+    result: Dict[str, Any] = {
+        "windows": _windows(intervals),
+        "start_date": from_ordinal(intervals[0][0]) if intervals else None,
+        "end_date": from_ordinal(intervals[-1][1]) if intervals else None,
+        "excluded": _windows(_merge(excluded)),
+        "combine": combine,
+        "resolved": resolved,
+        "unresolved": unresolved,
+        "confidence": min(confidences)
     }
+    if not intervals:
+        result["note"] = "No dates satisfy all of the constraints"
+    return result
@@ -0,0 +1,32 @@
+"""
+Date helpers shared by the cruise booking tools.
+"""
+from datetime import date
+import calendar
+
+
+def to_ordinal(value: str) -> int:
+    """Parse a YYYY-MM-DD date into a day ordinal (raises ValueError if malformed)."""
+    return date.fromisoformat(value).toordinal()
+
+
+def from_ordinal(ordinal: int) -> str:
+    """Format a day ordinal as YYYY-MM-DD."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def last_day_of_month(year: int, month: int) -> int:
+    """Return the number of days in the given month."""
+    return calendar.monthrange(year, month)[1]
+
+
+def add_months(value: date, months: int) -> date:
+    """
+    Add calendar months to a date, clamping to the end of shorter months.
+
+    For example, January 31 plus one month is February 28 (or 29).
+    """
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, last_day_of_month(year, month)))
@@ -0,0 +1,108 @@
+"""
+Rolling-window error counters behind get_error_summary.
+
+Errors are counted in a ring of per-minute buckets keyed by (agent, error
+type, severity). Recording is O(1); a summary over the last N hours visits
+at most N * 60 buckets and never rereads the error log.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+import os
+import threading
+import time
+
+
+BucketKey = Tuple[str, str, str]
+
+
+class RollingErrorCounter:
+    """
+    Per-minute error counts over a fixed retention window.
+
+    Args:
+        retention_hours: How far back summaries can look
+        bucket_seconds: Width of each bucket
+        recent_size: Number of recent errors kept for summaries
+        clock: Time source returning epoch seconds
+    """
+
+    def __init__(self, retention_hours: int = 24, bucket_seconds: int = 60, recent_size: int = 100, clock=time.time):
+        self.bucket_seconds = bucket_seconds
+        self.size = max(1, retention_hours * 3600 // bucket_seconds)
+        self._clock = clock
+        self._slots: List[Optional[int]] = [None] * self.size
+        self._counts: List[Dict[BucketKey, int]] = [{} for _ in range(self.size)]
+        self._recent: "deque[Dict[str, Any]]" = deque(maxlen=recent_size)
+        self._lock = threading.Lock()
+
+    @property
+    def retention_hours(self) -> float:
+        return self.size * self.bucket_seconds / 3600
+
+    def record(
+        self,
+        agent_name: str,
+        error_type: str,
+        severity: str,
+        summary: Optional[Dict[str, Any]] = None,
+        at: Optional[float] = None
+    ) -> None:
+        """Count one error; `summary` is kept in the recent-errors list."""
+        slot = int((self._clock() if at is None else at) // self.bucket_seconds)
+        index = slot % self.size
+        key = (agent_name, error_type, severity)
+        with self._lock:
+            if self._slots[index] != slot:
+                # The bucket last held a minute that has left the window
+                self._slots[index] = slot
+                self._counts[index] = {}
+            counts = self._counts[index]
+            counts[key] = counts.get(key, 0) + 1
+            if summary is not None:
+                self._recent.append(dict(summary, _slot=slot))
+
+    def window(
+        self,
+        hours_back: float,
+        agent_name: Optional[str] = None,
+        error_type: Optional[str] = None
+    ) -> Tuple[Dict[BucketKey, int], List[Dict[str, Any]]]:
+        """
+        Sum the buckets of the last `hours_back` hours (capped at the retention window).
+
+        Returns:
+            (counts by (agent, type, severity), recent errors newest first)
+        """
+        now_slot = int(self._clock() // self.bucket_seconds)
+        buckets = min(self.size, max(1, int(hours_back * 3600 // self.bucket_seconds)))
+        first_slot = now_slot - buckets + 1
+        totals: Dict[BucketKey, int] = {}
+        with self._lock:
+            for slot in range(first_slot, now_slot + 1):
+                index = slot % self.size
+                if self._slots[index] != slot:
+                    continue
+                for key, count in self._counts[index].items():
+                    if (agent_name and key[0] != agent_name) or (error_type and key[1] != error_type):
+                        continue
+                    totals[key] = totals.get(key, 0) + count
+            recent = [
+                {field: value for field, value in error.items() if field != "_slot"}
+                for error in reversed(self._recent)
+                if error["_slot"] >= first_slot
+                and (not agent_name or error.get("agent_name") == agent_name)
+                and (not error_type or error.get("error_type") == error_type)
+            ]
+        return totals, recent
+
+    def clear(self) -> None:
+        """Forget all counts and recent errors."""
+        with self._lock:
+            self._slots = [None] * self.size
+            self._counts = [{} for _ in range(self.size)]
+            self._recent.clear()
+
+
+error_counter = RollingErrorCounter(
+    retention_hours=int(os.getenv("ERROR_SUMMARY_RETENTION_HOURS", "24"))
+)
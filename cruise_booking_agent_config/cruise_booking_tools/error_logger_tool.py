@@ -1,9 +1,21 @@
 """
 Error Logger Tool for logging and monitoring errors.
 """
-from typing import Dict, Any, Optional
-from datetime import datetime
-import json
+from typing import Dict, Any, Optional, Tuple
+
+from .error_aggregator import error_counter
+from .log_sink import error_ids, get_error_sink
+
+
+SEVERITIES = ("low", "medium", "high", "critical")
+
+# Suggested follow-up per error type, used to build summary recommendations
+RECOMMENDATIONS: Dict[str, str] = {
+    "API_FAILURE": "Monitor API response times and consider retry logic for {agent}",
+    "TIMEOUT_ERROR": "Review timeouts and slow dependencies used by {agent}",
+    "VALIDATION_ERROR": "Improve input validation for {agent}",
+    "SYSTEM_ERROR": "Investigate system errors raised in {agent}"
+}
 
 
 def error_logger_tool(
@@ -28,27 +40,38 @@ def error_logger_tool(
     Returns:
         Dictionary containing logging confirmation
     """
-    # Mock implementation - in real scenario, this would log to actual monitoring system
+    error_id, logged_at = error_ids.next()
     error_log = {
-        "error_id": f"ERR_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-        "timestamp": datetime.now().isoformat(),
+        "error_id": error_id,
+        "timestamp": logged_at.isoformat(),
         "error_type": error_type,
         "error_message": error_message,
         "agent_name": agent_name,
         "user_input": user_input,
-        "context": context or {},
+        "context": dict(context) if context else {},
         "severity": severity,
         "status": "logged"
     }
     
-    # In a real implementation, this would be sent to a logging service
-    print(f"ERROR LOGGED: {json.dumps(error_log, indent=2)}")
+    # Serialized and written to the JSONL log by the sink's background thread
+    accepted = get_error_sink().submit(error_log)
+    error_counter.record(agent_name, error_type, severity, {
+        "error_id": error_id,
+        "timestamp": error_log["timestamp"],
+        "agent_name": agent_name,
+        "error_type": error_type,
+        "error_message": error_message,
+        "severity": severity
+    })
     
     return {
         "error_id": error_log["error_id"],
-        "status": "logged",
+        "status": "logged" if accepted else "dropped",
         "timestamp": error_log["timestamp"],
-        "message": "Error has been logged for monitoring and analysis"
+        "message": (
+            "Error has been logged for monitoring and analysis" if accepted
+            else "Error log is saturated; this error was counted but not written"
+        )
     }
 
 
@@ -59,60 +82,52 @@ def get_error_summary(
 ) -> Dict[str, Any]:
     """
     Get a summary of recent errors for monitoring.
+
+    Counts come from rolling per-minute buckets fed by error_logger_tool, so
+    the cost depends on hours_back, not on how many errors were logged.
+    Windows are capped at ERROR_SUMMARY_RETENTION_HOURS (default 24).
     
     Args:
         agent_name: Filter by specific agent (optional)
         error_type: Filter by error type (optional)
-        hours_back: Number of hours to look back (default 24)
+        hours_back: Number of hours to look back (default 24, at least 1)
     
     Returns:
         Dictionary containing error summary
     """
-    # Mock implementation - in real scenario, this would query actual logs
-    mock_summary = {
-        "summary_period": f"Last {hours_back} hours",
-        "total_errors": 15,
-        "errors_by_agent": {
-            "IntentUnderstandingAgent": 3,
-            "CruiseSearchAgent": 7,
-            "CruiseBookingAgent": 4,
-            "ExceptionHandlingAgent": 1
-        },
-        "errors_by_type": {
-            "API_FAILURE": 8,
-            "VALIDATION_ERROR": 4,
-            "TIMEOUT_ERROR": 2,
-            "SYSTEM_ERROR": 1
-        },
-        "errors_by_severity": {
-            "low": 5,
-            "medium": 8,
-            "high": 2,
-            "critical": 0
-        },
-        "recent_errors": [
-            {
-                "error_id": "ERR_20240115_103000",
-                "timestamp": "2024-01-15T10:30:00Z",
-                "agent_name": "CruiseSearchAgent",
-                "error_type": "API_FAILURE",
-                "error_message": "Cruise search API timeout",
-                "severity": "medium"
-            },
-            {
-                "error_id": "ERR_20240115_102500",
-                "timestamp": "2024-01-15T10:25:00Z",
-                "agent_name": "CruiseBookingAgent",
-                "error_type": "VALIDATION_ERROR",
-                "error_message": "Invalid passenger information format",
-                "severity": "low"
-            }
-        ],
-        "recommendations": [
-            "Monitor API response times for CruiseSearchAgent",
-            "Improve input validation for passenger information",
-            "Consider implementing retry logic for API calls"
-        ]
+    if hours_back < 1:
+        return {
+            "error": "hours_back must be at least 1",
+            "hours_back": hours_back
+        }
+
+    counts, recent = error_counter.window(hours_back, agent_name, error_type)
+
+    errors_by_agent: Dict[str, int] = {}
+    errors_by_type: Dict[str, int] = {}
+    errors_by_severity: Dict[str, int] = {severity: 0 for severity in SEVERITIES}
+    errors_by_agent_and_type: Dict[Tuple[str, str], int] = {}
+    for (agent, kind, severity), count in counts.items():
+        errors_by_agent[agent] = errors_by_agent.get(agent, 0) + count
+        errors_by_type[kind] = errors_by_type.get(kind, 0) + count
+        errors_by_severity[severity] = errors_by_severity.get(severity, 0) + count
+        errors_by_agent_and_type[(agent, kind)] = errors_by_agent_and_type.get((agent, kind), 0) + count
+
+    top = sorted(errors_by_agent_and_type.items(), key=lambda item: (-item[1], item[0]))[:3]
+    recommendations = [
+        RECOMMENDATIONS.get(kind, "Review recent {kind} errors in {agent}").format(agent=agent, kind=kind)
+        for (agent, kind), _ in top
+    ]
+
+    covered_hours = min(hours_back, error_counter.retention_hours)
+    total_errors = sum(counts.values())
+    return {
+        "summary_period": f"Last {covered_hours:g} hours",
+        "total_errors": total_errors,
+        "errors_per_hour": round(total_errors / covered_hours, 2) if covered_hours else 0.0,
+        "errors_by_agent": dict(sorted(errors_by_agent.items(), key=lambda item: -item[1])),
+        "errors_by_type": dict(sorted(errors_by_type.items(), key=lambda item: -item[1])),
+        "errors_by_severity": errors_by_severity,
+        "recent_errors": recent[:10],
+        "recommendations": recommendations
     }
-    
-    return mock_summary
@@ -0,0 +1,320 @@
+"""
+Itinerary Catalog for cruise search.
+
+The catalog is loaded once per process and stored column by column, with
+indexes over sailing dates, price, cruise line, duration and destination so
+that search filters become bisect lookups and set intersections instead of a
+per-row scan.
+"""
+from typing import Dict, Any, List, Optional, Set, Iterable, Tuple
+from bisect import bisect_left, bisect_right
+import threading
+
+import numpy as np
+
+from .date_utils import to_ordinal
+from .itinerary_embeddings import ActivityIndex, itinerary_document
+
+
+# Mock catalog - in real scenario, this would be loaded from the cruise inventory service
+ITINERARIES: List[Dict[str, Any]] = [
+    {
+        "itinerary_id": "CAR001",
+        "title": "7-Night Eastern Caribbean",
+        "cruise_line": "Royal Caribbean",
+        "ship": "Symphony of the Seas",
+        "departure_port": "Miami, Florida",
+        "ports": ["Nassau, Bahamas", "St. Thomas, USVI", "St. Maarten"],
+        "duration": "7 nights",
+        "departure_date": "2024-06-15",
+        "return_date": "2024-06-22",
+        "starting_price": 899.00,
+        "currency": "USD",
+        "availability": "Available",
+        "highlights": ["Largest cruise ship", "Broadway shows", "Water slides", "Fine dining"],
+        "amenities": ["WiFi", "Gym", "Spa", "Casino", "Multiple restaurants"],
+        "cabin_types": ["Interior", "Oceanview", "Balcony", "Suite"]
+    },
+    {
+        "itinerary_id": "MED002",
+        "title": "10-Night Mediterranean Explorer",
+        "cruise_line": "Celebrity Cruises",
+        "ship": "Celebrity Edge",
+        "departure_port": "Barcelona, Spain",
+        "ports": ["Rome, Italy", "Santorini, Greece", "Mykonos, Greece", "Naples, Italy"],
+        "duration": "10 nights",
+        "departure_date": "2024-07-20",
+        "return_date": "2024-07-30",
+        "starting_price": 1299.00,
+        "currency": "USD",
+        "availability": "Available",
+        "highlights": ["Modern luxury", "Michelin-starred dining", "Art collection", "Rooftop garden"],
+        "amenities": ["WiFi", "Spa", "Fine dining", "Art gallery", "Rooftop terrace"],
+        "cabin_types": ["Interior", "Oceanview", "Balcony", "Suite"]
+    },
+    {
+        "itinerary_id": "ALASKA003",
+        "title": "7-Night Alaska Glacier Discovery",
+        "cruise_line": "Princess Cruises",
+        "ship": "Royal Princess",
+        "departure_port": "Seattle, Washington",
+        "ports": ["Juneau, Alaska", "Skagway, Alaska", "Glacier Bay", "Ketchikan, Alaska"],
+        "duration": "7 nights",
+        "departure_date": "2024-08-10",
+        "return_date": "2024-08-17",
+        "starting_price": 1099.00,
+        "currency": "USD",
+        "availability": "Available",
+        "highlights": ["Glacier viewing", "Wildlife spotting", "Scenic cruising", "Alaska culture"],
+        "amenities": ["WiFi", "Naturalist talks", "Observation deck", "Alaska cuisine"],
+        "cabin_types": ["Interior", "Oceanview", "Balcony", "Suite"]
+    }
+]
+
+# Columns holding lists; these are copied when a row is materialized
+LIST_FIELDS = ("ports", "highlights", "amenities", "cabin_types")
+
+# Fields in the order they appear in a search result
+FIELDS = tuple(ITINERARIES[0].keys())
+
+
+def _parse_nights(duration: str) -> Optional[int]:
+    """Parse a duration string such as "7 nights" into a number of nights."""
+    parts = duration.split()
+    if parts and parts[0].isdigit():
+        return int(parts[0])
+    return None
+
+
+def parse_duration_preference(duration_preference: str) -> Optional[int]:
+    """
+    Convert a duration preference into a number of nights.
+
+    Args:
+        duration_preference: Preference such as "1 week", "2 weeks" or "7 nights"
+
+    Returns:
+        Number of nights, or None if the preference can't be parsed
+    """
+    parts = duration_preference.lower().split()
+    if len(parts) < 2 or not parts[0].isdigit():
+        return None
+    amount = int(parts[0])
+    if "week" in parts[1]:
+        return amount * 7
+    if "night" in parts[1]:
+        return amount
+    return None
+
+
+class SailingIntervalIndex:
+    """
+    Interval index over (departure_date, return_date) pairs.
+
+    Dates are parsed once into day ordinals and kept in arrays sorted by
+    departure, so a date-window query is two bisects plus the k matches.
+    """
+
+    def __init__(self, intervals: List[Tuple[int, int]]):
+        order = sorted(range(len(intervals)), key=lambda row: intervals[row])
+        self.rows: List[int] = order
+        self.departures: List[int] = [intervals[row][0] for row in order]
+        self.returns: List[int] = [intervals[row][1] for row in order]
+
+    def query(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        contained: bool = False
+    ) -> Set[int]:
+        """
+        Return rows departing within [start, end] (day ordinals, either may be open).
+
+        Args:
+            start: First allowed departure day
+            end: Last allowed departure day
+            contained: Also require the sailing to return by `end`
+
+        Returns:
+            Set of matching row ids
+        """
+        low = 0 if start is None else bisect_left(self.departures, start)
+        high = len(self.departures) if end is None else bisect_right(self.departures, end)
+        if not contained or end is None:
+            return set(self.rows[low:high])
+        return {self.rows[i] for i in range(low, high) if self.returns[i] <= end}
+
+
+def _destination_keys(port: str) -> List[str]:
+    """Return the lowercase lookup keys for a port ("Nassau, Bahamas" -> nassau, bahamas)."""
+    return [part.strip().lower() for part in port.split(",") if part.strip()]
+
+
+class ItineraryCatalog:
+    """
+    Columnar, indexed view over the itinerary records.
+
+    Each field is stored as its own column (a list indexed by row id). Indexes:
+        - id_index: itinerary_id -> row id
+        - date_index: sailing (departure, return) intervals as sorted day ordinals
+        - price_index: row ids sorted by starting price, searched with bisect
+        - cruise_line_index: normalized cruise line -> set of row ids
+        - duration_index: number of nights -> set of row ids
+        - destination_index: normalized port name/region -> set of row ids
+        - activity_index: embeddings of highlights and amenities for ranking
+
+    NumPy copies of the filterable columns (`departure_array`, `price_array`,
+    `nights_array`, `cruise_line_codes`, `destination_matrix`) back the
+    vectorized batch search.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], version: int = 1):
+        records = list(records)
+        self.version = version
+        self.size = len(records)
+        self.columns: Dict[str, List[Any]] = {
+            field: [record[field] for record in records] for field in FIELDS
+        }
+        self.all_rows: Set[int] = set(range(self.size))
+        self.id_index: Dict[str, int] = {
+            itinerary_id: row for row, itinerary_id in enumerate(self.columns["itinerary_id"])
+        }
+
+        self.date_index = SailingIntervalIndex([
+            (to_ordinal(departure), to_ordinal(return_date))
+            for departure, return_date in zip(self.columns["departure_date"], self.columns["return_date"])
+        ])
+
+        # Sorted price index: parallel lists of prices and row ids
+        order = sorted(range(self.size), key=lambda row: self.columns["starting_price"][row])
+        self.sorted_prices: List[float] = [self.columns["starting_price"][row] for row in order]
+        self.price_order: List[int] = order
+
+        self.cruise_line_index: Dict[str, Set[int]] = {}
+        self.duration_index: Dict[int, Set[int]] = {}
+        self.destination_index: Dict[str, Set[int]] = {}
+
+        for row in range(self.size):
+            line = self.columns["cruise_line"][row].lower()
+            self.cruise_line_index.setdefault(line, set()).add(row)
+
+            nights = _parse_nights(self.columns["duration"][row])
+            if nights is not None:
+                self.duration_index.setdefault(nights, set()).add(row)
+
+            for port in self.columns["ports"][row]:
+                for key in _destination_keys(port):
+                    self.destination_index.setdefault(key, set()).add(row)
+
+        # Vectorized columns for evaluating many queries at once
+        self.departure_array = np.array(
+            [to_ordinal(departure) for departure in self.columns["departure_date"]], dtype=np.int64
+        )
+        self.price_array = np.array(self.columns["starting_price"], dtype=np.float64)
+        self.nights_array = np.array(
+            [_parse_nights(duration) or -1 for duration in self.columns["duration"]], dtype=np.int64
+        )
+        self.cruise_line_names: List[str] = list(self.cruise_line_index)
+        line_codes = {name: code for code, name in enumerate(self.cruise_line_names)}
+        self.cruise_line_codes = np.array(
+            [line_codes[line.lower()] for line in self.columns["cruise_line"]], dtype=np.intp
+        )
+        self.destination_keys: Dict[str, int] = {
+            key: column for column, key in enumerate(self.destination_index)
+        }
+        self.destination_matrix = np.zeros((self.size, len(self.destination_keys)), dtype=np.float32)
+        for key, rows in self.destination_index.items():
+            self.destination_matrix[list(rows), self.destination_keys[key]] = 1.0
+
+        self.activity_index = ActivityIndex([
+            itinerary_document(self.columns["highlights"][row], self.columns["amenities"][row])
+            for row in range(self.size)
+        ])
+
+    def row(self, row: int, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Materialize a single row as a result dictionary, optionally projected to `fields`."""
+        result = {}
+        for field in (FIELDS if fields is None else fields):
+            if field not in self.columns:
+                continue
+            value = self.columns[field][row]
+            result[field] = list(value) if field in LIST_FIELDS else value
+        return result
+
+    def rows_in_date_window(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Set[int]:
+        """Return row ids departing between start_date and end_date (YYYY-MM-DD, inclusive)."""
+        return self.date_index.query(
+            to_ordinal(start_date) if start_date else None,
+            to_ordinal(end_date) if end_date else None
+        )
+
+    def rows_in_price_range(self, low: Optional[float] = None, high: Optional[float] = None) -> Set[int]:
+        """Return row ids whose starting price is within [low, high]."""
+        start = 0 if low is None else bisect_left(self.sorted_prices, low)
+        end = self.size if high is None else bisect_right(self.sorted_prices, high)
+        return set(self.price_order[start:end])
+
+    def rows_for_cruise_lines(self, cruise_lines: List[str]) -> Set[int]:
+        """
+        Return row ids for the requested cruise lines.
+
+        Exact names are a single hash lookup; partial names ("celebrity") fall
+        back to a scan over the distinct cruise lines, never over the rows.
+        """
+        rows: Set[int] = set()
+        for name in self.matching_cruise_lines(cruise_lines):
+            rows |= self.cruise_line_index[name]
+        return rows
+
+    def matching_cruise_lines(self, cruise_lines: List[str]) -> List[str]:
+        """Return the normalized catalog cruise line names matching the requested lines."""
+        names = []
+        for line in cruise_lines:
+            line = line.lower().strip()
+            if line in self.cruise_line_index:
+                names.append(line)
+                continue
+            names.extend(name for name in self.cruise_line_index if line in name)
+        return names
+
+    def rows_for_destinations(self, destinations: List[str]) -> Set[int]:
+        """Return row ids that call at any of the requested destinations."""
+        rows: Set[int] = set()
+        for destination in destinations:
+            rows |= self.destination_index.get(destination.lower().strip(), set())
+        return rows
+
+    def rows_for_nights(self, nights: int) -> Set[int]:
+        """Return row ids with the given number of nights."""
+        return self.duration_index.get(nights, set())
+
+
+_catalog: Optional[ItineraryCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_itinerary_catalog() -> ItineraryCatalog:
+    """Return the process-wide itinerary catalog, building it on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ItineraryCatalog(ITINERARIES)
+    return _catalog
+
+
+def load_itinerary_catalog(records: Iterable[Dict[str, Any]]) -> ItineraryCatalog:
+    """
+    Replace the process-wide catalog with new itinerary records.
+
+    Args:
+        records: Itinerary records with the same fields as ITINERARIES
+
+    Returns:
+        The new catalog, with its version incremented
+    """
+    global _catalog
+    with _catalog_lock:
+        version = _catalog.version + 1 if _catalog is not None else 1
+        _catalog = ItineraryCatalog(records, version=version)
+    return _catalog
@@ -0,0 +1,183 @@
+"""
+Offline embedding index for ranking itineraries by activity preferences.
+
+Each itinerary's highlights and amenities are embedded with a local hashing
+TF-IDF embedder (no model download or network call). Queries are scored
+against all candidates with a single batched matrix multiply.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import re
+import zlib
+
+import numpy as np
+
+
+EMBEDDING_DIM = 1024
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Activity categories produced by the preference extractor, expanded into
+# words that appear in itinerary highlights and amenities
+ACTIVITY_EXPANSIONS: Dict[str, List[str]] = {
+    'dining': ['dining', 'food', 'restaurant', 'cuisine', 'chef', 'culinary'],
+    'entertainment': ['entertainment', 'shows', 'music', 'comedy', 'theater', 'nightlife', 'broadway'],
+    'wellness': ['spa', 'wellness', 'fitness', 'gym', 'yoga', 'massage', 'relaxation'],
+    'adventure': ['adventure', 'excursions', 'exploration', 'hiking', 'diving', 'wildlife', 'glacier'],
+    'family': ['family', 'kids', 'children', 'water slides'],
+    'romance': ['romance', 'honeymoon', 'couples', 'romantic', 'fine dining'],
+    'gambling': ['casino', 'gambling', 'poker', 'blackjack', 'slots'],
+    'shopping': ['shopping', 'boutiques', 'stores', 'retail']
+}
+
+
+def _features(text: str) -> List[str]:
+    """Split text into word features plus a short stem so plurals match."""
+    features = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        features.append(token)
+        if len(token) > 5:
+            features.append("~" + token[:5])
+    return features
+
+
+def _bucket(feature: str) -> int:
+    """Stable hash bucket for a feature (crc32, unlike hash(), is not salted per process)."""
+    return zlib.crc32(feature.encode("utf-8")) % EMBEDDING_DIM
+
+
+def _term_counts(texts: Sequence[str]) -> np.ndarray:
+    """Hash each text into a row of term counts."""
+    counts = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = [_bucket(feature) for feature in _features(text)]
+        if buckets:
+            np.add.at(counts[row], buckets, 1.0)
+    return counts
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ActivityIndex:
+    """
+    TF-IDF weighted hashing embeddings for a list of documents.
+
+    Row i of `matrix` is the unit-length embedding of document i.
+    """
+
+    def __init__(self, documents: Sequence[str]):
+        counts = _term_counts(documents)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        size = len(documents)
+        self.idf = (np.log((1.0 + size) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        self.matrix = _normalize(counts * self.idf)
+
+    def embed(self, queries: Sequence[str]) -> np.ndarray:
+        """Embed queries into the same space as the documents."""
+        return _normalize(_term_counts(queries) * self.idf)
+
+    def score(self, activities: Sequence[str], rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Score documents against a set of activities.
+
+        Args:
+            activities: Activity preferences; known categories are expanded
+            rows: Document rows to score (defaults to all documents)
+
+        Returns:
+            One score per row: the mean cosine similarity across activities
+        """
+        documents = self.matrix if rows is None else self.matrix[np.asarray(rows, dtype=np.intp)]
+        return (documents @ self.embed(_expand(activities)).T).mean(axis=1)
+
+    def score_batch(self, activity_sets: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Score all documents against several activity sets with one matrix multiply.
+
+        Returns:
+            (len(activity_sets), documents) matrix of mean cosine similarities;
+            rows for empty activity sets are zero
+        """
+        queries: List[str] = []
+        spans: List[Tuple[int, int]] = []
+        for activities in activity_sets:
+            spans.append((len(queries), len(queries) + len(activities)))
+            queries.extend(_expand(activities))
+        scores = np.zeros((len(activity_sets), self.matrix.shape[0]), dtype=np.float32)
+        if not queries:
+            return scores
+        similarities = self.embed(queries) @ self.matrix.T
+        for position, (start, end) in enumerate(spans):
+            if end > start:
+                scores[position] = similarities[start:end].mean(axis=0)
+        return scores
+
+    def top_k(
+        self,
+        activities: Sequence[str],
+        rows: Sequence[int],
+        k: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank rows by similarity to the activities.
+
+        Args:
+            activities: Activity preferences
+            rows: Candidate document rows
+            k: Maximum number of results (defaults to all rows)
+
+        Returns:
+            (row, score) pairs for every row, best first; rows sharing no
+            activity terms score 0 and come last
+        """
+        if len(rows) == 0 or not activities:
+            return []
+        rows = np.asarray(rows, dtype=np.intp)
+        return rank_scores(rows, self.score(activities, rows), k)
+
+
+def _expand(activities: Sequence[str]) -> List[str]:
+    """Expand known activity categories into query text."""
+    return [
+        " ".join(ACTIVITY_EXPANSIONS.get(activity.lower().strip(), [activity]))
+        for activity in activities
+    ]
+
+
+def rank_scores(rows: np.ndarray, scores: np.ndarray, k: Optional[int] = None) -> List[Tuple[int, float]]:
+    """
+    Order rows by score.
+
+    Activities rank results rather than filter them: every row is kept, and
+    rows sharing no activity terms score 0 and sort last.
+
+    Args:
+        rows: Candidate rows
+        scores: Score for each candidate row
+        k: Maximum number of results (defaults to all rows)
+
+    Returns:
+        (row, score) pairs, best first, ties broken by row order
+    """
+    if k is not None and k <= 0:
+        return []
+    # Float noise around zero must not reorder rows that match no activity
+    scores = np.where(scores > 1e-6, scores, 0.0)
+    candidates = np.arange(len(rows))
+    if k is not None and k < len(candidates):
+        # argpartition picks arbitrarily among scores tied with the k-th best,
+        # so keep every tied row and let the sort below choose by row order
+        cutoff = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= cutoff)
+    order = candidates[np.lexsort((rows[candidates], -scores[candidates]))][:k]
+    return [(int(rows[i]), float(scores[i])) for i in order]
+
+
+def itinerary_document(highlights: Sequence[str], amenities: Sequence[str]) -> str:
+    """Build the text that is embedded for an itinerary."""
+    return " ".join(list(highlights) + list(amenities))
+
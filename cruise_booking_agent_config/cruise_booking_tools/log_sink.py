@@ -0,0 +1,244 @@
+"""
+Non-blocking, batched JSONL log sink for the error logger.
+
+Callers only enqueue a record into a bounded buffer; a background thread
+serializes records as compact JSON and appends them to a JSONL file in
+batches, rotating the file by size. When the buffer is full the sink either
+drops the record or blocks for a bounded time, depending on its policy, so
+an error burst never turns into unbounded memory or unbounded latency.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+
+BACKPRESSURE_POLICIES = ("drop", "block")
+
+
+class ErrorIdGenerator:
+    """
+    Monotonic, collision-free error IDs.
+
+    IDs carry a microsecond timestamp; when two errors land in the same
+    microsecond (or the clock steps back) the later one takes the next free
+    microsecond. The process ID suffix keeps workers sharing a log apart.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> Tuple[str, datetime]:
+        """Return a new (error_id, timestamp) pair."""
+        with self._lock:
+            micros = max(int(self._clock() * 1_000_000), self._last + 1)
+            self._last = micros
+        moment = datetime.fromtimestamp(micros / 1_000_000)
+        # Read the PID per call so forked workers don't share a suffix
+        return f"ERR_{moment.strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid():x}", moment
+
+
+class JsonlLogSink:
+    """
+    Bounded, batching JSONL writer running on its own thread.
+
+    Args:
+        path: JSONL file to append to
+        max_queue: Records buffered before backpressure applies
+        batch_size: Most records written per batch
+        flush_interval: Longest time (seconds) a record waits before being written
+        max_bytes: Rotate the file when it would grow past this size (0 disables rotation)
+        backup_count: Rotated files to keep (path.1 ... path.N)
+        policy: "drop" to discard records when full, "block" to wait up to block_timeout
+        block_timeout: Longest time (seconds) a caller blocks under the "block" policy
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        policy: str = "drop",
+        block_timeout: float = 0.05
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"policy must be one of {BACKPRESSURE_POLICIES}, got {policy!r}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.write_errors = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._counter_lock = threading.Lock()
+        self._close_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="error-log-sink", daemon=True)
+        self._writer.start()
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """
+        Enqueue a record for writing; the record must not be modified afterwards.
+
+        Returns:
+            True if the record was accepted, False if it was dropped
+        """
+        accepted = False
+        if not self._closed:
+            try:
+                if self.policy == "block":
+                    self._queue.put(record, timeout=self.block_timeout)
+                else:
+                    self._queue.put_nowait(record)
+                accepted = True
+            except queue.Full:
+                pass
+        with self._counter_lock:
+            if accepted:
+                self.enqueued += 1
+            else:
+                self.dropped += 1
+        return accepted
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything enqueued so far has been written.
+
+        Once the sink is closed the writer writes what is left and stops, so
+        this only waits for that rather than queueing work nobody will pick up.
+        """
+        with self._close_lock:
+            if not self._closed:
+                done = threading.Event()
+                self._queue.put(done)
+        if self._closed:
+            self._writer.join(timeout)
+            return not self._writer.is_alive()
+        return done.wait(timeout)
+
+    def _next_batch(self) -> List[Any]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            records = [item for item in batch if isinstance(item, dict)]
+            if records:
+                try:
+                    self._write_batch(records)
+                except OSError:
+                    # Never let a full disk or bad path kill the writer thread
+                    self.write_errors += 1
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if batch[-1] is None:
+                return
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str) + "\n")
+            except (TypeError, ValueError):
+                # Circular references or non-string keys: drop the record, not the writer thread
+                with self._counter_lock:
+                    self.dropped += 1
+        if not lines:
+            return
+        data = "".join(lines).encode("utf-8")
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as handle:
+            handle.write(data)
+        self.written += len(lines)
+        self.batches += 1
+
+    def _rotate(self) -> None:
+        """Shift path -> path.1 -> ... -> path.N, dropping the oldest."""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.rotations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return sink counters for monitoring."""
+        return {
+            "path": self.path,
+            "policy": self.policy,
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors
+        }
+
+    def close(self) -> None:
+        """Write everything still buffered and stop the writer thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._writer.join()
+
+
+error_ids = ErrorIdGenerator()
+
+_sink: Optional[JsonlLogSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_error_sink() -> JsonlLogSink:
+    """Return the process-wide error log sink, configured from the environment on first use."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = JsonlLogSink(
+                    os.getenv("ERROR_LOG_FILE", "logs/errors.jsonl"),
+                    max_queue=int(os.getenv("ERROR_LOG_QUEUE_SIZE", "10000")),
+                    max_bytes=int(os.getenv("ERROR_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                    backup_count=int(os.getenv("ERROR_LOG_BACKUP_COUNT", "5")),
+                    policy=os.getenv("ERROR_LOG_BACKPRESSURE", "drop"),
+                    block_timeout=float(os.getenv("ERROR_LOG_BLOCK_TIMEOUT_MS", "50")) / 1000
+                )
+                atexit.register(_sink.close)
+    return _sink
@@ -0,0 +1,85 @@
+"""
+Eager pre-extraction of travel dates and preferences.
+
+A before-model callback that runs batch_date_resolver_tool and
+preference_extractor_tool concurrently on each new guest message and writes
+their output to session state, so the model reasons over ready-made facts
+instead of spending a round-trip deciding to call the tools. It runs once
+per invocation, whichever agent reaches the model first.
+"""
+import asyncio
+import json
+from typing import Dict, Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .date_resolver_tool import batch_date_resolver_tool
+from .preference_extractor_tool import PREFERENCES_STATE_KEY, preference_extractor_tool
+
+
+# Session state keys written by pre-extraction
+TRAVEL_DATES_STATE_KEY = "travel_dates"
+INVOCATION_STATE_KEY = "pre_extraction_invocation_id"
+
+
+def _message_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text).strip()
+
+
+def _travel_dates(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Keep the parts of a batch resolution worth remembering; None if the message named no dates."""
+    if "error" in result or not any(entry["mentions"] for entry in result["resolved"]):
+        return None
+    return {
+        "windows": result["windows"],
+        "start_date": result["start_date"],
+        "end_date": result["end_date"],
+        "excluded": result["excluded"],
+        "confidence": result["confidence"]
+    }
+
+
+async def pre_extract_before_model(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    Resolve dates and extract preferences from the guest's message before the model runs.
+
+    Args:
+        callback_context: Callback context with the invocation's user message and session state
+        llm_request: The request about to be sent to the model
+
+    Returns:
+        None, so the model is always called
+    """
+    state = callback_context.state
+    if state.get(INVOCATION_STATE_KEY) == callback_context.invocation_id:
+        return None
+    state[INVOCATION_STATE_KEY] = callback_context.invocation_id
+
+    text = _message_text(callback_context)
+    if not text:
+        return None
+
+    # Both tools are CPU-only; preference_extractor_tool is the only one touching state
+    dates, preferences = await asyncio.gather(
+        asyncio.to_thread(batch_date_resolver_tool, [text]),
+        asyncio.to_thread(preference_extractor_tool, text, callback_context)
+    )
+    travel_dates = _travel_dates(dates)
+    if travel_dates is not None:
+        state[TRAVEL_DATES_STATE_KEY] = travel_dates
+
+    # This request's instruction was rendered before the callback ran, so pass the facts along directly
+    facts = {PREFERENCES_STATE_KEY: preferences, TRAVEL_DATES_STATE_KEY: state.get(TRAVEL_DATES_STATE_KEY)}
+    llm_request.append_instructions([
+        "Facts pre-extracted from the guest's messages so far (no need to call the date or preference "
+        f"tools for these): {json.dumps(facts, separators=(',', ':'))}"
+    ])
+    return None
@@ -1,23 +1,217 @@
 """
 Preference Extractor Tool for extracting structured preferences from natural language.
+
+All keyword tables are compiled once into a single regex, together with the
+budget, party-size and duration patterns, so one pass over the input finds
+every preference. Keywords only match whole words ("royal" does not match
+inside "royalty").
+
+Given a tool context, extraction is incremental: the merged preferences and
+how much of the conversation has been scanned are kept in session state, so
+each turn only scans new text.
 """
+import hashlib
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from .date_resolver_tool import NUMBER_WORDS
+
+
+CRUISE_LINES: Dict[str, List[str]] = {
+    'royal caribbean': ['royal caribbean', 'rcl', 'royal'],
+    'carnival': ['carnival', 'ccl'],
+    'norwegian': ['norwegian', 'ncl', 'norwegian cruise line'],
+    'princess': ['princess', 'princess cruises'],
+    'celebrity': ['celebrity', 'celebrity cruises'],
+    'holland america': ['holland america', 'hal'],
+    'disney': ['disney', 'disney cruise line', 'dcl'],
+    'cunard': ['cunard', 'cunard line'],
+    'virgin': ['virgin', 'virgin voyages']
+}
+
+CABIN_TYPES: Dict[str, List[str]] = {
+    'interior': ['interior', 'inside', 'inside cabin'],
+    'oceanview': ['oceanview', 'ocean view', 'outside', 'outside cabin'],
+    'balcony': ['balcony', 'verandah', 'veranda'],
+    'suite': ['suite', 'penthouse', 'villa'],
+    'family': ['family', 'family cabin', 'family stateroom']
+}
+
+ACTIVITIES: Dict[str, List[str]] = {
+    'dining': ['dining', 'food', 'restaurant', 'cuisine', 'chef', 'culinary'],
+    'entertainment': ['entertainment', 'shows', 'music', 'comedy', 'theater', 'nightlife'],
+    'wellness': ['spa', 'wellness', 'fitness', 'gym', 'yoga', 'massage', 'relaxation'],
+    'adventure': ['adventure', 'excursions', 'shores', 'exploration', 'hiking', 'diving'],
+    'family': ['family', 'kids', 'children', 'family-friendly', 'activities for kids'],
+    'romance': ['romance', 'honeymoon', 'anniversary', 'couples', 'romantic'],
+    'gambling': ['casino', 'gambling', 'poker', 'blackjack', 'slots'],
+    'shopping': ['shopping', 'boutiques', 'stores', 'retail']
+}
+
+DESTINATIONS: Dict[str, List[str]] = {
+    'caribbean': ['caribbean', 'bahamas', 'jamaica', 'cozumel', 'st. thomas', 'st. maarten'],
+    'mediterranean': ['mediterranean', 'europe', 'italy', 'greece', 'spain', 'france'],
+    'alaska': ['alaska', 'alaskan', 'glacier', 'juneau', 'skagway'],
+    'northern europe': ['northern europe', 'scandinavia', 'norway', 'iceland', 'baltic'],
+    'asia': ['asia', 'japan', 'china', 'singapore', 'thailand', 'vietnam'],
+    'australia': ['australia', 'new zealand', 'south pacific', 'tahiti'],
+    'transatlantic': ['transatlantic', 'trans-atlantic', 'atlantic crossing'],
+    'panama canal': ['panama canal', 'panama', 'canal']
+}
+
+SPECIAL_REQUIREMENTS: Dict[str, List[str]] = {
+    'accessibility': ['wheelchair', 'accessible', 'disability', 'mobility'],
+    'dietary': ['vegetarian', 'vegan', 'gluten-free', 'kosher', 'halal', 'allergies'],
+    'pets': ['pet', 'dog', 'cat', 'animal'],
+    'smoking': ['smoking', 'non-smoking', 'cigar'],
+    'age_restrictions': ['adults only', '21+', '18+', 'senior', 'senior citizen']
+}
+
+# Output field -> keyword table; fields are listed in this table's order
+KEYWORD_FIELDS: Dict[str, Dict[str, List[str]]] = {
+    "cruise_lines": CRUISE_LINES,
+    "cabin_types": CABIN_TYPES,
+    "activities": ACTIVITIES,
+    "destinations": DESTINATIONS,
+    "special_requirements": SPECIAL_REQUIREMENTS
+}
 
+Target = Tuple[str, str]
 
-def preference_extractor_tool(user_input: str) -> Dict[str, Any]:
+
+def _word_pattern(phrase: str) -> "re.Pattern[str]":
+    return re.compile(rf"(?<![a-z0-9]){re.escape(phrase)}s?(?![a-z0-9])")
+
+
+def _build_keyword_targets() -> Dict[str, Set[Target]]:
     """
-    Extracts structured preferences from natural language input.
-    
-    Args:
-        user_input: Natural language input from the user
-    
-    Returns:
-        Dictionary containing extracted preferences
+    Map every keyword to the (field, value) pairs it implies.
+
+    The master regex only reports the longest keyword at a position, so a
+    phrase also carries the targets of the shorter keywords inside it
+    ("family cabin" is both a family cabin and a family activity).
     """
-    user_input = user_input.lower().strip()
-    
-    preferences = {
+    targets: Dict[str, Set[Target]] = {}
+    for field, table in KEYWORD_FIELDS.items():
+        for value, keywords in table.items():
+            for keyword in keywords:
+                targets.setdefault(keyword, set()).add((field, value))
+    for phrase in targets:
+        for keyword, keyword_targets in targets.items():
+            if keyword != phrase and _word_pattern(keyword).search(phrase):
+                targets[phrase] = targets[phrase] | keyword_targets
+    return targets
+
+
+KEYWORD_TARGETS = _build_keyword_targets()
+
+# Canonical order of each field's values, so results don't depend on match order
+_VALUE_ORDER: Dict[str, Dict[str, int]] = {
+    field: {value: position for position, value in enumerate(table)}
+    for field, table in KEYWORD_FIELDS.items()
+}
+
+
+def _alternation(words) -> str:
+    """
+    Regex matching any of `words`, longest first, built as a prefix trie.
+
+    A flat alternation retries every word at every position; the trie
+    branches on one character at a time, so a non-matching position costs a
+    single character test however many keywords there are.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if optional else group
+
+    return pattern(trie)
+
+
+_AMOUNT = r"\d+(?:,\d{3})*(?:\.\d{1,2})?"
+_COUNT = rf"\d+|{_alternation(NUMBER_WORDS)}"
+
+BUDGET_QUALIFIERS: Dict[str, str] = {
+    "under": "max", "below": "max", "less than": "max", "up to": "max", "at most": "max",
+    "no more than": "max", "max": "max", "maximum": "max",
+    "over": "min", "above": "min", "more than": "min", "at least": "min", "minimum": "min",
+    "around": "target", "about": "target", "roughly": "target", "approximately": "target"
+}
+
+# Words that can start a budget, party-size or duration mention
+_LEAD_WORDS = {"between", "party", "group", "family", *BUDGET_QUALIFIERS, *NUMBER_WORDS}
+
+# One pass finds budgets, party sizes, durations and keywords. Each match
+# starts at the separator before a word (the input is prefixed with a space),
+# and a lookahead on the lead words skips the numeric patterns at ordinary
+# words. At each position the first alternative that matches wins, so
+# "family of four" is a party size (which also implies the family keyword)
+# rather than a bare keyword.
+PREFERENCE_PATTERN = re.compile(rf"""
+    [^a-z0-9](?:
+        (?=[$0-9]|(?:{_alternation(_LEAD_WORDS)})[^a-z0-9])(?:
+        between\s*\$\s*(?P<budget_low>{_AMOUNT})\s*(?:and|-|to)\s*\$?\s*(?P<budget_high>{_AMOUNT})
+      | (?:(?P<budget_qualifier>{_alternation(BUDGET_QUALIFIERS)})\s*(?:of\s*)?)?\$\s*(?P<budget_amount>{_AMOUNT})
+        (?P<budget_thousands>k)?(?P<budget_per_person>\s*(?:per\s+person|pp|a\s+head|each))?
+      | (?P<party_word>party|group|family)\s+of\s+(?P<party_of>{_COUNT})
+      | (?P<party_count>{_COUNT})\s+(?P<party_unit>people|persons|guests|adults|passengers|travelers|travellers|couples?)
+      | (?P<duration_count>{_COUNT})[\s-]+(?P<duration_unit>day|night|week)s?
+        )
+      | (?P<keyword>{_alternation(KEYWORD_TARGETS)})s?
+    )(?![a-z0-9])
+""", re.VERBOSE)
+
+
+def _count(text: str) -> int:
+    return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+
+def _amount(text: str, thousands: Optional[str] = None) -> float:
+    amount = float(text.replace(',', ''))
+    return amount * 1000 if thousands else amount
+
+
+def _budget(match: "re.Match[str]", text: str) -> Optional[Dict[str, float]]:
+    """Budget for a dollar-amount match, or None if the amount isn't about the budget."""
+    if match.group("budget_low"):
+        return {"min": _amount(match.group("budget_low")), "max": _amount(match.group("budget_high"))}
+    qualifier = match.group("budget_qualifier")
+    if not qualifier and not match.group("budget_per_person") and "budget" not in text[:match.start()]:
+        return None
+    amount = _amount(match.group("budget_amount"), match.group("budget_thousands"))
+    return {BUDGET_QUALIFIERS.get(qualifier, "target"): amount}
+
+
+def _party_size(match: "re.Match[str]") -> int:
+    if match.group("party_of"):
+        return _count(match.group("party_of"))
+    count = _count(match.group("party_count"))
+    return count * 2 if match.group("party_unit").startswith("couple") else count
+
+
+def _duration(match: "re.Match[str]") -> str:
+    count = _count(match.group("duration_count"))
+    unit = match.group("duration_unit")
+    return f"{count} {unit}" if count == 1 else f"{count} {unit}s"
+
+
+def empty_preferences() -> Dict[str, Any]:
+    """Return a preferences dictionary with nothing extracted."""
+    return {
         "cruise_lines": [],
         "cabin_types": [],
         "budget_range": None,
@@ -27,136 +221,127 @@ def preference_extractor_tool(user_input: str) -> Dict[str, Any]:
         "party_size": None,
         "duration_preference": None
     }
-    
-    # Extract cruise line preferences
-    cruise_lines = {
-        'royal caribbean': ['royal caribbean', 'rcl', 'royal'],
-        'carnival': ['carnival', 'ccl'],
-        'norwegian': ['norwegian', 'ncl', 'norwegian cruise line'],
-        'princess': ['princess', 'princess cruises'],
-        'celebrity': ['celebrity', 'celebrity cruises'],
-        'holland america': ['holland america', 'hal'],
-        'disney': ['disney', 'disney cruise line', 'dcl'],
-        'cunard': ['cunard', 'cunard line'],
-        'virgin': ['virgin', 'virgin voyages']
-    }
-    
-    for line, keywords in cruise_lines.items():
-        if any(keyword in user_input for keyword in keywords):
-            preferences["cruise_lines"].append(line)
-    
-    # Extract cabin type preferences
-    cabin_types = {
-        'interior': ['interior', 'inside', 'inside cabin'],
-        'oceanview': ['oceanview', 'ocean view', 'outside', 'outside cabin'],
-        'balcony': ['balcony', 'verandah', 'veranda'],
-        'suite': ['suite', 'penthouse', 'villa'],
-        'family': ['family', 'family cabin', 'family stateroom']
-    }
-    
-    for cabin_type, keywords in cabin_types.items():
-        if any(keyword in user_input for keyword in keywords):
-            preferences["cabin_types"].append(cabin_type)
-    
-    # Extract budget information
-    budget_patterns = [
-        r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:per person|pp|per person)',
-        r'budget.*?\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-        r'around\s*\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-        r'under\s*\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-        r'less than\s*\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-        r'more than\s*\$(\d+(?:,\d{3})*(?:\.\d{2})?)',
-        r'over\s*\$(\d+(?:,\d{3})*(?:\.\d{2})?)'
-    ]
-    
-    for pattern in budget_patterns:
-        match = re.search(pattern, user_input)
-        if match:
-            amount = float(match.group(1).replace(',', ''))
-            if 'under' in user_input or 'less than' in user_input:
-                preferences["budget_range"] = {"max": amount}
-            elif 'over' in user_input or 'more than' in user_input:
-                preferences["budget_range"] = {"min": amount}
-            else:
-                preferences["budget_range"] = {"target": amount}
-            break
-    
-    # Extract activity preferences
-    activities = {
-        'dining': ['dining', 'food', 'restaurant', 'cuisine', 'chef', 'culinary'],
-        'entertainment': ['entertainment', 'shows', 'music', 'comedy', 'theater', 'nightlife'],
-        'wellness': ['spa', 'wellness', 'fitness', 'gym', 'yoga', 'massage', 'relaxation'],
-        'adventure': ['adventure', 'excursions', 'shores', 'exploration', 'hiking', 'diving'],
-        'family': ['family', 'kids', 'children', 'family-friendly', 'activities for kids'],
-        'romance': ['romance', 'honeymoon', 'anniversary', 'couples', 'romantic'],
-        'gambling': ['casino', 'gambling', 'poker', 'blackjack', 'slots'],
-        'shopping': ['shopping', 'boutiques', 'stores', 'retail']
-    }
-    
-    for activity, keywords in activities.items():
-        if any(keyword in user_input for keyword in keywords):
-            preferences["activities"].append(activity)
-    
-    # Extract destination preferences
-    destinations = {
-        'caribbean': ['caribbean', 'bahamas', 'jamaica', 'cozumel', 'st. thomas', 'st. maarten'],
-        'mediterranean': ['mediterranean', 'europe', 'italy', 'greece', 'spain', 'france'],
-        'alaska': ['alaska', 'alaskan', 'glacier', 'juneau', 'skagway'],
-        'northern europe': ['northern europe', 'scandinavia', 'norway', 'iceland', 'baltic'],
-        'asia': ['asia', 'japan', 'china', 'singapore', 'thailand', 'vietnam'],
-        'australia': ['australia', 'new zealand', 'south pacific', 'tahiti'],
-        'transatlantic': ['transatlantic', 'trans-atlantic', 'atlantic crossing'],
-        'panama canal': ['panama canal', 'panama', 'canal']
-    }
-    
-    for destination, keywords in destinations.items():
-        if any(keyword in user_input for keyword in keywords):
-            preferences["destinations"].append(destination)
-    
-    # Extract party size
-    party_patterns = [
-        r'(\d+)\s*(?:people|guests|adults|passengers)',
-        r'party of\s*(\d+)',
-        r'(\d+)\s*(?:couple|couples)',
-        r'(\d+)\s*(?:family|families)'
-    ]
-    
-    for pattern in party_patterns:
-        match = re.search(pattern, user_input)
-        if match:
-            preferences["party_size"] = int(match.group(1))
-            break
-    
-    # Extract duration preferences
-    duration_patterns = [
-        r'(\d+)\s*(?:day|days)',
-        r'(\d+)\s*(?:week|weeks)',
-        r'(\d+)\s*(?:night|nights)'
-    ]
-    
-    for pattern in duration_patterns:
-        match = re.search(pattern, user_input)
-        if match:
-            duration = int(match.group(1))
-            if 'week' in user_input:
-                preferences["duration_preference"] = f"{duration} weeks"
-            elif 'night' in user_input:
-                preferences["duration_preference"] = f"{duration} nights"
-            else:
-                preferences["duration_preference"] = f"{duration} days"
-            break
-    
-    # Extract special requirements
-    special_requirements = {
-        'accessibility': ['wheelchair', 'accessible', 'disability', 'mobility'],
-        'dietary': ['vegetarian', 'vegan', 'gluten-free', 'kosher', 'halal', 'allergies'],
-        'pets': ['pet', 'dog', 'cat', 'animal'],
-        'smoking': ['smoking', 'non-smoking', 'cigar'],
-        'age_restrictions': ['adults only', '21+', '18+', 'senior', 'senior citizen']
-    }
-    
-    for requirement, keywords in special_requirements.items():
-        if any(keyword in user_input for keyword in keywords):
-            preferences["special_requirements"].append(requirement)
-    
+
+
+def extract_preferences(text: str, new_from: int = 0) -> Dict[str, Any]:
+    """
+    Extract preferences from lowercase text in one regex pass.
+
+    List fields come back in their tables' order. For budget, party size and
+    duration the last mention wins, as it does when merging across calls, so
+    the result doesn't depend on how the conversation was split into calls.
+
+    Args:
+        text: Lowercase input
+        new_from: Only matches ending after this index count; text before it
+            was already scanned and only provides context for phrases that
+            run into the new part
+    """
+    preferences = empty_preferences()
+    found: Dict[str, Set[str]] = {field: set() for field in KEYWORD_FIELDS}
+
+    text = " " + text
+    for match in PREFERENCE_PATTERN.finditer(text):
+        if match.end() - 1 <= new_from:
+            continue
+        keyword = match.group("keyword")
+        if keyword is not None:
+            for field, value in KEYWORD_TARGETS[keyword]:
+                found[field].add(value)
+        elif match.group("budget_amount") or match.group("budget_low"):
+            budget = _budget(match, text)
+            if budget is not None:
+                preferences["budget_range"] = budget
+        elif match.group("party_of") or match.group("party_count"):
+            preferences["party_size"] = _party_size(match)
+            if match.group("party_word") == "family":
+                for field, value in KEYWORD_TARGETS["family"]:
+                    found[field].add(value)
+        else:
+            preferences["duration_preference"] = _duration(match)
+
+    for field, values in found.items():
+        preferences[field] = sorted(values, key=_VALUE_ORDER[field].__getitem__)
     return preferences
+
+
+# Session state keys used by incremental extraction
+PREFERENCES_STATE_KEY = "guest_preferences"
+OFFSET_STATE_KEY = "preference_extractor_offset"
+FINGERPRINT_STATE_KEY = "preference_extractor_fingerprint"
+
+# Characters before the processed offset that identify already-scanned text
+FINGERPRINT_WINDOW = 256
+
+# Already-scanned characters rescanned as context, so a phrase split across
+# calls ("i like roy" + "al caribbean") still matches
+RESCAN_WINDOW = 64
+
+_SEPARATOR = re.compile(r"[^a-z0-9]")
+
+_LIST_FIELDS = tuple(KEYWORD_FIELDS)
+_SCALAR_FIELDS = ("budget_range", "party_size", "duration_preference")
+
+
+def merge_preferences(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge newly extracted preferences into the accumulated ones.
+
+    List fields are unioned (in their tables' order); for budget, party size
+    and duration the newer value replaces the older one, since guests
+    refine these as the conversation goes on.
+    """
+    merged = empty_preferences()
+    for field in _LIST_FIELDS:
+        values = set(current.get(field) or []) | set(update.get(field) or [])
+        merged[field] = sorted(values, key=lambda value: _VALUE_ORDER[field].get(value, len(_VALUE_ORDER[field])))
+    for field in _SCALAR_FIELDS:
+        merged[field] = update[field] if update.get(field) is not None else current.get(field)
+    return merged
+
+
+def _fingerprint(text: str, offset: int) -> str:
+    return hashlib.blake2b(text[max(0, offset - FINGERPRINT_WINDOW):offset].encode("utf-8"), digest_size=16).hexdigest()
+
+
+def preference_extractor_tool(user_input: str, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Extracts structured preferences from natural language input.
+
+    Within a session, preferences accumulate across calls. If user_input
+    continues text already processed (e.g. the whole conversation so far),
+    only the new part is scanned; otherwise user_input is treated as a new
+    message.
+
+    Args:
+        user_input: Natural language input from the user
+        tool_context: Tool context providing session state (injected by ADK)
+
+    Returns:
+        Dictionary containing extracted preferences (accumulated over the session)
+    """
+    if tool_context is None:
+        return extract_preferences(user_input.lower().strip())
+
+    # Offsets and fingerprints refer to the raw input, so an unchanged prefix is never re-read
+    state = tool_context.state
+    offset = state.get(OFFSET_STATE_KEY, 0)
+    if 0 < offset <= len(user_input) and state.get(FINGERPRINT_STATE_KEY) == _fingerprint(user_input, offset):
+        # Start the context at a word boundary inside the rescan window
+        start = max(0, offset - RESCAN_WINDOW)
+        text = user_input[start:].lower()
+        boundary = _SEPARATOR.search(text, 0, offset - start) if start else None
+        if boundary is not None:
+            text = text[boundary.start():]
+            start += boundary.start()
+        new_from = offset - start
+    else:
+        text, new_from = user_input.lower(), 0
+
+    preferences = state.get(PREFERENCES_STATE_KEY) or empty_preferences()
+    if text[new_from:].strip():
+        preferences = merge_preferences(preferences, extract_preferences(text, new_from))
+        state[PREFERENCES_STATE_KEY] = preferences
+    state[OFFSET_STATE_KEY] = len(user_input)
+    state[FINGERPRINT_STATE_KEY] = _fingerprint(user_input, len(user_input))
+    return dict(preferences)
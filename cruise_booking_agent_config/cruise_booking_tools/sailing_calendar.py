@@ -0,0 +1,214 @@
+"""
+Sailing Calendar store for the calendar tools.
+
+Built once per process. Each itinerary keeps its departure dates as sorted
+day ordinals with availability, pricing and cabin availability in parallel
+arrays, so a date-range query is a pair of bisects plus the matching slice.
+"""
+from typing import Dict, Any, List, Optional
+from bisect import bisect_left, bisect_right
+import threading
+
+import numpy as np
+
+from .date_utils import to_ordinal
+
+
+# Mock sailing dates - in real scenario, these would come from the cruise line calendar service
+SAILINGS: Dict[str, Dict[str, Any]] = {
+    "CAR001": {
+        "itinerary_id": "CAR001",
+        "title": "7-Night Eastern Caribbean",
+        "cruise_line": "Royal Caribbean",
+        "ship": "Symphony of the Seas",
+        "departure_port": "Miami, Florida",
+        "sailing_dates": [
+            {
+                "departure_date": "2024-06-15",
+                "return_date": "2024-06-22",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Available",
+                    "Balcony": "Limited",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 899.00
+            },
+            {
+                "departure_date": "2024-06-22",
+                "return_date": "2024-06-29",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Available",
+                    "Balcony": "Available",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 899.00
+            },
+            {
+                "departure_date": "2024-06-29",
+                "return_date": "2024-07-06",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Limited",
+                    "Balcony": "Available",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 999.00
+            },
+            {
+                "departure_date": "2024-07-06",
+                "return_date": "2024-07-13",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Available",
+                    "Balcony": "Available",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 1099.00
+            },
+            {
+                "departure_date": "2024-07-13",
+                "return_date": "2024-07-20",
+                "availability": "Waitlist",
+                "cabin_availability": {
+                    "Interior": "Waitlist",
+                    "Oceanview": "Waitlist",
+                    "Balcony": "Waitlist",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 1199.00
+            }
+        ]
+    },
+    "MED002": {
+        "itinerary_id": "MED002",
+        "title": "10-Night Mediterranean Explorer",
+        "cruise_line": "Celebrity Cruises",
+        "ship": "Celebrity Edge",
+        "departure_port": "Barcelona, Spain",
+        "sailing_dates": [
+            {
+                "departure_date": "2024-07-20",
+                "return_date": "2024-07-30",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Available",
+                    "Balcony": "Available",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 1299.00
+            },
+            {
+                "departure_date": "2024-08-10",
+                "return_date": "2024-08-20",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Available",
+                    "Balcony": "Available",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 1399.00
+            },
+            {
+                "departure_date": "2024-08-30",
+                "return_date": "2024-09-09",
+                "availability": "Available",
+                "cabin_availability": {
+                    "Interior": "Available",
+                    "Oceanview": "Available",
+                    "Balcony": "Available",
+                    "Suite": "Available"
+                },
+                "pricing_starting_from": 1299.00
+            }
+        ]
+    }
+}
+
+# Itinerary-level fields returned with every calendar response
+ITINERARY_FIELDS = ("itinerary_id", "title", "cruise_line", "ship", "departure_port")
+
+# Availability statuses ordered from worst to best; 0 means no sailing
+AVAILABILITY_STATUSES = (None, "Waitlist", "Limited", "Available")
+AVAILABILITY_RANK = {status: rank for rank, status in enumerate(AVAILABILITY_STATUSES) if status}
+
+
+class ItinerarySailings:
+    """Sailings of one itinerary, stored as parallel arrays sorted by departure."""
+
+    def __init__(self, itinerary: Dict[str, Any]):
+        self.info: Dict[str, Any] = {field: itinerary[field] for field in ITINERARY_FIELDS}
+        sailings = sorted(itinerary["sailing_dates"], key=lambda sailing: sailing["departure_date"])
+        self.departures: List[int] = [to_ordinal(sailing["departure_date"]) for sailing in sailings]
+        self.returns: List[int] = [to_ordinal(sailing["return_date"]) for sailing in sailings]
+        self.departure_dates: List[str] = [sailing["departure_date"] for sailing in sailings]
+        self.return_dates: List[str] = [sailing["return_date"] for sailing in sailings]
+        self.availability: List[str] = [sailing["availability"] for sailing in sailings]
+        self.cabin_availability: List[Dict[str, str]] = [sailing["cabin_availability"] for sailing in sailings]
+        self.prices: List[float] = [sailing["pricing_starting_from"] for sailing in sailings]
+
+        # NumPy views of the same arrays for grid queries across itineraries
+        self.departure_array = np.array(self.departures, dtype=np.int64)
+        self.price_array = np.array(self.prices, dtype=np.float64)
+        self.status_array = np.array(
+            [AVAILABILITY_RANK.get(status, 0) for status in self.availability], dtype=np.int8
+        )
+
+    def __len__(self) -> int:
+        return len(self.departures)
+
+    def index_range(self, start: Optional[int] = None, end: Optional[int] = None) -> range:
+        """Return the array positions of sailings departing within [start, end] (day ordinals)."""
+        low = 0 if start is None else bisect_left(self.departures, start)
+        high = len(self.departures) if end is None else bisect_right(self.departures, end)
+        return range(low, high)
+
+    def position(self, departure: int) -> Optional[int]:
+        """Return the array position of the sailing departing on `departure` (day ordinal)."""
+        position = bisect_left(self.departures, departure)
+        if position < len(self.departures) and self.departures[position] == departure:
+            return position
+        return None
+
+    def sailing(self, position: int) -> Dict[str, Any]:
+        """Materialize one sailing as a response dictionary."""
+        return {
+            "departure_date": self.departure_dates[position],
+            "return_date": self.return_dates[position],
+            "availability": self.availability[position],
+            "cabin_availability": dict(self.cabin_availability[position]),
+            "pricing_starting_from": self.prices[position]
+        }
+
+
+class SailingCalendar:
+    """All itineraries' sailings, keyed by itinerary_id."""
+
+    def __init__(self, itineraries: Dict[str, Dict[str, Any]]):
+        self.itineraries: Dict[str, ItinerarySailings] = {
+            itinerary_id: ItinerarySailings(itinerary) for itinerary_id, itinerary in itineraries.items()
+        }
+
+    def get(self, itinerary_id: str) -> Optional[ItinerarySailings]:
+        return self.itineraries.get(itinerary_id)
+
+
+_calendar: Optional[SailingCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_sailing_calendar() -> SailingCalendar:
+    """Return the process-wide sailing calendar, building it on first use."""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = SailingCalendar(SAILINGS)
+    return _calendar
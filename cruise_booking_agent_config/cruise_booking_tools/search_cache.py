@@ -0,0 +1,153 @@
+"""
+Bounded TTL/LRU memoization for cruise search.
+
+Guests rephrase the same request many times, so searches are cached under a
+canonical form of their criteria. Entries expire after a TTL, the least
+recently used entry is evicted when the cache is full, and the whole cache is
+dropped when the catalog version changes.
+"""
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+import time
+
+
+def _canonical_list(values: Optional[List[str]]) -> Tuple[str, ...]:
+    """Lowercase, de-duplicate and sort a list of strings."""
+    if not values:
+        return ()
+    return tuple(sorted({value.strip().lower() for value in values if value and value.strip()}))
+
+
+def _canonical_budget(budget_range: Optional[Dict[str, float]]) -> Tuple[Tuple[str, float], ...]:
+    """
+    Normalize a budget range into sorted (bound, amount) pairs.
+
+    Bound names are kept exactly as given: the search filter only reads
+    "min", "max" and "target", so {"Max": ...} must not share an entry with
+    {"max": ...}.
+    """
+    if not budget_range:
+        return ()
+    return tuple(sorted(
+        (bound, float(amount))
+        for bound, amount in budget_range.items()
+        if amount is not None
+    ))
+
+
+def canonical_search_key(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    destinations: Optional[List[str]] = None,
+    budget_range: Optional[Dict[str, float]] = None,
+    cruise_lines: Optional[List[str]] = None,
+    activities: Optional[List[str]] = None,
+    duration_preference: Optional[str] = None,
+    top_k: Optional[int] = None
+) -> Tuple[Any, ...]:
+    """
+    Build a cache key that is identical for equivalent search criteria.
+
+    Criteria that don't affect matching (party size, pagination and field
+    projection) are deliberately left out.
+    """
+    return (
+        (start_date or "").strip(),
+        (end_date or "").strip(),
+        _canonical_list(destinations),
+        _canonical_budget(budget_range),
+        _canonical_list(cruise_lines),
+        _canonical_list(activities),
+        " ".join((duration_preference or "").lower().split()),
+        top_k
+    )
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after `ttl_seconds`.
+
+    Every entry belongs to a catalog version; reading or writing with a new
+    version clears the cache so stale results are never served.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: int) -> None:
+        # Caller holds the lock
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: int) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring and sizing."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "catalog_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+search_cache = TTLCache(
+    max_size=int(os.getenv("CRUISE_SEARCH_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("CRUISE_SEARCH_CACHE_TTL_SECONDS", "300"))
+)
@@ -0,0 +1,95 @@
+"""
+Deterministic scripted model for offline runs of the cruise agents.
+
+Importing this module registers ScriptedLlm for model names matching
+"scripted/<script>", so any agent can use it in place of gemini-2.5-flash
+(in YAML, `model: scripted/<script>`). A script maps agent names to the
+steps that agent's model replays, in order; each step is a text reply, one
+or more function calls, or both:
+
+    register_script("demo", {
+        "CruiseBookingOrchestrator": [
+            {"function_call": {"name": "transfer_to_agent", "args": {"agent_name": "IntentUnderstandingAgent"}}}
+        ],
+        "IntentUnderstandingAgent": [
+            {"function_call": {"name": "date_resolver_tool", "args": {"time_expression": "next summer"}}},
+            {"text": "Next summer it is. How many guests are travelling?"}
+        ]
+    })
+
+The model keeps no state of its own: an agent's next step is the number of
+replies it has already given in the session, counted from the request
+contents, so concurrent sessions replay independently.
+"""
+from typing import Dict, Any, AsyncGenerator, List
+import threading
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+
+# Label ADK sets on every model request with the calling agent's name
+AGENT_NAME_LABEL = "adk_agent_name"
+
+# Reply once an agent's script has run out, ending its turn
+DEFAULT_REPLY = "Is there anything else I can help you with?"
+
+_scripts: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+_scripts_lock = threading.Lock()
+
+
+def register_script(name: str, script: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    Register a script and return the model name that replays it.
+
+    Args:
+        name: Script name, used as "scripted/<name>"
+        script: Steps per agent name; each step has "text", "function_call"
+            ({"name": ..., "args": {...}}) and/or "function_calls" (a list of those)
+
+    Returns:
+        The model name to configure on agents, e.g. "scripted/demo"
+    """
+    with _scripts_lock:
+        _scripts[name] = {agent: [dict(step) for step in steps] for agent, steps in script.items()}
+    return f"scripted/{name}"
+
+
+def _parts(step: Dict[str, Any]) -> List[types.Part]:
+    parts = [types.Part(text=step["text"])] if step.get("text") else []
+    calls = step.get("function_calls") or ([step["function_call"]] if step.get("function_call") else [])
+    for call in calls:
+        parts.append(types.Part(function_call=types.FunctionCall(name=call["name"], args=dict(call.get("args") or {}))))
+    return parts
+
+
+class ScriptedLlm(BaseLlm):
+    """Model that replays a registered script instead of calling an LLM."""
+
+    model: str = "scripted/default"
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"scripted/.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        script_name = self.model.split("/", 1)[1]
+        script = _scripts.get(script_name)
+        if script is None:
+            yield LlmResponse(error_code="SCRIPT_NOT_FOUND", error_message=f"No script registered as {script_name!r}")
+            return
+
+        labels = llm_request.config.labels if llm_request.config else None
+        steps = script.get((labels or {}).get(AGENT_NAME_LABEL), [])
+        # Other agents' replies reach this agent as user-role context, so model-role contents are its own
+        position = sum(1 for content in llm_request.contents if content.role == "model")
+        step = steps[position] if position < len(steps) else {"text": DEFAULT_REPLY}
+        yield LlmResponse(content=types.Content(role="model", parts=_parts(step)), turn_complete=True)
+
+
+LLMRegistry.register(ScriptedLlm)
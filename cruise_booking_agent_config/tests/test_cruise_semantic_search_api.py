@@ -0,0 +1,30 @@
+"""Tests for field projection in the itinerary search tools."""
+from cruise_booking_tools.cruise_semantic_search_api import (
+    CARD_FIELDS,
+    cruise_semantic_search_api,
+    get_itinerary_details,
+)
+
+
+def test_details_card_fields():
+    details = get_itinerary_details(["CAR001"], fields=["card"])
+
+    assert "error" not in details
+    [itinerary] = details["itineraries"]
+    assert list(itinerary) == [name for name in CARD_FIELDS if name != "relevance_score"]
+    assert itinerary["itinerary_id"] == "CAR001"
+
+
+def test_details_reject_relevance_score():
+    details = get_itinerary_details(["CAR001"], fields=["relevance_score"])
+
+    assert details["error"] == "Unknown itinerary fields"
+    assert details["unknown_fields"] == ["relevance_score"]
+
+
+def test_search_card_fields_keep_relevance_score():
+    results = cruise_semantic_search_api(activities=["spa"], fields=["card"])
+
+    assert results["results"]
+    for result in results["results"]:
+        assert set(result) == set(CARD_FIELDS)
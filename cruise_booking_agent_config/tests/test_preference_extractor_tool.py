@@ -0,0 +1,44 @@
+"""Tests for incremental preference extraction."""
+from types import SimpleNamespace
+
+from cruise_booking_tools.preference_extractor_tool import preference_extractor_tool
+
+
+FIRST = "Our budget is $1000 for 2 people"
+SECOND = "Actually make it under $2000 for 3 people"
+
+
+def _context():
+    return SimpleNamespace(state={})
+
+
+def test_last_mention_wins_within_one_message():
+    preferences = preference_extractor_tool(f"{FIRST}. {SECOND}")
+
+    assert preferences["budget_range"] == {"max": 2000.0}
+    assert preferences["party_size"] == 3
+
+
+def test_result_does_not_depend_on_how_messages_are_split():
+    context = _context()
+    preference_extractor_tool(FIRST, context)
+    separate = preference_extractor_tool(SECOND, context)
+    assert separate["budget_range"] == {"max": 2000.0}
+    assert separate["party_size"] == 3
+
+    # Passing the whole conversation rescans both messages and must agree
+    joined = preference_extractor_tool(f"{FIRST}. {SECOND}", context)
+    assert joined["budget_range"] == {"max": 2000.0}
+    assert joined["party_size"] == 3
+
+
+def test_continued_conversation_only_adds_new_text():
+    context = _context()
+    conversation = FIRST
+    preference_extractor_tool(conversation, context)
+    conversation += ". " + SECOND
+    preferences = preference_extractor_tool(conversation, context)
+
+    assert preferences["budget_range"] == {"max": 2000.0}
+    assert preferences["party_size"] == 3
+    assert context.state["preference_extractor_offset"] == len(conversation)